@@ -1,7 +1,9 @@
 # astronomy/admin.py
 from django.contrib import admin
 from django import forms
-from django.utils.html import format_html
+from django.utils import timezone
+from django.utils.html import format_html, format_html_join
+from core.jobs import enqueue
 from .models import (
     CelestialObjects, 
     ObservationLog, 
@@ -10,6 +12,7 @@ from .models import (
     ResearchProject,
     ResearchDataEntry,
     ResearchAnalysis,
+    ResearchFieldStatistics,
     ResearchTemplate
 )
 
@@ -81,8 +84,28 @@ class EclipseInline(admin.StackedInline):
             # FIX: Ganti animal_behaviour_notes menjadi animal_behaviour_notes (sesuai model)
             'fields':('temperatur_drop', 'animal_behaviour_notes', 'weather_impact'),
             'classes':('collapse',)
+        }),
+        ('Timeline', {
+            'fields':('timeline_summary',),
+            'description':'Computed from the contact times when saved'
         })
     )
+    readonly_fields = ['timeline_summary']
+    
+    @admin.display(description='Phases')
+    def timeline_summary(self, obj):
+        timeline = obj.timeline or {}
+        if not timeline.get('phases'):
+            return '-'
+        phases = format_html_join(
+            '', '<li>{}: {} s ({}%)</li>',
+            ((phase['name'], int(phase['duration_seconds']), phase['percent'])
+             for phase in timeline['phases'])
+        )
+        warnings = format_html_join(
+            '', '<li style="color: orange;">⚠️ {}</li>', ((warning,) for warning in timeline['warnings'])
+        )
+        return format_html('<ul>{}{}</ul>', phases, warnings)
 
 class AstroPhotoForm(forms.ModelForm):
     class Meta:
@@ -153,6 +176,10 @@ class CelestialObjectAdmin(admin.ModelAdmin):
         ('Physical Properties', {
             'fields': ('distance_ly', 'description')
         }),
+        ('Position (for stars and deep-sky objects)', {
+            'fields': ('right_ascension', 'declination'),
+            'classes': ('collapse',)
+        }),
         ('Orbital Data (for satellites)', {
             'fields': ('parent_object', 'orbital_period', 'semi_major_axis'),
             'classes': ('collapse',)
@@ -163,7 +190,7 @@ class CelestialObjectAdmin(admin.ModelAdmin):
 class ObservationLogAdmin(admin.ModelAdmin):
     inlines = [EclipseInline, AstroPhotoInline]
     list_display = ['title', 'object_name', 'observation_date', 'location', 'seeing'
-                    , 'research_project', 'is_public']
+                    , 'moon_illumination', 'research_project', 'is_public']
     list_filter = ['seeing', 'research_project', 'is_public', 'observation_date']
     search_fields = ['title', 'object_name', 'notes']
     date_hierarchy = 'observation_date'
@@ -180,7 +207,8 @@ class ObservationLogAdmin(admin.ModelAdmin):
             'fields': ('location', 'latitude', 'longitude')
         }),
         ('Conditions', {
-            'fields': ('seeing', 'transparency', 'cloud_cover', 'temperature', 'moon_phase')
+            'fields': ('seeing', 'transparency', 'cloud_cover', 'temperature', 'moon_phase',
+                       'moon_illumination', 'moon_phase_angle')
         }),
         ('Equipment', {
             'fields': ('telescope', 'eyepiece', 'magnification', 'camera'),
@@ -195,7 +223,7 @@ class ObservationLogAdmin(admin.ModelAdmin):
         }),
     )
     
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['moon_illumination', 'moon_phase_angle', 'created_at', 'updated_at']
     
     def seeing_display(self,obj):
         colors = {5:'green', 4:'lightgreen', 3:'yellow', 2:'orange', 1:'red'}
@@ -314,6 +342,12 @@ class ResearchAnalysisAdmin(admin.ModelAdmin):
     
     readonly_fields = ['created_at']
     
+@admin.register(ResearchFieldStatistics)
+class ResearchFieldStatisticsAdmin(admin.ModelAdmin):
+    list_display = ['project', 'key', 'count', 'mean', 'last_entry_id', 'updated_at']
+    list_filter = ['project']
+    readonly_fields = ['count', 'mean', 'm2', 'fit', 'last_entry_id', 'skipped_entry_ids', 'updated_at']
+    
 @admin.register(AstroPhoto)
 class AstroPhotoAdmin(admin.ModelAdmin):
     list_display = ['title', 'object_name', 'capture_date', 'is_featured', 'thumbnail',
@@ -331,7 +365,11 @@ class AstroPhotoAdmin(admin.ModelAdmin):
             'fields': ('observation', 'celestial_objects', 'research_project')
         }),
         ('Technical Data', {
-            'fields': ('exposure_time', 'iso', 'aperture', 'focal_length'),
+            'fields': ('exposure_time', 'iso', 'aperture', 'focal_length', 'camera', 'exact_time'),
+            'classes': ('collapse',)
+        }),
+        ('Normalized Data (EXIF)', {
+            'fields': ('exposure_seconds', 'aperture_f', 'focal_length_mm', 'exif_data', 'exif_ingested_at'),
             'classes': ('collapse',)
         }),
         ('Processing', {
@@ -348,6 +386,8 @@ class AstroPhotoAdmin(admin.ModelAdmin):
         }),
     )
     
+    readonly_fields = ['exposure_seconds', 'aperture_f', 'focal_length_mm', 'exif_data', 'exif_ingested_at']
+    
     def thumbnail(self,obj):
         if obj.image:
             return format_html('<img src="{}" width="100" />',obj.image.url)
@@ -379,14 +419,26 @@ class ResearchTemplateAdmin(admin.ModelAdmin):
 
 @admin.action(description="Mark selected as validated")
 def mark_as_validated(modeladmin, request, queryset):
-    queryset.update(is_validated=True)
+    project_ids = set(queryset.filter(is_validated=False).values_list('project_id', flat=True))
+    queryset.update(is_validated=True, updated_at=timezone.now())
+    # Entry yang baru divalidasi belum pernah dicek outlier-nya
+    for project_id in project_ids:
+        enqueue('astronomy.detect_outliers', project_id=project_id)
 
 @admin.action(description="Mark selected as outliers")
 def mark_as_outliers(modeladmin, request, queryset):
-    queryset.update(is_outlier=True)
+    queryset.update(is_outlier=True, updated_at=timezone.now())
 
 ResearchDataEntryAdmin.actions = [mark_as_validated, mark_as_outliers]
 
+@admin.action(description="Run automatic analysis (background)")
+def run_analysis(modeladmin, request, queryset):
+    for project in queryset:
+        enqueue('astronomy.analyze_project', pk=project.pk)
+    modeladmin.message_user(request, f"{queryset.count()} project(s) queued for analysis")
+
+ResearchProjectAdmin.actions = [run_analysis]
+
 class AstronomyAdminSite(admin.AdminSite):
     site_header = "Astronomy Research Administration"
     site_title = "Astronomy Research"
@@ -0,0 +1,386 @@
+# astronomy/analysis.py
+"""
+Orbital period analysis for ResearchDataEntry series.
+
+A project's entries are loaded once into NumPy arrays (``days_from_start``
+plus one column per template field) and every trial period is fitted at
+the same time with a least-squares sinusoid sweep (generalized
+Lomb-Scargle), so months of nightly data are analysed in milliseconds.
+
+    from astronomy.analysis import run_orbital_analysis
+    run_orbital_analysis(project)   # writes 'period' and 'kepler' ResearchAnalysis rows
+"""
+import math
+
+import numpy as np
+
+from .columns import get_snapshot
+from .outliers import reset_statistics
+
+JUPITER_DIAMETER_KM = 142984
+
+# Trial periods are searched between these multiples of the theoretical
+# period; nightly sampling aliases short periods, a window keeps the fit
+# on the physical peak
+PERIOD_SEARCH_WINDOW = (0.5, 2.0)
+
+# Search range when the template has no theoretical period
+MIN_PERIOD_DAYS = 0.5
+
+# Frequency grid step = 1 / (OVERSAMPLING * baseline)
+OVERSAMPLING = 10
+MAX_TRIAL_PERIODS = 20000
+
+# Trial period x data point cells evaluated per chunk (bounds memory)
+SWEEP_CHUNK_CELLS = 2_000_000
+
+# Sweeps larger than this switch to FFT trig sums (Press & Rybicki);
+# FFT_OVERSAMPLING sizes the extirpolation grid
+FFT_THRESHOLD_CELLS = 20_000_000
+FFT_OVERSAMPLING = 5
+
+MIN_POINTS = 5
+
+PERIOD_ANALYSIS_TITLE = 'Orbital Periods (least-squares fit)'
+KEPLER_ANALYSIS_TITLE = "Kepler's Third Law (T²/a³)"
+
+
+def get_template_config(project):
+    """Active ResearchTemplate config of the project type, overridden by its own data_template"""
+    from .models import ResearchTemplate
+
+    template = ResearchTemplate.objects.filter(
+        research_type=project.research_type, is_active=True
+    ).first()
+    config = dict(template.template_config) if template else {}
+    config.update(project.data_template or {})
+    return config
+
+
+def field_key(field):
+    """Key of a template field inside ResearchDataEntry.data ('io_position' is stored as 'io')"""
+    return field.get('key') or field['name'].removesuffix('_position')
+
+
+def load_series(project, keys):
+    """
+    Usable entries of ``project`` as arrays, read from the columnar snapshot.
+
+    Returns ``(days, columns)`` where ``days`` is sorted float64 and
+    ``columns`` maps each key to a float64 array with NaN for missing values.
+    Outliers and unvalidated entries are left out.
+    """
+    return get_snapshot(project.pk).series(keys)
+
+
+def trial_periods(days, min_period, max_period):
+    """Trial periods evenly spaced in frequency, longest first"""
+    baseline = float(days.max() - days.min()) if len(days) else 0.0
+    if baseline <= 0 or min_period <= 0 or max_period <= min_period:
+        return np.empty(0)
+
+    f_min, f_max = 1.0 / max_period, 1.0 / min_period
+    step = 1.0 / (OVERSAMPLING * baseline)
+    count = min(MAX_TRIAL_PERIODS, int(math.ceil((f_max - f_min) / step)) + 1)
+    return 1.0 / np.linspace(f_min, f_max, max(count, 2))
+
+
+def extirpolate(x, y, size, order=4):
+    """
+    Spread ``y`` sampled at fractional grid positions ``x`` onto an integer
+    grid of ``size`` cells with Lagrange weights (Press & Rybicki 1989).
+    """
+    result = np.zeros(size, dtype=y.dtype)
+    integers = x % 1 == 0
+    np.add.at(result, x[integers].astype(int), y[integers])
+    x, y = x[~integers], y[~integers]
+
+    low = np.clip((x - order // 2).astype(int), 0, size - order)
+    numerator = y * np.prod(x - low - np.arange(order)[:, None], axis=0)
+    denominator = float(math.factorial(order - 1))
+    for j in range(order):
+        if j > 0:
+            denominator *= j / (j - order)
+        index = low + (order - 1 - j)
+        np.add.at(result, index, numerator / (denominator * (x - index)))
+    return result
+
+
+def fft_trig_sums(t, weights, f0, df, count, factor=1):
+    """
+    ``(Σ w·sin 2πft, Σ w·cos 2πft)`` for ``f = factor·(f0 + k·df)``, k < count,
+    in O(N log N) through an FFT of the extirpolated samples.
+    """
+    f0, df = f0 * factor, df * factor
+    size = 1 << int(math.ceil(math.log2(count * FFT_OVERSAMPLING)))
+    start = t.min()
+
+    weights = weights * np.exp(2j * np.pi * f0 * (t - start))
+    grid = extirpolate(((t - start) * size * df) % size, weights, size)
+    sums = size * np.fft.ifft(grid)[:count]
+    sums *= np.exp(2j * np.pi * start * (f0 + df * np.arange(count)))
+    return sums.imag, sums.real
+
+
+def _direct_trig_sums(t, y, frequencies):
+    """Exact sums, trial frequencies evaluated in bounded chunks"""
+    n = len(t)
+    sums = np.empty((7, len(frequencies)))
+    chunk = max(1, SWEEP_CHUNK_CELLS // n)
+
+    for start in range(0, len(frequencies), chunk):
+        phase = 2 * np.pi * frequencies[start:start + chunk, None] * t
+        s, c = np.sin(phase), np.cos(phase)
+        sums[:, start:start + chunk] = (
+            s.sum(axis=1), c.sum(axis=1),
+            (s * s).sum(axis=1), (c * c).sum(axis=1), (s * c).sum(axis=1),
+            s @ y, c @ y,
+        )
+    return sums
+
+
+def _fft_trig_sums(t, y, frequencies):
+    n = len(t)
+    f0, df, count = frequencies[0], frequencies[1] - frequencies[0], len(frequencies)
+    ones = np.ones(n)
+
+    sum_s, sum_c = fft_trig_sums(t, ones, f0, df, count)
+    sum_s2, sum_c2 = fft_trig_sums(t, ones, f0, df, count, factor=2)
+    sum_ys, sum_yc = fft_trig_sums(t, y, f0, df, count)
+    # sin² = (1 - cos 2θ)/2, cos² = (1 + cos 2θ)/2, sin·cos = sin 2θ / 2
+    return np.stack([
+        sum_s, sum_c, (n - sum_c2) / 2, (n + sum_c2) / 2, sum_s2 / 2, sum_ys, sum_yc,
+    ])
+
+
+def sinusoid_periodogram(days, values, periods):
+    """
+    Fit ``values = a·sin(ωt) + b·cos(ωt) + c`` for every trial period at once.
+
+    Returns ``(power, coefficients)``: the fraction of variance explained
+    per period (0-1) and the (a, b, c) array of shape ``(len(periods), 3)``.
+    Large sweeps over an evenly spaced frequency grid (see trial_periods)
+    use FFT trig sums instead of evaluating every period/point pair.
+    """
+    t = np.asarray(days, dtype=float)
+    y = np.asarray(values, dtype=float)
+    n = len(t)
+
+    power = np.zeros(len(periods))
+    coefficients = np.zeros((len(periods), 3))
+    total = float(((y - y.mean()) ** 2).sum()) if n else 0.0
+    if n < 3 or total == 0.0:
+        return power, coefficients
+
+    frequencies = 1.0 / np.asarray(periods, dtype=float)
+    steps = np.diff(frequencies)
+    evenly_spaced = len(frequencies) > 2 and np.allclose(steps, steps[0], rtol=1e-6, atol=0)
+    if evenly_spaced and len(frequencies) * n > FFT_THRESHOLD_CELLS:
+        sum_s, sum_c, sum_ss, sum_cc, sum_sc, sum_ys, sum_yc = _fft_trig_sums(t, y, frequencies)
+    else:
+        sum_s, sum_c, sum_ss, sum_cc, sum_sc, sum_ys, sum_yc = _direct_trig_sums(t, y, frequencies)
+
+    normal = np.empty((len(frequencies), 3, 3))
+    normal[:, 0, 0] = sum_ss
+    normal[:, 1, 1] = sum_cc
+    normal[:, 0, 1] = normal[:, 1, 0] = sum_sc
+    normal[:, 0, 2] = normal[:, 2, 0] = sum_s
+    normal[:, 1, 2] = normal[:, 2, 1] = sum_c
+    normal[:, 2, 2] = n
+    rhs = np.stack([sum_ys, sum_yc, np.full(len(frequencies), y.sum())], axis=1)
+
+    # Ridge kecil supaya periode yang sejalan dengan sampling tidak singular
+    coefficients = np.linalg.solve(normal + 1e-9 * n * np.eye(3), rhs[..., None])[..., 0]
+    residual = float(y @ y) - (coefficients * rhs).sum(axis=1)
+    power = 1.0 - residual / total
+
+    return np.clip(power, 0.0, 1.0), coefficients
+
+
+def describe_fit(period, power, coefficients, n_points):
+    """Fit dict of one periodogram peak"""
+    a, b, c = coefficients
+    return {
+        'period': float(period),
+        'amplitude': float(math.hypot(a, b)),
+        'sin': float(a),
+        'cos': float(b),
+        'offset': float(c),
+        'power': float(power),
+        'n_points': int(n_points),
+    }
+
+
+def fit_period(days, values, min_period, max_period):
+    """
+    Best-fitting sinusoid period of one series.
+
+    Returns a dict with period, amplitude, the sin/cos/offset coefficients,
+    power and n_points, or None when there are not enough points.
+    """
+    usable = ~np.isnan(values)
+    t, y = days[usable], values[usable]
+    if len(t) < MIN_POINTS:
+        return None
+
+    periods = trial_periods(t, min_period, max_period)
+    if not len(periods):
+        return None
+
+    power, coefficients = sinusoid_periodogram(t, y, periods)
+    best = int(np.argmax(power))
+    return describe_fit(periods[best], power[best], coefficients[best], len(t))
+
+
+def quality_rating(errors):
+    """ResearchAnalysis.quality_rating from a list of % errors"""
+    if not errors:
+        return None
+    mean_error = sum(abs(e) for e in errors) / len(errors)
+    if mean_error < 2:
+        return 'excellent'
+    if mean_error < 5:
+        return 'good'
+    if mean_error < 10:
+        return 'fair'
+    return 'poor'
+
+
+def percentage_error(measured, theoretical):
+    return round((measured - theoretical) / theoretical * 100, 2)
+
+
+def analyze_orbital_periods(project, config=None):
+    """
+    Fit the orbital period of every body tracked by the project template.
+
+    Returns ``{body: fit}`` (see fit_period); bodies without enough data
+    are left out.
+    """
+    config = config if config is not None else get_template_config(project)
+    theoretical = config.get('theoretical_values', {})
+    keys = [field_key(field) for field in config.get('fields', [])]
+
+    days, columns = load_series(project, keys)
+    baseline = float(days.max() - days.min()) if len(days) else 0.0
+
+    fits = {}
+    for key in keys:
+        expected = theoretical.get(key, {}).get('period')
+        if expected:
+            low, high = PERIOD_SEARCH_WINDOW
+            min_period, max_period = expected * low, expected * high
+        else:
+            min_period, max_period = MIN_PERIOD_DAYS, baseline
+
+        fit = fit_period(days, columns[key], min_period, max_period)
+        if fit:
+            fits[key] = fit
+    return fits
+
+
+def kepler_ratios(fits, theoretical):
+    """
+    T²/a³ per body, with T in days and a (the fitted elongation amplitude)
+    in Jupiter diameters. Theoretical ratios use the template values.
+    """
+    measured, expected = {}, {}
+    for body, fit in fits.items():
+        if fit['amplitude'] > 0:
+            measured[body] = fit['period'] ** 2 / fit['amplitude'] ** 3
+
+        values = theoretical.get(body, {})
+        if values.get('period') and values.get('semi_major_axis'):
+            axis_dj = values['semi_major_axis'] / JUPITER_DIAMETER_KM
+            expected[body] = values['period'] ** 2 / axis_dj ** 3
+
+    return measured, expected
+
+
+def run_orbital_analysis(project):
+    """
+    Fit periods, verify Kepler's third law and store both as ResearchAnalysis.
+
+    Re-running replaces the previous automatic results. Returns the list of
+    analyses written (empty when no body had enough data).
+    """
+    from .models import ResearchAnalysis
+
+    config = get_template_config(project)
+    theoretical = config.get('theoretical_values', {})
+    fits = analyze_orbital_periods(project, config)
+    if not fits:
+        return []
+
+    # Outlier residuals are measured against the new fit from now on
+    for body, fit in fits.items():
+        reset_statistics(project, body, {
+            'period': fit['period'], 'sin': fit['sin'], 'cos': fit['cos'], 'offset': fit['offset'],
+        })
+
+    analyses = []
+
+    period_errors = {
+        body: percentage_error(fit['period'], theoretical[body]['period'])
+        for body, fit in fits.items()
+        if theoretical.get(body, {}).get('period')
+    }
+    period_analysis, _ = ResearchAnalysis.objects.update_or_create(
+        project=project,
+        analysis_type='period',
+        title=PERIOD_ANALYSIS_TITLE,
+        defaults={
+            'results': {body: round(fit['period'], 4) for body, fit in fits.items()},
+            'theoretical_values': {
+                body: theoretical[body]['period'] for body in period_errors
+            } or None,
+            'error_percentage': period_errors or None,
+            'quality_rating': quality_rating(list(period_errors.values())),
+            'methodology': (
+                "Least-squares sinusoid fit (generalized Lomb-Scargle) over "
+                f"{max(fit['n_points'] for fit in fits.values())} validated, non-outlier entries. "
+                "Trial periods were swept between "
+                f"{PERIOD_SEARCH_WINDOW[0]}x and {PERIOD_SEARCH_WINDOW[1]}x the theoretical period."
+            ),
+            'interpretation': ', '.join(
+                f"{body}: {fit['period']:.3f} d (amplitude {fit['amplitude']:.2f} DJ, "
+                f"power {fit['power']:.2f})"
+                for body, fit in fits.items()
+            ),
+        }
+    )
+    analyses.append(period_analysis)
+
+    measured, expected = kepler_ratios(fits, theoretical)
+    if measured:
+        results = {f'ratio_{body}': round(ratio, 6) for body, ratio in measured.items()}
+        results['average'] = round(float(np.mean(list(measured.values()))), 6)
+        if len(measured) > 1:
+            spread = np.std(list(measured.values())) / results['average'] * 100
+            results['spread_percentage'] = round(float(spread), 2)
+
+        kepler_errors = {
+            f'ratio_{body}': percentage_error(measured[body], expected[body])
+            for body in measured if body in expected
+        }
+        kepler_analysis, _ = ResearchAnalysis.objects.update_or_create(
+            project=project,
+            analysis_type='kepler',
+            title=KEPLER_ANALYSIS_TITLE,
+            defaults={
+                'results': results,
+                'theoretical_values': {
+                    f'ratio_{body}': round(ratio, 6) for body, ratio in expected.items()
+                } or None,
+                'error_percentage': kepler_errors or None,
+                'quality_rating': quality_rating(list(kepler_errors.values())),
+                'methodology': (
+                    "T²/a³ per moon from the fitted period (days) and the fitted "
+                    "elongation amplitude as semi-major axis (Jupiter diameters). "
+                    "Kepler's third law predicts the same ratio for every moon."
+                ),
+            }
+        )
+        analyses.append(kepler_analysis)
+
+    return analyses
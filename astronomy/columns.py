@@ -0,0 +1,301 @@
+# astronomy/columns.py
+"""
+Columnar snapshot of ResearchDataEntry.data per project.
+
+``ResearchDataEntry.data`` is schemaless JSON, so analysis and charts would
+re-parse every row on each request. Instead every project gets an ``.npz``
+snapshot with contiguous float64 arrays: entry ids, ``days_from_start``,
+the validation flags and one column per numeric data key (``io``,
+``magnitude``, ``meteor_count`` ...), sorted by ``days_from_start``.
+
+Saving or deleting an entry patches the snapshot in place (after the
+transaction commits). Readers verify it against a single ``COUNT/MAX
+(updated_at)`` query and rebuild it when another writer slipped past, e.g.
+``queryset.update()`` or ``bulk_create``.
+
+    from astronomy.columns import get_snapshot
+    days, columns = get_snapshot(project.pk).series(['io', 'europa'])
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_timezone
+import fcntl
+import math
+import os
+import tempfile
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Count, Max
+
+COLUMN_PREFIX = 'col:'
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+_memo = {}
+
+
+def snapshot_root():
+    return getattr(
+        settings, 'RESEARCH_COLUMNS_ROOT',
+        os.path.join(settings.BASE_DIR, 'var', 'research_columns')
+    )
+
+
+def snapshot_path(project_id):
+    return os.path.join(snapshot_root(), f'project_{project_id}.npz')
+
+
+def to_microseconds(value):
+    """Aware datetime -> integer microseconds since the epoch (0 for None)"""
+    if value is None:
+        return 0
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def numeric(value):
+    """Float value of a JSON number, None for anything else (bool, text, null)"""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+def entry_row(entry):
+    """The snapshot fields of one saved ResearchDataEntry"""
+    return (
+        entry.pk, entry.days_from_start, to_microseconds(entry.updated_at),
+        entry.is_outlier, entry.is_validated, entry.data,
+    )
+
+
+class ColumnSnapshot:
+    """Contiguous per-project arrays, one row per entry"""
+
+    def __init__(self, ids, days, updated, is_outlier, is_validated, columns):
+        self.ids = ids
+        self.days = days
+        self.updated = updated
+        self.is_outlier = is_outlier
+        self.is_validated = is_validated
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def stamp(self):
+        """(entry count, latest updated_at) — compared with the database on read"""
+        return len(self), int(self.updated.max()) if len(self) else 0
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build from (id, days, updated_us, is_outlier, is_validated, data) rows"""
+        ids, days, updated, outliers, validated = [], [], [], [], []
+        columns = {}
+
+        for index, (pk, day, stamp, is_outlier, is_validated, data) in enumerate(rows):
+            ids.append(pk)
+            days.append(day)
+            updated.append(stamp)
+            outliers.append(is_outlier)
+            validated.append(is_validated)
+
+            for key, value in (data or {}).items():
+                value = numeric(value)
+                if value is None:
+                    continue
+                column = columns.get(key)
+                if column is None:
+                    column = columns[key] = [math.nan] * index
+                column.extend([math.nan] * (index - len(column)))
+                column.append(value)
+
+        count = len(ids)
+        for column in columns.values():
+            column.extend([math.nan] * (count - len(column)))
+
+        return cls(
+            np.array(ids, dtype=np.int64),
+            np.array(days, dtype=float),
+            np.array(updated, dtype=np.int64),
+            np.array(outliers, dtype=bool),
+            np.array(validated, dtype=bool),
+            {key: np.array(values, dtype=float) for key, values in columns.items()},
+        )
+
+    def column(self, key):
+        """Values of one data key, NaN where an entry does not have it"""
+        column = self.columns.get(key)
+        return column if column is not None else np.full(len(self), np.nan)
+
+    def usable(self):
+        """Mask of validated, non-outlier entries"""
+        return self.is_validated & ~self.is_outlier
+
+    def series(self, keys, usable_only=True):
+        """``(days, {key: values})`` for analysis, optionally only usable entries"""
+        mask = self.usable() if usable_only else np.ones(len(self), dtype=bool)
+        return self.days[mask], {key: self.column(key)[mask] for key in keys}
+
+    def without(self, entry_id):
+        keep = self.ids != entry_id
+        return ColumnSnapshot(
+            self.ids[keep], self.days[keep], self.updated[keep],
+            self.is_outlier[keep], self.is_validated[keep],
+            {key: column[keep] for key, column in self.columns.items()},
+        )
+
+    def with_row(self, row):
+        """Copy with ``row`` inserted (or replaced), keeping days_from_start order"""
+        pk, day, stamp, is_outlier, is_validated, data = row
+        base = self.without(pk)
+        position = int(np.searchsorted(base.days, day, side='right'))
+
+        values = {key: numeric(value) for key, value in (data or {}).items()}
+        columns = {}
+        for key in set(base.columns) | {key for key, value in values.items() if value is not None}:
+            value = values.get(key)
+            columns[key] = np.insert(base.column(key), position, math.nan if value is None else value)
+
+        return ColumnSnapshot(
+            np.insert(base.ids, position, pk),
+            np.insert(base.days, position, day),
+            np.insert(base.updated, position, stamp),
+            np.insert(base.is_outlier, position, is_outlier),
+            np.insert(base.is_validated, position, is_validated),
+            columns,
+        )
+
+    def save(self, path):
+        """Atomically replace the snapshot file"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        arrays = {
+            'ids': self.ids, 'days': self.days, 'updated': self.updated,
+            'is_outlier': self.is_outlier, 'is_validated': self.is_validated,
+        }
+        arrays.update({COLUMN_PREFIX + key: column for key, column in self.columns.items()})
+
+        handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.npz')
+        with os.fdopen(handle, 'wb') as target:
+            np.savez(target, **arrays)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with np.load(path) as archive:
+                return cls(
+                    archive['ids'], archive['days'], archive['updated'],
+                    archive['is_outlier'], archive['is_validated'],
+                    {
+                        name[len(COLUMN_PREFIX):]: archive[name]
+                        for name in archive.files if name.startswith(COLUMN_PREFIX)
+                    },
+                )
+        except (OSError, KeyError, ValueError):
+            return None
+
+
+@contextmanager
+def _locked(project_id):
+    """Serialize snapshot read-modify-write across worker processes"""
+    os.makedirs(snapshot_root(), exist_ok=True)
+    with open(snapshot_path(project_id) + '.lock', 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _read(project_id):
+    """Load a snapshot file, reusing the in-process copy while the file is unchanged"""
+    path = snapshot_path(project_id)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    # os.replace() gives every write a new inode
+    modified = (stat.st_ino, stat.st_mtime_ns)
+    cached = _memo.get(project_id)
+    if cached and cached[0] == modified:
+        return cached[1]
+
+    snapshot = ColumnSnapshot.load(path)
+    if snapshot is not None:
+        _memo[project_id] = (modified, snapshot)
+    return snapshot
+
+
+def _write(project_id, snapshot):
+    path = snapshot_path(project_id)
+    snapshot.save(path)
+    stat = os.stat(path)
+    _memo[project_id] = ((stat.st_ino, stat.st_mtime_ns), snapshot)
+
+
+def database_stamp(project_id):
+    from .models import ResearchDataEntry
+
+    stamp = ResearchDataEntry.objects.filter(project_id=project_id).aggregate(
+        count=Count('id'), latest=Max('updated_at')
+    )
+    return stamp['count'], to_microseconds(stamp['latest'])
+
+
+def build_snapshot(project_id):
+    """Full rebuild straight from the database, streaming the rows"""
+    from .models import ResearchDataEntry
+
+    rows = (
+        ResearchDataEntry.objects
+        .filter(project_id=project_id)
+        .order_by('days_from_start', 'id')
+        .values_list('id', 'days_from_start', 'updated_at', 'is_outlier', 'is_validated', 'data')
+        .iterator(chunk_size=2000)
+    )
+    return ColumnSnapshot.from_rows(
+        (pk, day, to_microseconds(updated), outlier, validated, data)
+        for pk, day, updated, outlier, validated, data in rows
+    )
+
+
+def get_snapshot(project_id):
+    """Current snapshot of a project, rebuilt only when it is missing or stale"""
+    stamp = database_stamp(project_id)
+
+    snapshot = _read(project_id)
+    if snapshot is not None and snapshot.stamp == stamp:
+        return snapshot
+
+    with _locked(project_id):
+        snapshot = _read(project_id)
+        if snapshot is None or snapshot.stamp != stamp:
+            snapshot = build_snapshot(project_id)
+            _write(project_id, snapshot)
+    return snapshot
+
+
+def record_entry(project_id, row):
+    """Patch a saved entry into an existing snapshot (no-op if none was built yet)"""
+    with _locked(project_id):
+        snapshot = _read(project_id)
+        if snapshot is not None:
+            _write(project_id, snapshot.with_row(row))
+
+
+def forget_entry(project_id, entry_id):
+    """Drop a deleted entry from an existing snapshot"""
+    with _locked(project_id):
+        snapshot = _read(project_id)
+        if snapshot is not None:
+            _write(project_id, snapshot.without(entry_id))
+
+
+def invalidate_snapshot(project_id):
+    """Throw the snapshot away; the next read rebuilds it"""
+    with _locked(project_id):
+        _memo.pop(project_id, None)
+        try:
+            os.remove(snapshot_path(project_id))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,665 @@
+# astronomy/ephemeris.py
+"""
+Local ephemeris and precomputed sky tables for observation planning.
+
+Positions come from analytical approximations, with no network access:
+- Sun, Moon and planets use low-precision orbital elements (P. Schlyter,
+  "How to compute planetary positions"), good to a few arcminutes.
+- The Galilean moons use Meeus, Astronomical Algorithms ch. 44 (low
+  accuracy), which gives the east/west elongation in Jupiter diameters,
+  the unit of the Jupiter moons research template.
+
+Every function works on NumPy arrays of Julian dates. ``build_store``
+precomputes hourly altitude/azimuth for every resolvable CelestialObjects
+row at one site into a compact float32 ``.npz`` store. After that,
+"what is up tonight from Bekasi" (``whats_up_tonight``) is an array
+slice, not per-request trigonometry.
+
+Stores are only written by the worker and ``manage.py precompute_ephemeris``,
+for the default site, ``settings.EPHEMERIS_SITES`` or an explicit
+--lat/--lon. Requests only read them. If a store is stale, the request
+computes that single night in memory.
+"""
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+import hashlib
+import math
+import os
+import tempfile
+
+import numpy as np
+from django.conf import settings
+
+UNIX_EPOCH_JD = 2440587.5
+J2000_JD = 2451545.0
+
+# Bekasi
+DEFAULT_SITE = {'latitude': -6.2383, 'longitude': 106.9756}
+
+EPHEMERIS_DAYS = 30
+
+# A requested lat/lon uses the precomputed site within this many degrees
+SITE_TOLERANCE_DEGREES = 0.1
+
+# Sun below this = dark enough to observe (nautical twilight)
+DARK_SUN_ALTITUDE = -12.0
+MIN_OBJECT_ALTITUDE = 15.0
+
+# Orbital elements: value at d = 0 and rate per day (Schlyter, d = JD - 2451543.5)
+# (N, i, w, a, e, M)
+ORBITAL_ELEMENTS = {
+    'sun': ((0.0, 0.0), (0.0, 0.0), (282.9404, 4.70935e-5), (1.0, 0.0),
+            (0.016709, -1.151e-9), (356.0470, 0.9856002585)),
+    'moon': ((125.1228, -0.0529538083), (5.1454, 0.0), (318.0634, 0.1643573223), (60.2666, 0.0),
+             (0.054900, 0.0), (115.3654, 13.0649929509)),
+    'mercury': ((48.3313, 3.24587e-5), (7.0047, 5.00e-8), (29.1241, 1.01444e-5), (0.387098, 0.0),
+                (0.205635, 5.59e-10), (168.6562, 4.0923344368)),
+    'venus': ((76.6799, 2.46590e-5), (3.3946, 2.75e-8), (54.8910, 1.38374e-5), (0.723330, 0.0),
+              (0.006773, -1.302e-9), (48.0052, 1.6021302244)),
+    'mars': ((49.5574, 2.11081e-5), (1.8497, -1.78e-8), (286.5016, 2.92961e-5), (1.523688, 0.0),
+             (0.093405, 2.516e-9), (18.6021, 0.5240207766)),
+    'jupiter': ((100.4542, 2.76854e-5), (1.3030, -1.557e-7), (273.8777, 1.64505e-5), (5.20256, 0.0),
+                (0.048498, 4.469e-9), (19.8950, 0.0830853001)),
+    'saturn': ((113.6634, 2.38980e-5), (2.4886, -1.081e-7), (339.3939, 2.97661e-5), (9.55475, 0.0),
+               (0.055546, -9.499e-9), (316.9670, 0.0334442282)),
+    'uranus': ((74.0005, 1.3978e-5), (0.7733, 1.9e-8), (96.6612, 3.0565e-5), (19.18171, -1.55e-8),
+               (0.047318, 7.45e-9), (142.5905, 0.011725806)),
+    'neptune': ((131.7806, 3.0173e-5), (1.7700, -2.55e-7), (272.8461, -6.027e-6), (30.05826, 3.313e-8),
+                (0.008606, 2.15e-9), (260.2471, 0.005995147)),
+}
+
+PLANETS = ['mercury', 'venus', 'mars', 'jupiter', 'saturn', 'uranus', 'neptune']
+GALILEAN_MOONS = ['io', 'europa', 'ganymede', 'callisto']
+
+# CelestialObjects.name (lowercase) -> body
+BODY_ALIASES = {
+    'sun': 'sun', 'matahari': 'sun',
+    'moon': 'moon', 'bulan': 'moon',
+    'mercury': 'mercury', 'merkurius': 'mercury',
+    'venus': 'venus',
+    'mars': 'mars',
+    'jupiter': 'jupiter', 'yupiter': 'jupiter',
+    'saturn': 'saturn', 'saturnus': 'saturn',
+    'uranus': 'uranus',
+    'neptune': 'neptune', 'neptunus': 'neptune',
+    'io': 'io', 'europa': 'europa', 'ganymede': 'ganymede', 'callisto': 'callisto',
+}
+
+
+def julian_date(timestamps):
+    """Unix seconds -> Julian date"""
+    return np.asarray(timestamps, dtype=float) / 86400.0 + UNIX_EPOCH_JD
+
+
+def local_sidereal_degrees(jd, longitude):
+    """Local mean sidereal time in degrees"""
+    return 280.46061837 + 360.98564736629 * (np.asarray(jd) - J2000_JD) + longitude
+
+
+def horizontal(ra, dec, jd, latitude, longitude):
+    """Equatorial (deg) -> (altitude, azimuth) in degrees, azimuth from north through east"""
+    hour_angle = np.radians(local_sidereal_degrees(jd, longitude) - ra)
+    lat, dec = np.radians(latitude), np.radians(dec)
+
+    sin_altitude = np.sin(lat) * np.sin(dec) + np.cos(lat) * np.cos(dec) * np.cos(hour_angle)
+    altitude = np.arcsin(np.clip(sin_altitude, -1.0, 1.0))
+    azimuth = np.arctan2(
+        -np.cos(dec) * np.sin(hour_angle),
+        np.sin(dec) * np.cos(lat) - np.cos(dec) * np.sin(lat) * np.cos(hour_angle),
+    )
+    return np.degrees(altitude), np.mod(np.degrees(azimuth), 360.0)
+
+
+def _elements(body, d):
+    return [base + rate * d for base, rate in ORBITAL_ELEMENTS[body]]
+
+
+def _solve_kepler(mean_anomaly, eccentricity):
+    """Eccentric anomaly (radians) by Newton iteration"""
+    anomaly = mean_anomaly + eccentricity * np.sin(mean_anomaly) * (1 + eccentricity * np.cos(mean_anomaly))
+    for _ in range(5):
+        anomaly = anomaly - (anomaly - eccentricity * np.sin(anomaly) - mean_anomaly) / (1 - eccentricity * np.cos(anomaly))
+    return anomaly
+
+
+def _orbit_position(body, d):
+    """Ecliptic rectangular coordinates around the orbit's centre"""
+    node, inclination, perihelion, axis, eccentricity, mean_anomaly = _elements(body, d)
+    node, inclination, perihelion = np.radians(node), np.radians(inclination), np.radians(perihelion)
+    anomaly = _solve_kepler(np.radians(mean_anomaly), eccentricity)
+
+    x = axis * (np.cos(anomaly) - eccentricity)
+    y = axis * np.sqrt(1 - eccentricity ** 2) * np.sin(anomaly)
+    distance = np.hypot(x, y)
+    argument = np.arctan2(y, x) + perihelion
+
+    return (
+        distance * (np.cos(node) * np.cos(argument) - np.sin(node) * np.sin(argument) * np.cos(inclination)),
+        distance * (np.sin(node) * np.cos(argument) + np.cos(node) * np.sin(argument) * np.cos(inclination)),
+        distance * np.sin(argument) * np.sin(inclination),
+    )
+
+
+def _to_equatorial(x, y, z, d):
+    obliquity = np.radians(23.4393 - 3.563e-7 * d)
+    y, z = y * np.cos(obliquity) - z * np.sin(obliquity), y * np.sin(obliquity) + z * np.cos(obliquity)
+    ra = np.mod(np.degrees(np.arctan2(y, x)), 360.0)
+    dec = np.degrees(np.arctan2(z, np.hypot(x, y)))
+    return ra, dec, np.sqrt(x ** 2 + y ** 2 + z ** 2)
+
+
+def _moon_ecliptic(d):
+    """Geocentric ecliptic Moon with the main perturbations (Earth radii)"""
+    x, y, z = _orbit_position('moon', d)
+    longitude = np.arctan2(y, x)
+    latitude = np.arctan2(z, np.hypot(x, y))
+    distance = np.sqrt(x ** 2 + y ** 2 + z ** 2)
+
+    node, _, perigee, _, _, moon_anomaly = _elements('moon', d)
+    _, _, sun_perihelion, _, _, sun_anomaly = _elements('sun', d)
+    moon_longitude = node + perigee + moon_anomaly
+    sun_longitude = sun_perihelion + sun_anomaly
+    elongation = np.radians(moon_longitude - sun_longitude)
+    argument = np.radians(moon_longitude - node)
+    moon_anomaly, sun_anomaly = np.radians(moon_anomaly), np.radians(sun_anomaly)
+
+    longitude = longitude + np.radians(
+        -1.274 * np.sin(moon_anomaly - 2 * elongation)   # evection
+        + 0.658 * np.sin(2 * elongation)                 # variation
+        - 0.186 * np.sin(sun_anomaly)                    # yearly equation
+        - 0.059 * np.sin(2 * moon_anomaly - 2 * elongation)
+        - 0.057 * np.sin(moon_anomaly - 2 * elongation + sun_anomaly)
+        + 0.053 * np.sin(moon_anomaly + 2 * elongation)
+    )
+    latitude = latitude + np.radians(
+        -0.173 * np.sin(argument - 2 * elongation)
+        - 0.055 * np.sin(moon_anomaly - argument - 2 * elongation)
+    )
+    distance = distance - 0.58 * np.cos(moon_anomaly - 2 * elongation) - 0.46 * np.cos(2 * elongation)
+
+    return (
+        distance * np.cos(latitude) * np.cos(longitude),
+        distance * np.cos(latitude) * np.sin(longitude),
+        distance * np.sin(latitude),
+    )
+
+
+# Largest Jupiter-Saturn-Uranus perturbations (Schlyter), degrees of heliocentric longitude/latitude
+GREAT_INEQUALITY = {'jupiter', 'saturn', 'uranus'}
+
+
+def _perturb(body, x, y, z, d):
+    mj = np.radians(_elements('jupiter', d)[5])
+    ms = np.radians(_elements('saturn', d)[5])
+    mu = np.radians(_elements('uranus', d)[5])
+    latitude_shift = 0.0
+
+    if body == 'jupiter':
+        longitude_shift = (
+            -0.332 * np.sin(2 * mj - 5 * ms - np.radians(67.6))
+            - 0.056 * np.sin(2 * mj - 2 * ms + np.radians(21))
+            + 0.042 * np.sin(3 * mj - 5 * ms + np.radians(21))
+            - 0.036 * np.sin(mj - 2 * ms)
+            + 0.022 * np.cos(mj - ms)
+            + 0.023 * np.sin(2 * mj - 3 * ms + np.radians(52))
+            - 0.016 * np.sin(mj - 5 * ms - np.radians(69))
+        )
+    elif body == 'saturn':
+        longitude_shift = (
+            0.812 * np.sin(2 * mj - 5 * ms - np.radians(67.6))
+            - 0.229 * np.cos(2 * mj - 4 * ms - np.radians(2))
+            + 0.119 * np.sin(mj - 2 * ms - np.radians(3))
+            + 0.046 * np.sin(2 * mj - 6 * ms - np.radians(69))
+            + 0.014 * np.sin(mj - 3 * ms + np.radians(32))
+        )
+        latitude_shift = (
+            -0.020 * np.cos(2 * mj - 4 * ms - np.radians(2))
+            + 0.018 * np.sin(2 * mj - 6 * ms - np.radians(49))
+        )
+    else:
+        longitude_shift = (
+            0.040 * np.sin(ms - 2 * mu + np.radians(6))
+            + 0.035 * np.sin(ms - 3 * mu + np.radians(33))
+            - 0.015 * np.sin(mj - mu + np.radians(20))
+        )
+
+    distance = np.sqrt(x ** 2 + y ** 2 + z ** 2)
+    longitude = np.arctan2(y, x) + np.radians(longitude_shift)
+    latitude = np.arctan2(z, np.hypot(x, y)) + np.radians(latitude_shift)
+    return (
+        distance * np.cos(latitude) * np.cos(longitude),
+        distance * np.cos(latitude) * np.sin(longitude),
+        distance * np.sin(latitude),
+    )
+
+
+def body_position(body, jd):
+    """Geocentric (ra, dec) in degrees of a solar-system body for Julian dates"""
+    d = np.asarray(jd, dtype=float) - 2451543.5
+
+    if body == 'moon':
+        ra, dec, _ = _to_equatorial(*_moon_ecliptic(d), d)
+        return ra, dec
+
+    sun_x, sun_y, _ = _orbit_position('sun', d)
+    if body == 'sun':
+        ra, dec, _ = _to_equatorial(sun_x, sun_y, np.zeros_like(d), d)
+        return ra, dec
+
+    x, y, z = _orbit_position(body, d)
+    if body in GREAT_INEQUALITY:
+        x, y, z = _perturb(body, x, y, z, d)
+    ra, dec, _ = _to_equatorial(x + sun_x, y + sun_y, z, d)
+    return ra, dec
+
+
+def moon_distance(jd):
+    """Geocentric Moon distance in Earth radii"""
+    d = np.asarray(jd, dtype=float) - 2451543.5
+    x, y, z = _moon_ecliptic(d)
+    return np.sqrt(x ** 2 + y ** 2 + z ** 2)
+
+
+EARTH_RADII_PER_AU = 23454.8
+
+# Illuminated fraction up to which a night counts as dark-sky
+DARK_SKY_ILLUMINATION = 0.25
+
+# Named phases, each centred on a multiple of 45° of Moon-Sun longitude difference
+PHASE_NAMES = [
+    'New Moon', 'Waxing Crescent', 'First Quarter', 'Waxing Gibbous',
+    'Full Moon', 'Waning Gibbous', 'Last Quarter', 'Waning Crescent',
+]
+
+
+def moon_phase(jd):
+    """
+    Illuminated fraction, phase angle and age angle of the Moon.
+
+    Returns ``(illumination, phase_angle, longitude_difference)`` arrays:
+    illumination in [0, 1], phase angle in degrees (0 = full, 180 = new,
+    Meeus ch. 48) and the Moon-Sun ecliptic longitude difference in
+    [0, 360), which tells waxing (< 180) from waning.
+    """
+    d = np.asarray(jd, dtype=float) - 2451543.5
+    moon_x, moon_y, moon_z = _moon_ecliptic(d)
+    sun_x, sun_y, _ = _orbit_position('sun', d)
+    sun_x, sun_y = sun_x * EARTH_RADII_PER_AU, sun_y * EARTH_RADII_PER_AU
+
+    moon_distance = np.sqrt(moon_x ** 2 + moon_y ** 2 + moon_z ** 2)
+    sun_distance = np.hypot(sun_x, sun_y)
+    elongation = np.arccos(np.clip(
+        (moon_x * sun_x + moon_y * sun_y) / (moon_distance * sun_distance), -1.0, 1.0
+    ))
+    phase_angle = np.arctan2(
+        sun_distance * np.sin(elongation), moon_distance - sun_distance * np.cos(elongation)
+    )
+    longitude_difference = np.mod(
+        np.degrees(np.arctan2(moon_y, moon_x) - np.arctan2(sun_y, sun_x)), 360.0
+    )
+    return (1 + np.cos(phase_angle)) / 2, np.degrees(phase_angle), longitude_difference
+
+
+def moon_phase_at(moments):
+    """``moon_phase`` for a sequence of aware datetimes, in one vectorized pass"""
+    return moon_phase(julian_date([moment.timestamp() for moment in moments]))
+
+
+def phase_name(longitude_difference):
+    """Name of the phase for a Moon-Sun longitude difference in degrees"""
+    return PHASE_NAMES[int(((longitude_difference + 22.5) % 360) // 45)]
+
+
+def galilean_elongations(jd):
+    """
+    East(+)/west(-) elongation of Io, Europa, Ganymede and Callisto from
+    Jupiter in Jupiter diameters (Meeus ch. 44, low accuracy).
+    Returns a dict of arrays.
+    """
+    d = np.asarray(jd, dtype=float) - J2000_JD
+    rad = np.radians
+
+    v = 172.74 + 0.00111588 * d
+    m = rad(357.529 + 0.9856003 * d)
+    n = 20.020 + 0.0830853 * d + 0.329 * np.sin(rad(v))
+    j = 66.115 + 0.9025179 * d - 0.329 * np.sin(rad(v))
+    a = 1.915 * np.sin(m) + 0.020 * np.sin(2 * m)
+    b = 5.555 * np.sin(rad(n)) + 0.168 * np.sin(rad(2 * n))
+    k = rad(j + a - b)
+    earth = 1.00014 - 0.01671 * np.cos(m) - 0.00014 * np.cos(2 * m)
+    jupiter = 5.20872 - 0.25208 * np.cos(rad(n)) - 0.00611 * np.cos(rad(2 * n))
+    distance = np.sqrt(jupiter ** 2 + earth ** 2 - 2 * jupiter * earth * np.cos(k))
+    psi = np.degrees(np.arcsin(earth / distance * np.sin(k)))
+
+    # Light time
+    t = d - distance / 173
+    u1 = 163.8069 + 203.4058646 * t + psi - b
+    u2 = 358.4140 + 101.2916335 * t + psi - b
+    u3 = 5.7176 + 50.2345180 * t + psi - b
+    u4 = 224.8092 + 21.4879800 * t + psi - b
+    g = rad(331.18 + 50.310482 * t)
+    h = rad(87.45 + 21.569231 * t)
+
+    corrected = [
+        u1 + 0.473 * np.sin(rad(2 * (u1 - u2))),
+        u2 + 1.065 * np.sin(rad(2 * (u2 - u3))),
+        u3 + 0.165 * np.sin(g),
+        u4 + 0.843 * np.sin(h),
+    ]
+    radii = [
+        5.9057 - 0.0244 * np.cos(rad(2 * (u1 - u2))),
+        9.3966 - 0.0882 * np.cos(rad(2 * (u2 - u3))),
+        14.9883 - 0.0216 * np.cos(g),
+        26.3627 - 0.1939 * np.cos(h),
+    ]
+
+    # Meeus: X (Jupiter radii) positif ke barat; template memakai DJ, positif ke timur
+    return {
+        moon: -radius * np.sin(rad(u)) / 2.0
+        for moon, u, radius in zip(GALILEAN_MOONS, corrected, radii)
+    }
+
+
+# ==================== PRECOMPUTED STORE ====================
+
+def store_root():
+    return getattr(settings, 'EPHEMERIS_ROOT', os.path.join(settings.BASE_DIR, 'var', 'ephemeris'))
+
+
+def site_key(site):
+    return f"{site['latitude']:.2f}_{site['longitude']:.2f}"
+
+
+def store_path(site):
+    return os.path.join(store_root(), f'site_{site_key(site)}.npz')
+
+
+def configured_sites():
+    """Default site plus ``settings.EPHEMERIS_SITES`` ([{'latitude', 'longitude'}, ...])"""
+    return [DEFAULT_SITE, *getattr(settings, 'EPHEMERIS_SITES', [])]
+
+
+def precomputed_sites():
+    """Sites with a store on disk (e.g. from precompute_ephemeris --lat/--lon)"""
+    try:
+        names = os.listdir(store_root())
+    except FileNotFoundError:
+        return []
+
+    sites = []
+    for name in names:
+        if not (name.startswith('site_') and name.endswith('.npz')):
+            continue
+        try:
+            latitude, longitude = map(float, name[len('site_'):-len('.npz')].split('_'))
+        except ValueError:
+            continue
+        sites.append({'latitude': latitude, 'longitude': longitude})
+    return sites
+
+
+def find_site(latitude, longitude):
+    """Configured or precomputed site nearest to a point, None if none is within SITE_TOLERANCE_DEGREES"""
+    def offset(site):
+        delta_lon = abs((site['longitude'] - longitude + 180) % 360 - 180)
+        return max(abs(site['latitude'] - latitude), delta_lon)
+
+    sites = configured_sites() + precomputed_sites()
+    nearest = min(sites, key=offset)
+    return nearest if offset(nearest) <= SITE_TOLERANCE_DEGREES else None
+
+
+def resolve_body(celestial_object):
+    """Solar-system body of a CelestialObjects row, '' when it has none"""
+    name = celestial_object['name'].strip().lower()
+    return BODY_ALIASES.get(name) or BODY_ALIASES.get(name.split(' ')[0], '')
+
+
+def trackable_objects():
+    """CelestialObjects rows that have a position: known bodies or fixed RA/Dec"""
+    from .models import CelestialObjects
+
+    rows = CelestialObjects.objects.order_by('id').values(
+        'id', 'name', 'object_type', 'magnitude', 'right_ascension', 'declination'
+    )
+    objects = []
+    for row in rows:
+        row['body'] = resolve_body(row)
+        if row['body'] or (row['right_ascension'] is not None and row['declination'] is not None):
+            objects.append(row)
+    return objects
+
+
+def objects_signature(objects):
+    """Changes whenever the set of tracked objects or their coordinates change"""
+    text = '|'.join(
+        f"{row['id']}:{row['body']}:{row['right_ascension']}:{row['declination']}" for row in objects
+    )
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+def compute_positions(objects, jd, site):
+    """
+    Hourly position table of ``objects`` at ``site``.
+
+    Returns float32 arrays ``altitude``, ``azimuth`` and ``elongation``
+    (Jupiter diameters, NaN except for Galilean moons) of shape
+    (objects, hours), plus ``sun_altitude`` of shape (hours,).
+    """
+    latitude, longitude = site['latitude'], site['longitude']
+    shape = (len(objects), len(jd))
+    altitude = np.full(shape, np.nan, dtype=np.float32)
+    azimuth = np.full(shape, np.nan, dtype=np.float32)
+    elongation = np.full(shape, np.nan, dtype=np.float32)
+
+    positions = {}
+    bodies = {row['body'] for row in objects if row['body']} | {'sun'}
+    if bodies & set(GALILEAN_MOONS):
+        bodies.add('jupiter')
+        moons = galilean_elongations(jd)
+    for body in bodies - set(GALILEAN_MOONS):
+        positions[body] = body_position(body, jd)
+
+    for index, row in enumerate(objects):
+        body = row['body']
+        if body in GALILEAN_MOONS:
+            # Dari Bumi satelit Galilean praktis berada di posisi Jupiter
+            ra, dec = positions['jupiter']
+            elongation[index] = moons[body]
+        elif body:
+            ra, dec = positions[body]
+        else:
+            ra, dec = row['right_ascension'], row['declination']
+
+        alt, az = horizontal(ra, dec, jd, latitude, longitude)
+        if body == 'moon':
+            # Paralaks Bulan bisa ~1°
+            alt = alt - np.degrees(np.arcsin(1.0 / moon_distance(jd))) * np.cos(np.radians(alt))
+        altitude[index], azimuth[index] = alt, az
+
+    sun_altitude, _ = horizontal(*positions['sun'], jd, latitude, longitude)
+    return {
+        'altitude': altitude,
+        'azimuth': azimuth,
+        'elongation': elongation,
+        'sun_altitude': sun_altitude.astype(np.float32),
+    }
+
+
+class EphemerisStore:
+    """Hourly sky table of one site, loaded from its .npz"""
+
+    def __init__(self, arrays):
+        self.start = int(arrays['start'])
+        self.ids = arrays['ids']
+        self.signature = str(arrays['signature'])
+        self.altitude = arrays['altitude']
+        self.azimuth = arrays['azimuth']
+        self.elongation = arrays['elongation']
+        self.sun_altitude = arrays['sun_altitude']
+
+    @property
+    def hours(self):
+        return len(self.sun_altitude)
+
+    def covers(self, start, end):
+        return self.start <= start and end <= self.start + self.hours * 3600
+
+    def hour_slice(self, start, end):
+        """Column range for unix seconds [start, end)"""
+        first = max(0, (int(start) - self.start) // 3600)
+        last = min(self.hours, -(-(int(end) - self.start) // 3600))
+        return slice(first, last)
+
+    def timestamps(self, columns):
+        return self.start + 3600 * np.arange(self.hours)[columns]
+
+
+_stores = {}
+
+
+def compute_store(site, start, hours, objects):
+    """Hourly table of ``site`` from unix seconds ``start``, in memory only"""
+    start = int(start) // 3600 * 3600
+    timestamps = start + 3600 * np.arange(hours)
+    arrays = compute_positions(objects, julian_date(timestamps), site)
+    arrays.update({
+        'start': np.int64(start),
+        'ids': np.array([row['id'] for row in objects], dtype=np.int64),
+        'signature': np.array(objects_signature(objects)),
+    })
+    return arrays
+
+
+def build_store(site=None, start=None, days=EPHEMERIS_DAYS, objects=None):
+    """
+    Precompute and save the hourly table of ``site`` from ``start``.
+
+    ``start`` defaults to the beginning of tonight's window (local noon,
+    see ``night_window``), so the fresh store covers tonight.
+    """
+    site = site or DEFAULT_SITE
+    objects = objects if objects is not None else trackable_objects()
+    if start is None:
+        start = night_window(current_night(site), site)[0]
+    else:
+        start = start.timestamp()
+
+    arrays = compute_store(site, start, days * 24, objects)
+
+    path = store_path(site)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.npz')
+    with os.fdopen(handle, 'wb') as target:
+        np.savez(target, **arrays)
+    os.replace(temp_path, path)
+
+    store = EphemerisStore(arrays)
+    _stores[site_key(site)] = (os.stat(path).st_mtime_ns, store)
+    return store
+
+
+def load_store(site=None):
+    site = site or DEFAULT_SITE
+    path = store_path(site)
+    try:
+        modified = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    cached = _stores.get(site_key(site))
+    if cached and cached[0] == modified:
+        return cached[1]
+
+    try:
+        with np.load(path) as archive:
+            store = EphemerisStore({name: archive[name] for name in archive.files})
+    except (OSError, KeyError, ValueError):
+        return None
+    _stores[site_key(site)] = (modified, store)
+    return store
+
+
+def night_window(night, site):
+    """Unix seconds [start, end): noon to noon in local mean time of the site"""
+    start = datetime.combine(night, time(12), tzinfo=dt_timezone.utc) - timedelta(hours=site['longitude'] / 15.0)
+    return int(start.timestamp()), int((start + timedelta(days=1)).timestamp())
+
+
+def current_night(site):
+    """Date of the evening the current noon-to-noon window at ``site`` started"""
+    return (datetime.now(dt_timezone.utc) + timedelta(hours=site['longitude'] / 15.0 - 12)).date()
+
+
+def served_nights(site):
+    """(first, last) night answered from the precomputed window of ``site``"""
+    first = current_night(site)
+    return first, first + timedelta(days=EPHEMERIS_DAYS - 1)
+
+
+def whats_up_tonight(night=None, site=None, min_altitude=MIN_OBJECT_ALTITUDE):
+    """
+    Objects above ``min_altitude`` while the sky is dark on ``night``.
+
+    Reads the precomputed store of the site. If the store does not cover
+    the night or the tracked objects changed, that one night is computed
+    in memory and a rebuild is queued for the worker; nothing is written
+    to disk here. Returns ``{'dark_start', 'dark_end', 'objects': [...]}``
+    with each object's best time, maximum altitude, azimuth at that time
+    and hours visible.
+    """
+    from core.jobs import enqueue
+
+    site = site or DEFAULT_SITE
+    night = night or current_night(site)
+    start, end = night_window(night, site)
+
+    objects = trackable_objects()
+    store = load_store(site)
+    if store is None or not store.covers(start, end) or store.signature != objects_signature(objects):
+        store = EphemerisStore(compute_store(site, start, (end - start) // 3600, objects))
+        enqueue('astronomy.precompute_ephemeris', latitude=site['latitude'], longitude=site['longitude'])
+
+    columns = store.hour_slice(start, end)
+    timestamps = store.timestamps(columns)
+    dark = store.sun_altitude[columns] < DARK_SUN_ALTITUDE
+    result = {
+        'night': night.isoformat(),
+        'site': site,
+        'dark_start': None,
+        'dark_end': None,
+        'objects': [],
+    }
+    if not dark.any():
+        return result
+
+    dark_hours = np.flatnonzero(dark)
+    result['dark_start'] = datetime.fromtimestamp(int(timestamps[dark_hours[0]]), dt_timezone.utc).isoformat()
+    result['dark_end'] = datetime.fromtimestamp(int(timestamps[dark_hours[-1]]) + 3600, dt_timezone.utc).isoformat()
+
+    altitude = np.where(dark, store.altitude[:, columns], np.nan)
+    visible = altitude >= min_altitude
+    hours_visible = visible.sum(axis=1)
+    by_id = {row['id']: row for row in objects}
+
+    for index in np.flatnonzero(hours_visible):
+        best = int(np.nanargmax(altitude[index]))
+        row = by_id.get(int(store.ids[index]))
+        if row is None:
+            continue
+        entry = {
+            'id': row['id'],
+            'name': row['name'],
+            'object_type': row['object_type'],
+            'magnitude': row['magnitude'],
+            'best_time': datetime.fromtimestamp(int(timestamps[best]), dt_timezone.utc).isoformat(),
+            'max_altitude': round(float(altitude[index, best]), 1),
+            'azimuth': round(float(store.azimuth[index, columns][best]), 1),
+            'hours_visible': int(hours_visible[index]),
+        }
+        elongation = store.elongation[index, columns][best]
+        if not np.isnan(elongation):
+            entry['elongation_dj'] = round(float(elongation), 2)
+        result['objects'].append(entry)
+
+    result['objects'].sort(key=lambda entry: -entry['max_altitude'])
+    return result
@@ -0,0 +1,177 @@
+# astronomy/exif.py
+"""
+EXIF ingestion and normalization for AstroPhoto.
+
+The hand-typed technical fields (``exposure_time``, ``aperture``,
+``focal_length``) are free text, so numeric copies are kept in indexed
+float columns. Those are filled from the text fields on every save and,
+for uploads, from the image EXIF by the background worker.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import BytesIO
+import re
+
+from django.utils import timezone
+from PIL import Image
+
+from core.images import DECODE_ERRORS
+
+# EXIF tag ids (see PIL.ExifTags.TAGS)
+TAG_MAKE = 271
+TAG_MODEL = 272
+TAG_EXIF_IFD = 0x8769
+TAG_EXPOSURE_TIME = 33434
+TAG_F_NUMBER = 33437
+TAG_ISO = 34855
+TAG_DATETIME_ORIGINAL = 36867
+TAG_OFFSET_TIME_ORIGINAL = 36881
+TAG_FOCAL_LENGTH = 37386
+
+NUMBER_PATTERN = re.compile(r'[-+]?\d+(?:[.,]\d+)?')
+FRACTION_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*/\s*(\d+(?:\.\d+)?)')
+
+
+def _to_float(value):
+    return float(value.replace(',', '.'))
+
+
+def parse_exposure(text):
+    """'1/125s' -> 0.008, '30s' -> 30.0, '2m' -> 120.0, '' -> None"""
+    if not text:
+        return None
+    text = str(text).strip().lower()
+
+    fraction = FRACTION_PATTERN.search(text)
+    if fraction:
+        denominator = float(fraction.group(2))
+        return float(fraction.group(1)) / denominator if denominator else None
+
+    number = NUMBER_PATTERN.search(text)
+    if not number:
+        return None
+    seconds = _to_float(number.group())
+    if re.search(r'\d\s*(m|min|menit)\b', text):
+        seconds *= 60
+    return seconds
+
+
+def parse_aperture(text):
+    """'f/8' -> 8.0, 'F2.8' -> 2.8"""
+    if not text:
+        return None
+    number = NUMBER_PATTERN.search(str(text))
+    return _to_float(number.group()) if number else None
+
+
+def parse_focal_length(text):
+    """'900mm' -> 900.0, '4.73' -> 4.73"""
+    if not text:
+        return None
+    number = NUMBER_PATTERN.search(str(text))
+    return _to_float(number.group()) if number else None
+
+
+def format_exposure(seconds):
+    """Human readable exposure, matching what people type in the admin"""
+    if seconds < 1:
+        denominator = 1 / seconds
+        if abs(denominator - round(denominator)) < 0.01:
+            return f"1/{round(denominator)}s"
+    return f"{seconds:g}s"
+
+
+def _parse_exif_datetime(value, offset=None):
+    try:
+        captured = datetime.strptime(str(value).strip(), '%Y:%m:%d %H:%M:%S')
+    except ValueError:
+        return None
+
+    if offset:
+        match = re.fullmatch(r'([+-])(\d{2}):(\d{2})', str(offset).strip())
+        if match:
+            sign = 1 if match.group(1) == '+' else -1
+            delta = timedelta(hours=int(match.group(2)), minutes=int(match.group(3)))
+            return captured.replace(tzinfo=dt_timezone(sign * delta))
+
+    return timezone.make_aware(captured)
+
+
+def read_exif(field_file):
+    """
+    Read the EXIF of an image field file once and return normalized values.
+
+    Keys: exposure_seconds, aperture_f, focal_length_mm, iso, camera,
+    captured_at. Missing tags are simply left out; a file Pillow cannot
+    decode gives ``{}``. Storage errors (OSError) propagate so the job
+    queue retries instead of marking the photo as ingested.
+    """
+    with field_file.storage.open(field_file.name, 'rb') as source:
+        data = source.read()
+
+    try:
+        exif = Image.open(BytesIO(data)).getexif()
+    except DECODE_ERRORS:
+        return {}
+
+    tags = dict(exif)
+    tags.update(exif.get_ifd(TAG_EXIF_IFD))
+
+    result = {}
+
+    exposure = tags.get(TAG_EXPOSURE_TIME)
+    if exposure:
+        result['exposure_seconds'] = float(exposure)
+
+    f_number = tags.get(TAG_F_NUMBER)
+    if f_number:
+        result['aperture_f'] = float(f_number)
+
+    focal_length = tags.get(TAG_FOCAL_LENGTH)
+    if focal_length:
+        result['focal_length_mm'] = float(focal_length)
+
+    iso = tags.get(TAG_ISO)
+    if isinstance(iso, (tuple, list)):
+        iso = iso[0] if iso else None
+    if iso:
+        result['iso'] = int(iso)
+
+    make = str(tags.get(TAG_MAKE, '')).strip()
+    model = str(tags.get(TAG_MODEL, '')).strip()
+    if model:
+        result['camera'] = model if model.lower().startswith(make.lower()) else f"{make} {model}".strip()
+
+    captured_at = _parse_exif_datetime(
+        tags.get(TAG_DATETIME_ORIGINAL, ''), tags.get(TAG_OFFSET_TIME_ORIGINAL)
+    )
+    if captured_at:
+        result['captured_at'] = captured_at.isoformat()
+
+    return result
+
+
+# AstroPhoto fields written by apply_exif()
+APPLIED_FIELDS = ('exposure_time', 'aperture', 'focal_length', 'iso', 'camera', 'exact_time', 'exif_data')
+
+
+def apply_exif(photo, exif):
+    """
+    Fill blank technical fields of ``photo`` from a read_exif() dict.
+
+    Values typed by hand are never overwritten. The numeric columns are
+    derived from the text fields when the photo is saved.
+    """
+    if not photo.exposure_time and 'exposure_seconds' in exif:
+        photo.exposure_time = format_exposure(exif['exposure_seconds'])
+    if not photo.aperture and 'aperture_f' in exif:
+        photo.aperture = f"f/{exif['aperture_f']:g}"
+    if not photo.focal_length and 'focal_length_mm' in exif:
+        photo.focal_length = f"{exif['focal_length_mm']:g}"
+    if photo.iso is None and 'iso' in exif:
+        photo.iso = exif['iso']
+    if not photo.camera and 'camera' in exif:
+        photo.camera = exif['camera'][:100]
+    if photo.exact_time is None and 'captured_at' in exif:
+        photo.exact_time = datetime.fromisoformat(exif['captured_at'])
+
+    photo.exif_data = exif
@@ -0,0 +1,158 @@
+# astronomy/geo.py
+"""
+Geohash grid for observation locations, without PostGIS.
+
+Every ObservationLog with coordinates stores the geohash of its site in an
+indexed CharField. A bounding box is covered by at most MAX_COVER_CELLS
+geohash cells; each cell is one range scan on that index, and only those
+candidates get the exact distance / box check.
+"""
+import math
+
+from django.db.models import Q
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# ~4.8 m x 4.8 m cells, finer than the 6 decimals stored for lat/lon need
+GEOHASH_PRECISION = 9
+
+# Upper bound on prefix ranges per query
+MAX_COVER_CELLS = 16
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Geohash of a point"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    code, bits, value, even = [], 0, 0, True
+
+    while len(code) < precision:
+        target, bounds = (longitude, lon_range) if even else (latitude, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        if target >= middle:
+            value = value * 2 + 1
+            bounds[0] = middle
+        else:
+            value = value * 2
+            bounds[1] = middle
+        even = not even
+
+        bits += 1
+        if bits == 5:
+            code.append(BASE32[value])
+            bits, value = 0, 0
+
+    return ''.join(code)
+
+
+def cell_size(precision):
+    """(height, width) in degrees of a geohash cell"""
+    lon_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lon_bits
+
+
+def _boxes(south, west, north, east):
+    """Split a box crossing the antimeridian into two"""
+    south, north = max(south, -90.0), min(north, 90.0)
+    if west <= east:
+        return [(south, west, north, east)]
+    return [(south, west, north, 180.0), (south, -180.0, north, east)]
+
+
+def _cells(south, west, north, east, precision):
+    height, width = cell_size(precision)
+    rows = range(math.floor((south + 90) / height), math.floor((min(north, 89.999999) + 90) / height) + 1)
+    columns = range(math.floor((west + 180) / width), math.floor((min(east, 179.999999) + 180) / width) + 1)
+    return len(rows) * len(columns), (
+        ((row + 0.5) * height - 90, (column + 0.5) * width - 180)
+        for row in rows for column in columns
+    )
+
+
+def cover(south, west, north, east):
+    """Geohash prefixes whose cells cover the box"""
+    boxes = _boxes(south, west, north, east)
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        counted = [_cells(*box, precision) for box in boxes]
+        if sum(count for count, _ in counted) <= MAX_COVER_CELLS:
+            return sorted({encode(lat, lon, precision) for _, centres in counted for lat, lon in centres})
+    return ['']
+
+
+def radius_box(latitude, longitude, radius_km):
+    """(south, west, north, east) enclosing a circle"""
+    delta_lat = radius_km / KM_PER_DEGREE
+    cos_lat = math.cos(math.radians(latitude))
+    if abs(latitude) + delta_lat >= 90 or cos_lat < 1e-6:
+        return max(latitude - delta_lat, -90.0), -180.0, min(latitude + delta_lat, 90.0), 180.0
+
+    delta_lon = min(radius_km / (KM_PER_DEGREE * cos_lat), 180.0)
+    west, east = longitude - delta_lon, longitude + delta_lon
+    if delta_lon >= 180.0:
+        return latitude - delta_lat, -180.0, latitude + delta_lat, 180.0
+    return latitude - delta_lat, (west + 540) % 360 - 180, latitude + delta_lat, (east + 540) % 360 - 180
+
+
+def distance_km(lat1, lon1, lat2, lon2):
+    """Great-circle (haversine) distance"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def in_box(latitude, longitude, south, west, north, east):
+    if not south <= latitude <= north:
+        return False
+    if west <= east:
+        return west <= longitude <= east
+    return longitude >= west or longitude <= east
+
+
+def prefix_filter(prefixes):
+    """
+    Q object matching geohashes that start with any of ``prefixes``.
+
+    Written as ranges rather than ``startswith``: SQLite never uses an
+    index for ``LIKE ... ESCAPE`` and PostgreSQL only with a pattern-ops
+    index, while a BETWEEN on the stored fixed-length hashes is a plain
+    B-tree range scan everywhere.
+    """
+    query = Q()
+    for prefix in prefixes:
+        query |= Q(geohash__range=(prefix, prefix.ljust(GEOHASH_PRECISION, BASE32[-1])))
+    return query
+
+
+MAP_FIELDS = ('id', 'title', 'slug', 'observation_date', 'object_name', 'location', 'latitude', 'longitude')
+
+
+def logs_in_box(queryset, south, west, north, east, limit=None):
+    """Rows (dicts) of ``queryset`` inside the box, newest first"""
+    candidates = queryset.exclude(geohash='').filter(
+        prefix_filter(cover(south, west, north, east))
+    ).values(*MAP_FIELDS)
+    rows = []
+    for row in candidates:
+        if in_box(float(row['latitude']), float(row['longitude']), south, west, north, east):
+            rows.append(row)
+            if limit and len(rows) >= limit:
+                break
+    return rows
+
+
+def logs_near(queryset, latitude, longitude, radius_km, limit=None):
+    """Rows (dicts) of ``queryset`` within ``radius_km``, nearest first, with ``distance_km``"""
+    candidates = queryset.exclude(geohash='').filter(
+        prefix_filter(cover(*radius_box(latitude, longitude, radius_km)))
+    ).order_by().values(*MAP_FIELDS)
+    rows = []
+    for row in candidates:
+        distance = distance_km(latitude, longitude, float(row['latitude']), float(row['longitude']))
+        if distance <= radius_km:
+            row['distance_km'] = round(distance, 3)
+            rows.append(row)
+    rows.sort(key=lambda row: row['distance_km'])
+    return rows[:limit] if limit else rows
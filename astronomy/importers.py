@@ -0,0 +1,230 @@
+# astronomy/importers.py
+"""
+Bulk import of ResearchDataEntry rows from CSV or JSON.
+
+Rows are read one at a time, validated against the project's template
+fields and written with ``bulk_create`` in batches, so a season of
+estimates loads in seconds and memory stays flat regardless of file size.
+
+CSV needs an ``observation_datetime`` column plus one column per template
+field (either the field name, ``io_position``, or its data key, ``io``);
+``data_quality`` and ``notes`` are optional. JSON input is either JSON
+Lines (streamed) or a single array of objects with the same keys.
+
+    from astronomy.importers import import_entries
+    with open('estimates.csv', newline='') as source:
+        result = import_entries(project, source)
+"""
+from dataclasses import dataclass, field as dataclass_field
+from itertools import chain
+import csv
+import json
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from core.jobs import enqueue
+
+from .analysis import field_key, get_template_config
+from .columns import invalidate_snapshot
+
+BATCH_SIZE = 1000
+
+# Errors kept in the result; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+# Fields of the data entry forms, used when a project has no template
+DEFAULT_FIELDS = {
+    'variable_star': [
+        {'name': 'magnitude', 'type': 'float', 'required': True},
+        {'name': 'comparison_star', 'type': 'str', 'required': False},
+    ],
+    'meteor': [
+        {'name': 'meteor_count', 'type': 'int', 'required': True},
+        {'name': 'observation_duration', 'type': 'int', 'required': True},
+        {'name': 'sporadic_count', 'type': 'int', 'required': False},
+        {'name': 'fireball_count', 'type': 'int', 'required': False},
+        {'name': 'limiting_magnitude', 'type': 'float', 'required': False},
+    ],
+}
+
+FIELD_PARSERS = {
+    'float': float,
+    'int': int,
+    'str': str,
+}
+
+
+class ImportRowError(ValueError):
+    pass
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    failed: int = 0
+    errors: list = dataclass_field(default_factory=list)
+
+    def add_error(self, line, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+
+def import_fields(project):
+    """Template fields a row is validated against"""
+    return get_template_config(project).get('fields') or DEFAULT_FIELDS.get(project.research_type, [])
+
+
+def _is_blank(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def parse_observation_datetime(value):
+    if isinstance(value, str):
+        value = value.strip()
+        parsed = parse_datetime(value)
+        if parsed is None and parse_date(value) is not None:
+            parsed = parse_datetime(f'{value}T00:00')
+    else:
+        parsed = None
+
+    if parsed is None:
+        raise ImportRowError(f'invalid observation_datetime {value!r}')
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def parse_field(field, value):
+    parser = FIELD_PARSERS.get(field.get('type', 'float'), float)
+    try:
+        if parser is int and isinstance(value, str):
+            # '12.0' dari spreadsheet tetap diterima sebagai int
+            number = float(value)
+            if not number.is_integer():
+                raise ValueError
+            return int(number)
+        return parser(value.strip() if isinstance(value, str) else value)
+    except (TypeError, ValueError):
+        raise ImportRowError(f"invalid {field.get('type', 'float')} for {field['name']}: {value!r}")
+
+
+def build_entry(project, fields, row):
+    """Validate one raw row (dict) and return an unsaved ResearchDataEntry"""
+    from .models import ObservationLog, ResearchDataEntry
+
+    observed = parse_observation_datetime(row.get('observation_datetime'))
+
+    data = {}
+    for field in fields:
+        key = field_key(field)
+        value = row.get(field['name'], row.get(key))
+        if _is_blank(value):
+            if field.get('required'):
+                raise ImportRowError(f"missing required field {field['name']}")
+            continue
+        data[key] = parse_field(field, value)
+
+    if not data:
+        raise ImportRowError('row has no data values')
+
+    quality = row.get('data_quality')
+    if _is_blank(quality):
+        quality = None
+    else:
+        quality = parse_field({'name': 'data_quality', 'type': 'int'}, quality)
+        if quality not in dict(ObservationLog.SEEING_CONDITIONS):
+            raise ImportRowError(f'data_quality must be 1-5, got {quality}')
+
+    return ResearchDataEntry(
+        project=project,
+        observation_datetime=observed,
+        days_from_start=ResearchDataEntry.compute_days_from_start(observed, project.start_date),
+        data=data,
+        data_quality=quality,
+        notes=str(row.get('notes') or ''),
+    )
+
+
+def read_csv_rows(source):
+    """(line number, row dict) pairs from a CSV text stream"""
+    reader = csv.DictReader(source)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def read_json_rows(source):
+    """(line number, row dict) pairs from JSON Lines or a JSON array"""
+    first = source.readline()
+    while first and not first.strip():
+        first = source.readline()
+
+    if first.lstrip().startswith('['):
+        # Array biasa tidak bisa di-stream dengan modul json, dibaca utuh
+        for index, row in enumerate(json.loads(first + source.read()), start=1):
+            yield index, row
+        return
+
+    for line_number, line in enumerate(chain([first], source), start=1):
+        if line.strip():
+            try:
+                yield line_number, json.loads(line)
+            except ValueError as e:
+                yield line_number, ImportRowError(f'invalid JSON: {e}')
+
+
+READERS = {
+    'csv': read_csv_rows,
+    'json': read_json_rows,
+}
+
+
+def import_entries(project, source, file_format='csv', batch_size=BATCH_SIZE, strict=False):
+    """
+    Import every row of the text stream ``source`` into ``project``.
+
+    Invalid rows are skipped and reported in the result; with ``strict``
+    the first invalid row aborts the import and nothing is written.
+    """
+    from .models import ResearchDataEntry
+
+    fields = import_fields(project)
+    result = ImportResult()
+    batch = []
+
+    def flush():
+        ResearchDataEntry.objects.bulk_create(batch, batch_size=batch_size)
+        result.created += len(batch)
+        batch.clear()
+
+    with transaction.atomic():
+        for line, row in READERS[file_format](source):
+            try:
+                if isinstance(row, Exception):
+                    raise row
+                if not isinstance(row, dict):
+                    raise ImportRowError('row is not an object')
+                batch.append(build_entry(project, fields, row))
+            except ImportRowError as e:
+                if strict:
+                    raise ImportRowError(f'line {line}: {e}') from e
+                result.add_error(line, str(e))
+                continue
+
+            if len(batch) >= batch_size:
+                flush()
+
+        if batch:
+            flush()
+
+        # bulk_create melewati save(), snapshot kolom dibangun ulang sekali
+        project_id = project.pk
+        transaction.on_commit(lambda: invalidate_snapshot(project_id))
+        if result.created:
+            transaction.on_commit(lambda: enqueue('astronomy.detect_outliers', project_id=project_id))
+            if project.research_type == 'meteor':
+                transaction.on_commit(lambda: enqueue('astronomy.update_zhr', project_id=project_id))
+
+    return result
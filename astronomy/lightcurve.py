@@ -0,0 +1,218 @@
+# astronomy/lightcurve.py
+"""
+Light-curve analysis for variable star projects.
+
+The magnitude series comes from the columnar snapshot; the period search
+reuses the vectorized sinusoid periodogram of the orbital analysis, and
+the result is phase folded and binned with NumPy. Curves sent to the
+browser are downsampled with LTTB (Largest-Triangle-Three-Buckets) to a
+fixed point budget, so a season of estimates is never shipped raw.
+"""
+import math
+
+import numpy as np
+
+from .analysis import MIN_POINTS, describe_fit, fit_period, sinusoid_periodogram, trial_periods
+from .columns import get_snapshot
+from .outliers import reset_statistics
+
+MAGNITUDE_KEY = 'magnitude'
+
+# Default period search range in days (pulsating stars to Miras)
+MIN_PERIOD_DAYS = 0.1
+MAX_PERIOD_FRACTION = 0.5   # of the observing baseline
+
+DEFAULT_POINT_BUDGET = 500
+MAX_POINT_BUDGET = 2000
+DEFAULT_PHASE_BINS = 50
+
+LIGHT_CURVE_ANALYSIS_TITLE = 'Light Curve (period search)'
+
+
+def lttb(x, y, threshold):
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets.
+
+    ``x`` must be sorted. The first and last points are always kept; every
+    bucket in between keeps the point forming the largest triangle with
+    the previously kept point and the average of the next bucket.
+    """
+    count = len(x)
+    if threshold >= count or threshold < 3:
+        return np.arange(count)
+
+    edges = np.append(np.linspace(1, count - 1, threshold - 1).astype(int), count)
+    kept = np.empty(threshold, dtype=int)
+    kept[0], kept[-1] = 0, count - 1
+
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_start, next_end = edges[bucket + 1], edges[bucket + 2]
+        next_x = x[next_start:next_end].mean()
+        next_y = y[next_start:next_end].mean()
+
+        area = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        kept[bucket + 1] = previous
+
+    return kept
+
+
+def phase_fold(days, period, epoch=0.0):
+    """Phase in [0, 1) of each observation"""
+    return np.mod((np.asarray(days, dtype=float) - epoch) / period, 1.0)
+
+
+def bin_phase(phase, values, bins):
+    """Mean, standard deviation and count per phase bin (empty bins are NaN)"""
+    index = np.minimum((phase * bins).astype(int), bins - 1)
+    counts = np.bincount(index, minlength=bins)
+    sums = np.bincount(index, weights=values, minlength=bins)
+    squares = np.bincount(index, weights=values ** 2, minlength=bins)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / counts
+        spread = np.sqrt(np.maximum(squares / counts - means ** 2, 0.0))
+
+    centers = (np.arange(bins) + 0.5) / bins
+    return centers, means, spread, counts
+
+
+def brightest_epoch(fit):
+    """Day of maximum brightness (minimum magnitude) of a sinusoid fit"""
+    omega = 2 * math.pi / fit['period']
+    # a·sin + b·cos = R·cos(ωt - φ), φ = atan2(a, b); minimum at ωt = φ + π
+    return (math.atan2(fit['sin'], fit['cos']) + math.pi) / omega
+
+
+def magnitude_series(project):
+    days, columns = get_snapshot(project.pk).series([MAGNITUDE_KEY])
+    magnitudes = columns[MAGNITUDE_KEY]
+    usable = ~np.isnan(magnitudes)
+    return days[usable], magnitudes[usable]
+
+
+def search_range(days, min_period=None, max_period=None):
+    baseline = float(days.max() - days.min()) if len(days) else 0.0
+    return min_period or MIN_PERIOD_DAYS, max_period or baseline * MAX_PERIOD_FRACTION
+
+
+def search_period(days, magnitudes, min_period=None, max_period=None):
+    """
+    Sweep the light-curve period range once.
+
+    Returns ``(fit, periods, power)`` with the periodogram ordered from
+    short to long periods; ``fit`` is None when there is too little data.
+    """
+    periods = trial_periods(days, *search_range(days, min_period, max_period))
+    if len(days) < MIN_POINTS or not len(periods):
+        return None, np.empty(0), np.empty(0)
+
+    power, coefficients = sinusoid_periodogram(days, magnitudes, periods)
+    best = int(np.argmax(power))
+    fit = describe_fit(periods[best], power[best], coefficients[best], len(days))
+    return fit, periods[::-1], power[::-1]
+
+
+def _pairs(*columns, digits=4):
+    return [
+        [None if math.isnan(value) else round(float(value), digits) for value in row]
+        for row in zip(*columns)
+    ]
+
+
+def light_curve(project, points=DEFAULT_POINT_BUDGET, bins=DEFAULT_PHASE_BINS,
+                period=None, min_period=None, max_period=None):
+    """
+    Plot data of a variable star project.
+
+    Returns the raw and phase-folded curves downsampled to ``points`` each,
+    the binned folded curve, a downsampled periodogram and the fitted
+    period. ``period`` skips the search and folds at a known period.
+    """
+    days, magnitudes = magnitude_series(project)
+    points = max(3, min(points, MAX_POINT_BUDGET))
+
+    raw = lttb(days, magnitudes, points)
+    result = {
+        'n_points': int(len(days)),
+        'raw': _pairs(days[raw], magnitudes[raw]),
+        'period': None,
+        'folded': [],
+        'binned': [],
+        'periodogram': [],
+    }
+
+    periods = power = np.empty(0)
+    if period:
+        fit = fit_period(days, magnitudes, period * 0.999, period * 1.001)
+    else:
+        fit, periods, power = search_period(days, magnitudes, min_period, max_period)
+    if fit is None:
+        return result
+
+    epoch = brightest_epoch(fit)
+    phase = phase_fold(days, fit['period'], epoch)
+    order = np.argsort(phase)
+    phase, folded_magnitudes = phase[order], magnitudes[order]
+    folded = lttb(phase, folded_magnitudes, points)
+
+    centers, means, spread, counts = bin_phase(phase, folded_magnitudes, bins)
+
+    if len(periods):
+        sweep = lttb(periods, power, points)
+        result['periodogram'] = _pairs(periods[sweep], power[sweep], digits=5)
+
+    result.update({
+        'period': round(fit['period'], 5),
+        'amplitude': round(fit['amplitude'], 3),
+        'mean_magnitude': round(fit['offset'], 3),
+        'power': round(fit['power'], 3),
+        'epoch': round(epoch, 4),
+        'folded': _pairs(phase[folded], folded_magnitudes[folded]),
+        'binned': [
+            row + [int(count)]
+            for row, count in zip(_pairs(centers, means, spread), counts)
+            if count
+        ],
+    })
+    return result
+
+
+def run_light_curve_analysis(project):
+    """Store the best period of a variable star project as a ResearchAnalysis"""
+    from .models import ResearchAnalysis
+
+    days, magnitudes = magnitude_series(project)
+    fit, _, _ = search_period(days, magnitudes)
+    if fit is None:
+        return None
+
+    reset_statistics(project, MAGNITUDE_KEY, {
+        'period': fit['period'], 'sin': fit['sin'], 'cos': fit['cos'], 'offset': fit['offset'],
+    })
+
+    analysis, _ = ResearchAnalysis.objects.update_or_create(
+        project=project,
+        analysis_type='light_curve',
+        title=LIGHT_CURVE_ANALYSIS_TITLE,
+        defaults={
+            'results': {
+                'period': round(fit['period'], 5),
+                'amplitude': round(fit['amplitude'], 3),
+                'mean_magnitude': round(fit['offset'], 3),
+                'epoch': round(brightest_epoch(fit), 4),
+                'power': round(fit['power'], 3),
+            },
+            'methodology': (
+                f"Least-squares sinusoid period search over {fit['n_points']} validated, "
+                f"non-outlier magnitude estimates, periods {MIN_PERIOD_DAYS} d to "
+                f"{MAX_PERIOD_FRACTION:g}x the observing baseline. Epoch = maximum brightness."
+            ),
+        }
+    )
+    return analysis
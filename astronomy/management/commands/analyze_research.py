@@ -0,0 +1,35 @@
+# astronomy/management/commands/analyze_research.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from astronomy.analysis import run_orbital_analysis
+from astronomy.models import ResearchProject
+
+
+class Command(BaseCommand):
+    help = 'Fit orbital periods and verify Kepler\'s third law for orbital research projects'
+
+    def add_arguments(self, parser):
+        parser.add_argument('slugs', nargs='*',
+                            help='Project slugs (default: every orbital project)')
+
+    def handle(self, *args, **options):
+        projects = ResearchProject.objects.filter(research_type='orbital')
+        if options['slugs']:
+            projects = projects.filter(slug__in=options['slugs'])
+            if not projects.exists():
+                raise CommandError('No orbital project matches the given slugs')
+
+        for project in projects:
+            started = time.perf_counter()
+            analyses = run_orbital_analysis(project)
+            elapsed = (time.perf_counter() - started) * 1000
+
+            if not analyses:
+                self.stdout.write(self.style.WARNING(f'{project.slug}: not enough data'))
+                continue
+            periods = analyses[0].results
+            self.stdout.write(self.style.SUCCESS(
+                f'{project.slug}: {periods} ({elapsed:.1f} ms)'
+            ))
@@ -0,0 +1,54 @@
+# astronomy/management/commands/import_research_data.py
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from astronomy.importers import BATCH_SIZE, ImportRowError, import_entries
+from astronomy.models import ResearchProject
+
+
+class Command(BaseCommand):
+    help = 'Bulk import research data entries from a CSV, JSON or JSON Lines file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('slug', help='ResearchProject slug')
+        parser.add_argument('path', help='CSV (.csv) or JSON / JSON Lines (.json, .jsonl) file')
+        parser.add_argument('--format', choices=['csv', 'json'],
+                            help='Override the format guessed from the file extension')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--strict', action='store_true',
+                            help='Abort without writing anything on the first invalid row')
+
+    def handle(self, *args, **options):
+        project = ResearchProject.objects.filter(slug=options['slug']).first()
+        if project is None:
+            raise CommandError(f"Research project '{options['slug']}' not found")
+
+        path = options['path']
+        file_format = options['format'] or ('csv' if path.lower().endswith('.csv') else 'json')
+        if not os.path.exists(path):
+            raise CommandError(f'{path} does not exist')
+
+        started = time.perf_counter()
+        try:
+            with open(path, newline='', encoding='utf-8-sig') as source:
+                result = import_entries(
+                    project, source, file_format=file_format,
+                    batch_size=options['batch_size'], strict=options['strict']
+                )
+        except ImportRowError as e:
+            raise CommandError(f'Import aborted, nothing written: {e}')
+        elapsed = time.perf_counter() - started
+
+        for line, message in result.errors:
+            self.stdout.write(self.style.WARNING(f'line {line}: {message}'))
+        if result.failed > len(result.errors):
+            self.stdout.write(self.style.WARNING(
+                f'... and {result.failed - len(result.errors)} more invalid row(s)'
+            ))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{result.created} entr(ies) imported into {project.slug}, '
+            f'{result.failed} skipped ({elapsed:.2f}s)'
+        ))
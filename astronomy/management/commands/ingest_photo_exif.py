@@ -0,0 +1,27 @@
+# astronomy/management/commands/ingest_photo_exif.py
+from django.core.management.base import BaseCommand
+
+from astronomy.models import AstroPhoto
+from core.jobs import enqueue
+
+
+class Command(BaseCommand):
+    help = 'Backfill EXIF-derived technical data for AstroPhotos that were never ingested'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--now', action='store_true',
+                            help='Read EXIF inline instead of queueing worker jobs')
+
+    def handle(self, *args, **options):
+        photos = AstroPhoto.objects.exclude(image='').filter(exif_ingested_at__isnull=True)
+
+        count = 0
+        for photo in photos.iterator(chunk_size=100):
+            if options['now']:
+                photo.ingest_exif()
+            else:
+                enqueue('astronomy.process_photo', pk=photo.pk)
+            count += 1
+
+        action = 'ingested' if options['now'] else 'queued'
+        self.stdout.write(self.style.SUCCESS(f'{count} photo(s) {action}'))
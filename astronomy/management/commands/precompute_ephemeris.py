@@ -0,0 +1,34 @@
+# astronomy/management/commands/precompute_ephemeris.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from astronomy.ephemeris import DEFAULT_SITE, EPHEMERIS_DAYS, build_store
+
+
+class Command(BaseCommand):
+    help = 'Precompute hourly positions of every celestial object for observation planning'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=EPHEMERIS_DAYS,
+                            help=f'Days ahead to precompute (default: {EPHEMERIS_DAYS})')
+        parser.add_argument('--lat', type=float, default=DEFAULT_SITE['latitude'],
+                            help='Site latitude in degrees (default: Bekasi)')
+        parser.add_argument('--lon', type=float, default=DEFAULT_SITE['longitude'],
+                            help='Site longitude in degrees, east positive (default: Bekasi)')
+
+    def handle(self, *args, **options):
+        if options['days'] < 1:
+            raise CommandError('--days must be at least 1')
+        if not -90 <= options['lat'] <= 90 or not -180 <= options['lon'] <= 180:
+            raise CommandError('Latitude must be within ±90 and longitude within ±180')
+
+        site = {'latitude': options['lat'], 'longitude': options['lon']}
+        started = time.perf_counter()
+        store = build_store(site, days=options['days'])
+        elapsed = (time.perf_counter() - started) * 1000
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(store.ids)} objects x {store.hours} hours for '
+            f"{site['latitude']:.2f}, {site['longitude']:.2f} ({elapsed:.1f} ms)"
+        ))
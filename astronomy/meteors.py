@@ -0,0 +1,307 @@
+# astronomy/meteors.py
+"""
+Zenithal Hourly Rate (ZHR) pipeline for meteor shower projects.
+
+Every entry's shower count is corrected for limiting magnitude, radiant
+elevation and cloud cover (IMO method)::
+
+    ZHR = N · r^(6.5 - LM) / (T_eff · sin(h)^γ · (1 - F))
+
+and entries are combined per night as ΣN / Σ(T_eff / C). The radiant
+elevation is computed vectorized from the observation time and location;
+nights run noon to noon in local mean time of the observing site.
+
+Results are cached as one ResearchAnalysis row per night; saving an entry
+only recomputes its own night (see the astronomy.update_zhr task).
+
+Project configuration (``ResearchProject.data_template`` or the template)::
+
+    {"shower": "perseids"}                      # radiant and r from SHOWERS
+    {"radiant": {"ra": 48.2, "dec": 58.1}, "population_index": 2.2,
+     "location": {"latitude": -6.24, "longitude": 106.98}}
+"""
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+import math
+
+import numpy as np
+from django.db import transaction
+
+from .analysis import get_template_config
+
+# Radiant (deg, J2000, at maximum) and population index r of major showers (IMO)
+SHOWERS = {
+    'quadrantids': {'name': 'Quadrantids', 'ra': 230.0, 'dec': 49.0, 'r': 2.1},
+    'lyrids': {'name': 'Lyrids', 'ra': 271.0, 'dec': 34.0, 'r': 2.1},
+    'eta_aquariids': {'name': 'Eta Aquariids', 'ra': 338.0, 'dec': -1.0, 'r': 2.4},
+    'southern_delta_aquariids': {'name': 'Southern Delta Aquariids', 'ra': 340.0, 'dec': -16.0, 'r': 3.2},
+    'perseids': {'name': 'Perseids', 'ra': 48.0, 'dec': 58.0, 'r': 2.2},
+    'orionids': {'name': 'Orionids', 'ra': 95.0, 'dec': 16.0, 'r': 2.5},
+    'leonids': {'name': 'Leonids', 'ra': 152.0, 'dec': 22.0, 'r': 2.5},
+    'geminids': {'name': 'Geminids', 'ra': 112.0, 'dec': 33.0, 'r': 2.6},
+    'ursids': {'name': 'Ursids', 'ra': 217.0, 'dec': 76.0, 'r': 3.0},
+}
+
+# Bekasi, dipakai kalau entry tidak punya ObservationLog dengan koordinat
+DEFAULT_LOCATION = {'latitude': -6.2383, 'longitude': 106.9756}
+
+DEFAULT_POPULATION_INDEX = 2.5
+REFERENCE_LIMITING_MAGNITUDE = 6.5
+DEFAULT_LIMITING_MAGNITUDE = 6.5
+ZENITH_EXPONENT = 1.0   # γ
+
+# IMO: data with the radiant below 20° is not used for ZHR
+MIN_RADIANT_ALTITUDE = 20.0
+
+NIGHT_TITLE = 'ZHR night {night}'
+SUMMARY_TITLE = 'ZHR Summary'
+
+UNIX_EPOCH_JD = 2440587.5
+J2000_JD = 2451545.0
+
+
+def shower_config(project, config=None):
+    """Radiant, population index and site of a meteor project"""
+    config = config if config is not None else get_template_config(project)
+    shower = SHOWERS.get(str(config.get('shower', '')).lower().replace(' ', '_'), {})
+    radiant = config.get('radiant') or ({'ra': shower['ra'], 'dec': shower['dec']} if shower else None)
+
+    return {
+        'shower': shower.get('name', config.get('shower', '')),
+        'radiant': radiant,
+        'population_index': float(config.get('population_index') or shower.get('r', DEFAULT_POPULATION_INDEX)),
+        'location': config.get('location') or DEFAULT_LOCATION,
+    }
+
+
+def julian_date(timestamps):
+    """Unix seconds -> Julian date"""
+    return np.asarray(timestamps, dtype=float) / 86400.0 + UNIX_EPOCH_JD
+
+
+def radiant_altitude(jd, ra, dec, latitude, longitude):
+    """Altitude (deg) of a fixed RA/Dec for arrays of Julian dates and sites"""
+    sidereal = 280.46061837 + 360.98564736629 * (jd - J2000_JD)
+    hour_angle = np.radians(sidereal + longitude - ra)
+    lat, dec = np.radians(latitude), math.radians(dec)
+    sin_altitude = np.sin(lat) * math.sin(dec) + np.cos(lat) * math.cos(dec) * np.cos(hour_angle)
+    return np.degrees(np.arcsin(np.clip(sin_altitude, -1.0, 1.0)))
+
+
+def correction_factors(limiting_magnitude, altitude, cloud_fraction, population_index):
+    """Combined IMO correction C per entry (ZHR = N·C / T_eff)"""
+    perception = population_index ** (REFERENCE_LIMITING_MAGNITUDE - limiting_magnitude)
+    elevation = np.sin(np.radians(altitude)) ** ZENITH_EXPONENT
+    return perception / (elevation * (1.0 - cloud_fraction))
+
+
+def night_of(moment, longitude):
+    """Observing night (date of the evening) in local mean time of the site"""
+    local = moment.astimezone(dt_timezone.utc) + timedelta(hours=longitude / 15.0)
+    return (local - timedelta(hours=12)).date()
+
+
+def night_bounds(night, longitude):
+    """UTC [start, end) of a night, noon to noon local mean time"""
+    start = datetime.combine(night, time(12), tzinfo=dt_timezone.utc) - timedelta(hours=longitude / 15.0)
+    return start, start + timedelta(days=1)
+
+
+def _float(value, default=math.nan):
+    if isinstance(value, bool) or value is None:
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def load_entries(queryset):
+    """Columns needed for the ZHR of every usable entry in ``queryset``"""
+    rows = list(
+        queryset
+        .filter(is_outlier=False, is_validated=True)
+        .values_list(
+            'observation_datetime', 'data', 'observation__latitude',
+            'observation__longitude', 'observation__cloud_cover',
+        )
+    )
+    data = [row[1] or {} for row in rows]
+    return {
+        'timestamps': np.array([row[0].timestamp() for row in rows], dtype=float),
+        'meteors': np.array([_float(d.get('meteor_count'), 0.0) for d in data]),
+        'sporadic': np.array([_float(d.get('sporadic_count'), 0.0) for d in data]),
+        'minutes': np.array([_float(d.get('observation_duration'), 0.0) for d in data]),
+        'limiting_magnitude': np.array([_float(d.get('limiting_magnitude')) for d in data]),
+        'radiant_altitude': np.array([_float(d.get('radiant_altitude')) for d in data]),
+        'latitude': np.array([_float(row[2]) for row in rows]),
+        'longitude': np.array([_float(row[3]) for row in rows]),
+        'cloud_cover': np.array([
+            _float(d.get('cloud_cover'), _float(row[4], 0.0)) for row, d in zip(rows, data)
+        ]),
+    }
+
+
+def entry_corrections(entries, shower):
+    """
+    Per-entry shower count, effective hours, correction factor and radiant
+    altitude, plus the mask of entries usable for ZHR.
+    """
+    site = shower['location']
+    latitude = np.where(np.isnan(entries['latitude']), site['latitude'], entries['latitude'])
+    longitude = np.where(np.isnan(entries['longitude']), site['longitude'], entries['longitude'])
+
+    altitude = entries['radiant_altitude']
+    if shower['radiant']:
+        computed = radiant_altitude(
+            julian_date(entries['timestamps']),
+            shower['radiant']['ra'], shower['radiant']['dec'], latitude, longitude,
+        )
+        altitude = np.where(np.isnan(altitude), computed, altitude)
+
+    limiting_magnitude = np.where(
+        np.isnan(entries['limiting_magnitude']), DEFAULT_LIMITING_MAGNITUDE, entries['limiting_magnitude']
+    )
+    cloud = np.clip(entries['cloud_cover'] / 100.0, 0.0, 0.95)
+    shower_count = np.maximum(entries['meteors'] - entries['sporadic'], 0.0)
+    hours = entries['minutes'] / 60.0
+
+    usable = (hours > 0) & (altitude >= MIN_RADIANT_ALTITUDE)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        correction = np.where(
+            usable, correction_factors(limiting_magnitude, altitude, cloud, shower['population_index']), np.nan
+        )
+    return shower_count, hours, correction, altitude, limiting_magnitude, usable
+
+
+def night_zhr(entries, shower):
+    """ZHR of one night's entries, or None when none is usable"""
+    if not len(entries['timestamps']):
+        return None
+
+    shower_count, hours, correction, altitude, limiting_magnitude, usable = entry_corrections(entries, shower)
+    if not usable.any():
+        return {'zhr': None, 'n_entries': int(len(hours)), 'excluded': int(len(hours))}
+
+    meteors = float(shower_count[usable].sum())
+    corrected_hours = float((hours[usable] / correction[usable]).sum())
+    zhr = meteors / corrected_hours if corrected_hours > 0 else 0.0
+
+    return {
+        'zhr': round(zhr, 1),
+        'error': round(zhr / math.sqrt(meteors), 1) if meteors else None,
+        'shower_meteors': int(meteors),
+        'effective_hours': round(float(hours[usable].sum()), 2),
+        'mean_limiting_magnitude': round(float(limiting_magnitude[usable].mean()), 2),
+        'mean_radiant_altitude': round(float(altitude[usable].mean()), 1),
+        'n_entries': int(len(hours)),
+        'excluded': int((~usable).sum()),
+    }
+
+
+def _methodology(shower):
+    radiant = shower['radiant']
+    radiant_text = f"radiant RA {radiant['ra']}°, Dec {radiant['dec']}°" if radiant else 'radiant altitude from entries'
+    return (
+        f"IMO ZHR: N·r^(6.5-LM) / (T_eff·sin(h)^{ZENITH_EXPONENT:g}·(1-F)), combined per night as "
+        f"ΣN / Σ(T_eff/C); r = {shower['population_index']}, {radiant_text}. "
+        f"Entries with the radiant below {MIN_RADIANT_ALTITUDE:g}° are excluded."
+    )
+
+
+def _store_night(project, night, result, shower):
+    from .models import ResearchAnalysis
+
+    title = NIGHT_TITLE.format(night=night.isoformat())
+    if result is None:
+        ResearchAnalysis.objects.filter(project=project, analysis_type='zhr', title=title).delete()
+        return None
+
+    analysis, _ = ResearchAnalysis.objects.update_or_create(
+        project=project, analysis_type='zhr', title=title,
+        defaults={
+            'results': {'night': night.isoformat(), 'shower': shower['shower'], **result},
+            'methodology': _methodology(shower),
+        }
+    )
+    return analysis
+
+
+def update_summary(project):
+    """Peak and per-night series from the cached night rows (O(nights))"""
+    from .models import ResearchAnalysis
+
+    nights = sorted(
+        (analysis.results for analysis in
+         ResearchAnalysis.objects.filter(project=project, analysis_type='zhr')),
+        key=lambda results: results['night']
+    )
+    rated = [results for results in nights if results.get('zhr') is not None]
+    if not nights:
+        ResearchAnalysis.objects.filter(project=project, analysis_type='statistics', title=SUMMARY_TITLE).delete()
+        return None
+
+    peak = max(rated, key=lambda results: results['zhr']) if rated else None
+    analysis, _ = ResearchAnalysis.objects.update_or_create(
+        project=project, analysis_type='statistics', title=SUMMARY_TITLE,
+        defaults={
+            'results': {
+                'peak_night': peak['night'] if peak else None,
+                'peak_zhr': peak['zhr'] if peak else None,
+                'nights': {results['night']: results.get('zhr') for results in nights},
+                'shower_meteors': sum(results.get('shower_meteors', 0) for results in nights),
+            },
+            'methodology': 'Summary of the per-night ZHR analyses.',
+        }
+    )
+    return analysis
+
+
+def update_night(project, night):
+    """Recompute and cache the ZHR of a single night"""
+    shower = shower_config(project)
+    start, end = night_bounds(night, shower['location']['longitude'])
+    entries = load_entries(project.data_entries.filter(
+        observation_datetime__gte=start, observation_datetime__lt=end
+    ))
+
+    with transaction.atomic():
+        analysis = _store_night(project, night, night_zhr(entries, shower), shower)
+        update_summary(project)
+    return analysis
+
+
+def rebuild_zhr(project):
+    """Recompute every night of a project in one pass over its entries"""
+    from .models import ResearchAnalysis
+
+    shower = shower_config(project)
+    entries = load_entries(project.data_entries.all())
+
+    # Malam = tanggal sore hari dalam waktu lokal rata-rata situs
+    offset = shower['location']['longitude'] / 15.0 * 3600 - 12 * 3600
+    night_numbers = np.floor((entries['timestamps'] + offset) / 86400).astype(int)
+
+    nights = {}
+    for number in np.unique(night_numbers):
+        selected = night_numbers == number
+        night = (datetime(1970, 1, 1) + timedelta(days=int(number))).date()
+        nights[night] = night_zhr({key: values[selected] for key, values in entries.items()}, shower)
+
+    with transaction.atomic():
+        titles = [NIGHT_TITLE.format(night=night.isoformat()) for night in nights]
+        ResearchAnalysis.objects.filter(project=project, analysis_type='zhr').exclude(title__in=titles).delete()
+        for night, result in nights.items():
+            _store_night(project, night, result, shower)
+        update_summary(project)
+
+    return nights
+
+
+def queue_night_update(project, observation_datetime):
+    """Queue the ZHR refresh of the night ``observation_datetime`` belongs to (after commit)"""
+    from core.jobs import enqueue
+
+    night = night_of(observation_datetime, shower_config(project)['location']['longitude'])
+    transaction.on_commit(
+        lambda: enqueue('astronomy.update_zhr', project_id=project.pk, night=night.isoformat())
+    )
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astronomy', '0003_researchproject_researchtemplate_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='astrophoto',
+            name='image_derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Resized WebP/JPEG variants of the image'),
+        ),
+    ]
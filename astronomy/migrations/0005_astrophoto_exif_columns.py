@@ -0,0 +1,103 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:11
+
+import re
+
+from django.db import migrations, models
+
+# Salinan beku parser astronomy/exif.py saat migrasi ini dibuat; migrasi
+# tidak boleh ikut berubah kalau kode app berubah
+NUMBER_PATTERN = re.compile(r'[-+]?\d+(?:[.,]\d+)?')
+FRACTION_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*/\s*(\d+(?:\.\d+)?)')
+
+BATCH_SIZE = 500
+
+
+def _to_float(value):
+    return float(value.replace(',', '.'))
+
+
+def parse_exposure(text):
+    if not text:
+        return None
+    text = str(text).strip().lower()
+
+    fraction = FRACTION_PATTERN.search(text)
+    if fraction:
+        denominator = float(fraction.group(2))
+        return float(fraction.group(1)) / denominator if denominator else None
+
+    number = NUMBER_PATTERN.search(text)
+    if not number:
+        return None
+    seconds = _to_float(number.group())
+    if re.search(r'\d\s*(m|min|menit)\b', text):
+        seconds *= 60
+    return seconds
+
+
+def parse_number(text):
+    if not text:
+        return None
+    number = NUMBER_PATTERN.search(str(text))
+    return _to_float(number.group()) if number else None
+
+
+def normalize_existing_photos(apps, schema_editor):
+    AstroPhoto = apps.get_model('astronomy', 'AstroPhoto')
+    fields = ['exposure_seconds', 'aperture_f', 'focal_length_mm']
+    photos = AstroPhoto.objects.only('id', 'exposure_time', 'aperture', 'focal_length')
+
+    batch = []
+    for photo in photos.iterator(chunk_size=BATCH_SIZE):
+        photo.exposure_seconds = parse_exposure(photo.exposure_time)
+        photo.aperture_f = parse_number(photo.aperture)
+        photo.focal_length_mm = parse_number(photo.focal_length)
+        batch.append(photo)
+        if len(batch) >= BATCH_SIZE:
+            AstroPhoto.objects.bulk_update(batch, fields)
+            batch = []
+    if batch:
+        AstroPhoto.objects.bulk_update(batch, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astronomy', '0004_astrophoto_image_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='astrophoto',
+            name='aperture_f',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='astrophoto',
+            name='exif_data',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='astrophoto',
+            name='exposure_seconds',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='astrophoto',
+            name='focal_length_mm',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='astrophoto',
+            index=models.Index(fields=['exposure_seconds'], name='astronomy_a_exposur_343923_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='astrophoto',
+            index=models.Index(fields=['iso', 'exposure_seconds'], name='astronomy_a_iso_56d0b7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='astrophoto',
+            index=models.Index(fields=['focal_length_mm'], name='astronomy_a_focal_l_6e725a_idx'),
+        ),
+        migrations.RunPython(normalize_existing_photos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astronomy', '0005_astrophoto_exif_columns'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResearchFieldStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(help_text='Key inside ResearchDataEntry.data', max_length=50)),
+                ('count', models.IntegerField(default=0)),
+                ('mean', models.FloatField(default=0)),
+                ('m2', models.FloatField(default=0, help_text='Sum of squared deviations from the mean')),
+                ('fit', models.JSONField(blank=True, default=dict)),
+                ('last_entry_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='field_statistics', to='astronomy.researchproject')),
+            ],
+            options={
+                'verbose_name_plural': 'Research Field Statistics',
+                'unique_together': {('project', 'key')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astronomy', '0006_researchfieldstatistics'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='researchanalysis',
+            name='analysis_type',
+            field=models.CharField(choices=[('period', 'Orbital Period Calculation'), ('kepler', "Kepler's Law Verification"), ('light_curve', 'Light Curve Analysis'), ('zhr', 'Zenithal Hourly Rate'), ('statistics', 'Statistical Analysis'), ('custom', 'Custom Analysis')], max_length=20),
+        ),
+    ]
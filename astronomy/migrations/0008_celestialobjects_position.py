@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astronomy', '0007_researchanalysis_zhr'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='celestialobjects',
+            name='declination',
+            field=models.FloatField(blank=True, help_text='Degrees (J2000)', null=True),
+        ),
+        migrations.AddField(
+            model_name='celestialobjects',
+            name='right_ascension',
+            field=models.FloatField(blank=True, help_text='Degrees (J2000), for stars and deep-sky objects', null=True),
+        ),
+    ]
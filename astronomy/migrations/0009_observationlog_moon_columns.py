@@ -0,0 +1,167 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:30
+
+import numpy as np
+from django.db import migrations, models
+
+# Salinan beku astronomy.ephemeris.moon_phase (Schlyter + Meeus ch. 48) saat
+# migrasi ini dibuat; migrasi tidak boleh ikut berubah kalau kode app berubah
+UNIX_EPOCH_JD = 2440587.5
+EARTH_RADII_PER_AU = 23454.8
+
+# (N, i, w, a, e, M): value at d = 0 and rate per day
+ORBITAL_ELEMENTS = {
+    'sun': ((0.0, 0.0), (0.0, 0.0), (282.9404, 4.70935e-5), (1.0, 0.0),
+            (0.016709, -1.151e-9), (356.0470, 0.9856002585)),
+    'moon': ((125.1228, -0.0529538083), (5.1454, 0.0), (318.0634, 0.1643573223), (60.2666, 0.0),
+             (0.054900, 0.0), (115.3654, 13.0649929509)),
+}
+
+PHASE_NAMES = [
+    'New Moon', 'Waxing Crescent', 'First Quarter', 'Waxing Gibbous',
+    'Full Moon', 'Waning Gibbous', 'Last Quarter', 'Waning Crescent',
+]
+
+BATCH_SIZE = 500
+
+
+def _elements(body, d):
+    return [base + rate * d for base, rate in ORBITAL_ELEMENTS[body]]
+
+
+def _orbit_position(body, d):
+    node, inclination, perihelion, axis, eccentricity, mean_anomaly = _elements(body, d)
+    node, inclination, perihelion = np.radians(node), np.radians(inclination), np.radians(perihelion)
+    mean_anomaly = np.radians(mean_anomaly)
+    anomaly = mean_anomaly + eccentricity * np.sin(mean_anomaly) * (1 + eccentricity * np.cos(mean_anomaly))
+    for _ in range(5):
+        anomaly = anomaly - (anomaly - eccentricity * np.sin(anomaly) - mean_anomaly) / (1 - eccentricity * np.cos(anomaly))
+
+    x = axis * (np.cos(anomaly) - eccentricity)
+    y = axis * np.sqrt(1 - eccentricity ** 2) * np.sin(anomaly)
+    distance = np.hypot(x, y)
+    argument = np.arctan2(y, x) + perihelion
+
+    return (
+        distance * (np.cos(node) * np.cos(argument) - np.sin(node) * np.sin(argument) * np.cos(inclination)),
+        distance * (np.sin(node) * np.cos(argument) + np.cos(node) * np.sin(argument) * np.cos(inclination)),
+        distance * np.sin(argument) * np.sin(inclination),
+    )
+
+
+def _moon_ecliptic(d):
+    x, y, z = _orbit_position('moon', d)
+    longitude = np.arctan2(y, x)
+    latitude = np.arctan2(z, np.hypot(x, y))
+    distance = np.sqrt(x ** 2 + y ** 2 + z ** 2)
+
+    node, _, perigee, _, _, moon_anomaly = _elements('moon', d)
+    _, _, sun_perihelion, _, _, sun_anomaly = _elements('sun', d)
+    moon_longitude = node + perigee + moon_anomaly
+    sun_longitude = sun_perihelion + sun_anomaly
+    elongation = np.radians(moon_longitude - sun_longitude)
+    argument = np.radians(moon_longitude - node)
+    moon_anomaly, sun_anomaly = np.radians(moon_anomaly), np.radians(sun_anomaly)
+
+    longitude = longitude + np.radians(
+        -1.274 * np.sin(moon_anomaly - 2 * elongation)
+        + 0.658 * np.sin(2 * elongation)
+        - 0.186 * np.sin(sun_anomaly)
+        - 0.059 * np.sin(2 * moon_anomaly - 2 * elongation)
+        - 0.057 * np.sin(moon_anomaly - 2 * elongation + sun_anomaly)
+        + 0.053 * np.sin(moon_anomaly + 2 * elongation)
+    )
+    latitude = latitude + np.radians(
+        -0.173 * np.sin(argument - 2 * elongation)
+        - 0.055 * np.sin(moon_anomaly - argument - 2 * elongation)
+    )
+    distance = distance - 0.58 * np.cos(moon_anomaly - 2 * elongation) - 0.46 * np.cos(2 * elongation)
+
+    return (
+        distance * np.cos(latitude) * np.cos(longitude),
+        distance * np.cos(latitude) * np.sin(longitude),
+        distance * np.sin(latitude),
+    )
+
+
+def moon_phase_at(moments):
+    """(illumination, phase_angle, longitude_difference) arrays"""
+    jd = np.array([moment.timestamp() for moment in moments], dtype=float) / 86400.0 + UNIX_EPOCH_JD
+    d = jd - 2451543.5
+    moon_x, moon_y, moon_z = _moon_ecliptic(d)
+    sun_x, sun_y, _ = _orbit_position('sun', d)
+    sun_x, sun_y = sun_x * EARTH_RADII_PER_AU, sun_y * EARTH_RADII_PER_AU
+
+    moon_distance = np.sqrt(moon_x ** 2 + moon_y ** 2 + moon_z ** 2)
+    sun_distance = np.hypot(sun_x, sun_y)
+    elongation = np.arccos(np.clip(
+        (moon_x * sun_x + moon_y * sun_y) / (moon_distance * sun_distance), -1.0, 1.0
+    ))
+    phase_angle = np.arctan2(
+        sun_distance * np.sin(elongation), moon_distance - sun_distance * np.cos(elongation)
+    )
+    longitude_difference = np.mod(
+        np.degrees(np.arctan2(moon_y, moon_x) - np.arctan2(sun_y, sun_x)), 360.0
+    )
+    return (1 + np.cos(phase_angle)) / 2, np.degrees(phase_angle), longitude_difference
+
+
+def phase_name(longitude_difference):
+    return PHASE_NAMES[int(((longitude_difference + 22.5) % 360) // 45)]
+
+
+def _update_moon_phase(ObservationLog, logs):
+    # Satu pass vektor per batch
+    illumination, phase_angle, longitude_difference = moon_phase_at(
+        [log.observation_date for log in logs]
+    )
+    for index, log in enumerate(logs):
+        log.moon_illumination = round(float(illumination[index]), 4)
+        log.moon_phase_angle = round(float(phase_angle[index]), 2)
+        if not log.moon_phase:
+            log.moon_phase = phase_name(float(longitude_difference[index]))
+    ObservationLog.objects.bulk_update(logs, ['moon_illumination', 'moon_phase_angle', 'moon_phase'])
+
+
+def backfill_moon_phase(apps, schema_editor):
+    ObservationLog = apps.get_model('astronomy', 'ObservationLog')
+    logs = ObservationLog.objects.exclude(observation_date=None).only(
+        'id', 'observation_date', 'moon_phase'
+    )
+
+    batch = []
+    for log in logs.iterator(chunk_size=BATCH_SIZE):
+        batch.append(log)
+        if len(batch) >= BATCH_SIZE:
+            _update_moon_phase(ObservationLog, batch)
+            batch = []
+    if batch:
+        _update_moon_phase(ObservationLog, batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astronomy', '0008_celestialobjects_position'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='observationlog',
+            name='moon_illumination',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='observationlog',
+            name='moon_phase_angle',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='observationlog',
+            index=models.Index(fields=['moon_illumination'], name='astronomy_o_moon_il_48f315_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='observationlog',
+            index=models.Index(fields=['is_public', 'moon_illumination'], name='astronomy_o_is_publ_35981c_idx'),
+        ),
+        migrations.RunPython(backfill_moon_phase, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,246 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:31
+
+from bisect import bisect_right
+
+from django.db import migrations, models
+from django.utils import timezone
+
+# Salinan beku astronomy.eclipses.build_timeline saat migrasi ini dibuat;
+# migrasi tidak boleh ikut berubah kalau kode app berubah
+
+BATCH_SIZE = 500
+
+# (contact field, AstroPhoto.eclipse_phase key, label) in the order they must occur
+LUNAR_CONTACTS = [
+    ('p1_time', 'lunar_p1', 'P1 (Penumbral Start)'),
+    ('u1_time', 'lunar_u1', 'U1 (Partial Start)'),
+    ('u2_time', 'lunar_u2', 'U2 (Total Start)'),
+    ('max_time', 'lunar_max', 'Maximum'),
+    ('u3_time', 'lunar_u3', 'U3 (Total End)'),
+    ('u4_time', 'lunar_u4', 'U4 (Partial End)'),
+    ('p2_time', 'lunar_p2', 'P2 (Penumbral End)'),
+]
+SOLAR_CONTACTS = [
+    ('c1_time', 'solar_c1', 'C1 (Partial Start)'),
+    ('c2_time', 'solar_c2', 'C2 (Total Start)'),
+    ('max_time', 'solar_max', 'Maximum'),
+    ('c3_time', 'solar_c3', 'C3 (Total End)'),
+    ('c4_time', 'solar_c4', 'C4 (Partial End)'),
+]
+
+# (start contact, end contact, phase name); totality is the central phase
+LUNAR_PHASES = [
+    ('p1_time', 'u1_time', 'Penumbral'),
+    ('u1_time', 'u2_time', 'Partial'),
+    ('u2_time', 'u3_time', 'Total'),
+    ('u3_time', 'u4_time', 'Partial'),
+    ('u4_time', 'p2_time', 'Penumbral'),
+]
+SOLAR_PHASES = [
+    ('c1_time', 'c2_time', 'Partial'),
+    ('c2_time', 'c3_time', 'Total'),
+    ('c3_time', 'c4_time', 'Partial'),
+]
+CENTRAL_PHASE = {
+    'lunar': ('u2_time', 'u3_time'),
+    'solar': ('c2_time', 'c3_time'),
+}
+
+# Photos this close to a contact are attributed to the contact itself
+CONTACT_WINDOW_SECONDS = 30
+
+# Allowed difference between the recorded and computed totality length
+DURATION_TOLERANCE_SECONDS = 5
+
+
+def eclipse_kind(eclipse):
+    # eclipse_type, bukan is_lunar(): dipakai juga oleh model historis di migrasi
+    return 'lunar' if eclipse.eclipse_type.startswith('lunar_') else 'solar'
+
+
+def contact_fields(eclipse):
+    return LUNAR_CONTACTS if eclipse_kind(eclipse) == 'lunar' else SOLAR_CONTACTS
+
+
+def phase_fields(eclipse):
+    phases = LUNAR_PHASES if eclipse_kind(eclipse) == 'lunar' else SOLAR_PHASES
+    if eclipse.eclipse_type == 'solar_annular':
+        return [(start, end, 'Annular' if name == 'Total' else name) for start, end, name in phases]
+    return phases
+
+
+def _seconds(start, end):
+    return (end - start).total_seconds()
+
+
+def _clock(moment):
+    return timezone.localtime(moment).strftime('%H:%M:%S')
+
+
+def ordering_warnings(eclipse):
+    """Messages for contacts recorded out of order"""
+    warnings = []
+    previous = None
+    for field, _, label in contact_fields(eclipse):
+        moment = getattr(eclipse, field)
+        if moment is None:
+            continue
+        if previous and moment < previous[1]:
+            warnings.append(f'{label} is before {previous[0]}')
+        previous = (label, moment)
+    return warnings
+
+
+def duration_check(eclipse, central_seconds):
+    """Compare the computed totality/annularity length with ``duration_seconds``"""
+    recorded = eclipse.duration_seconds
+    if recorded is None or central_seconds is None:
+        return None
+    difference = round(central_seconds - recorded, 1)
+    return {
+        'recorded_seconds': recorded,
+        'computed_seconds': round(central_seconds, 1),
+        'difference_seconds': difference,
+        'consistent': abs(difference) <= DURATION_TOLERANCE_SECONDS,
+    }
+
+
+def place_photo(moment, contacts, phases):
+    """
+    Phase of a photo taken at ``moment``.
+
+    ``contacts`` is the ordered list of (time, phase key, label) and
+    ``phases`` the list of phase dicts with parsed start/end.
+    """
+    for time, key, label in contacts:
+        if abs(_seconds(time, moment)) <= CONTACT_WINDOW_SECONDS:
+            return key, label
+
+    if moment < contacts[0][0]:
+        return 'pre', 'Pre-Eclipse'
+    if moment > contacts[-1][0]:
+        return 'post', 'Post-Eclipse'
+
+    starts = [phase['_start'] for phase in phases]
+    index = bisect_right(starts, moment) - 1
+    if index >= 0 and moment <= phases[index]['_end']:
+        return '', f"{phases[index]['name']} phase"
+    return '', 'Between recorded contacts'
+
+
+def build_timeline(eclipse, photos=()):
+    """
+    Timeline dict of an eclipse and its photos.
+
+    ``photos`` is an iterable of (id, title, exact_time). Phases whose
+    contacts are missing or out of order are left out.
+    """
+    contacts = [
+        (getattr(eclipse, field), key, label)
+        for field, key, label in contact_fields(eclipse)
+        if getattr(eclipse, field) is not None
+    ]
+    timeline = {
+        'kind': eclipse_kind(eclipse),
+        'contacts': [],
+        'phases': [],
+        'total_seconds': None,
+        'central_seconds': None,
+        'duration_check': None,
+        'warnings': ordering_warnings(eclipse),
+        'photos': [],
+    }
+    if not contacts:
+        return timeline
+
+    first, last = min(contacts)[0], max(contacts)[0]
+    total = _seconds(first, last)
+    timeline['total_seconds'] = total
+    timeline['contacts'] = [
+        {
+            'key': key,
+            'label': label,
+            'time': time.isoformat(),
+            'clock': _clock(time),
+            'offset_seconds': _seconds(first, time),
+        }
+        for time, key, label in contacts
+    ]
+
+    phases = []
+    for start_field, end_field, name in phase_fields(eclipse):
+        start, end = getattr(eclipse, start_field), getattr(eclipse, end_field)
+        if start is None or end is None or end < start:
+            continue
+        duration = _seconds(start, end)
+        phases.append({
+            'name': name,
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'duration_seconds': duration,
+            'percent': round(100 * duration / total, 1) if total else None,
+            '_start': start,
+            '_end': end,
+        })
+
+    central_start, central_end = (getattr(eclipse, field) for field in CENTRAL_PHASE[timeline['kind']])
+    if central_start and central_end and central_end >= central_start:
+        timeline['central_seconds'] = _seconds(central_start, central_end)
+    timeline['duration_check'] = duration_check(eclipse, timeline['central_seconds'])
+    if timeline['duration_check'] and not timeline['duration_check']['consistent']:
+        timeline['warnings'].append(
+            f"Recorded duration {eclipse.duration_seconds}s differs from contact times "
+            f"({timeline['central_seconds']:.0f}s)"
+        )
+
+    ordered = sorted(contacts)
+    for pk, title, moment in sorted(photos, key=lambda photo: photo[2]):
+        key, label = place_photo(moment, ordered, phases)
+        timeline['photos'].append({
+            'id': pk,
+            'title': title,
+            'time': moment.isoformat(),
+            'clock': _clock(moment),
+            'offset_seconds': _seconds(first, moment),
+            'phase': key,
+            'label': label,
+        })
+
+    for phase in phases:
+        del phase['_start'], phase['_end']
+    timeline['phases'] = phases
+    return timeline
+
+
+def build_existing_timelines(apps, schema_editor):
+    AstroPhoto = apps.get_model('astronomy', 'AstroPhoto')
+    EclipseObservation = apps.get_model('astronomy', 'EclipseObservation')
+
+    batch = []
+    for eclipse in EclipseObservation.objects.iterator(chunk_size=BATCH_SIZE):
+        photos = AstroPhoto.objects.filter(
+            observation_id=eclipse.observation_id, exact_time__isnull=False
+        ).values_list('id', 'title', 'exact_time')
+        eclipse.timeline = build_timeline(eclipse, photos)
+        batch.append(eclipse)
+        if len(batch) >= BATCH_SIZE:
+            EclipseObservation.objects.bulk_update(batch, ['timeline'])
+            batch = []
+    if batch:
+        EclipseObservation.objects.bulk_update(batch, ['timeline'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astronomy', '0009_observationlog_moon_columns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eclipseobservation',
+            name='timeline',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.RunPython(build_existing_timelines, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:32
+
+from django.db import migrations, models
+
+# Salinan beku astronomy.geo.encode saat migrasi ini dibuat
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 9
+
+BATCH_SIZE = 500
+
+
+def encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    code, bits, value, even = [], 0, 0, True
+
+    while len(code) < precision:
+        target, bounds = (longitude, lon_range) if even else (latitude, lat_range)
+        middle = (bounds[0] + bounds[1]) / 2
+        if target >= middle:
+            value = value * 2 + 1
+            bounds[0] = middle
+        else:
+            value = value * 2
+            bounds[1] = middle
+        even = not even
+
+        bits += 1
+        if bits == 5:
+            code.append(BASE32[value])
+            bits, value = 0, 0
+
+    return ''.join(code)
+
+
+def backfill_geohash(apps, schema_editor):
+    ObservationLog = apps.get_model('astronomy', 'ObservationLog')
+    logs = ObservationLog.objects.filter(
+        latitude__isnull=False, longitude__isnull=False
+    ).only('id', 'latitude', 'longitude')
+
+    batch = []
+    for log in logs.iterator(chunk_size=BATCH_SIZE):
+        log.geohash = encode(float(log.latitude), float(log.longitude))
+        batch.append(log)
+        if len(batch) >= BATCH_SIZE:
+            ObservationLog.objects.bulk_update(batch, ['geohash'])
+            batch = []
+    if batch:
+        ObservationLog.objects.bulk_update(batch, ['geohash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astronomy', '0010_eclipseobservation_timeline'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='observationlog',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=12),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+    ]
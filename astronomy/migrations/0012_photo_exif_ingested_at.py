@@ -0,0 +1,26 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:45
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def mark_ingested(apps, schema_editor):
+    # Foto dengan EXIF sudah pernah dibaca; sisanya dibaca ulang sekali oleh ingest_photo_exif
+    AstroPhoto = apps.get_model('astronomy', 'AstroPhoto')
+    AstroPhoto.objects.exclude(exif_data={}).update(exif_ingested_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astronomy', '0011_observationlog_geohash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='astrophoto',
+            name='exif_ingested_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(mark_ingested, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:46
+
+from django.db import migrations, models
+
+
+def backfill_skipped(apps, schema_editor):
+    # Entry belum tervalidasi yang sudah dilewati watermark sebelum kolom ini ada
+    ResearchDataEntry = apps.get_model('astronomy', 'ResearchDataEntry')
+    ResearchFieldStatistics = apps.get_model('astronomy', 'ResearchFieldStatistics')
+    statistics = list(ResearchFieldStatistics.objects.exclude(last_entry_id=0))
+    for stats in statistics:
+        stats.skipped_entry_ids = list(ResearchDataEntry.objects.filter(
+            project_id=stats.project_id, is_validated=False, id__lte=stats.last_entry_id
+        ).order_by('id').values_list('id', flat=True))
+    ResearchFieldStatistics.objects.bulk_update(statistics, ['skipped_entry_ids'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astronomy', '0012_photo_exif_ingested_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='researchfieldstatistics',
+            name='skipped_entry_ids',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.RunPython(backfill_skipped, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,21 @@
 # astronomy/models.py
-from django.db import models
+from django.db import models, transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from django.utils.text import slugify
+from django.utils import timezone
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
+from core.images import derivatives_are_current, refresh_derivatives
+from core.jobs import enqueue
+from .columns import entry_row, forget_entry, record_entry
+from .eclipses import refresh_observation_timeline, refresh_timeline
+from .ephemeris import moon_phase_at, phase_name
+from .geo import encode as encode_geohash
+from .meteors import queue_night_update
+from .exif import (
+    APPLIED_FIELDS, apply_exif, parse_aperture, parse_exposure, parse_focal_length, read_exif
+)
 import json
 
 # Create your models here.
@@ -51,10 +64,20 @@ class CelestialObjects(models.Model):
     
     semi_major_axis = models.FloatField(null=True, blank=True, help_text="km")
     
+    right_ascension = models.FloatField(null=True, blank=True, help_text="Degrees (J2000), for stars and deep-sky objects")
+    
+    declination = models.FloatField(null=True, blank=True, help_text="Degrees (J2000)")
+    """Fixed position used by the ephemeris; Sun, Moon, planets and Galilean moons are computed."""
+    
     class Meta:
         verbose_name_plural = 'Celestial Objects'
     def __str__(self):
         return self.name
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Tabel ephemeris dibangun ulang di worker
+        transaction.on_commit(lambda: enqueue('astronomy.precompute_ephemeris'))
 
 class ObservationLog(models.Model):
     """
@@ -109,6 +132,10 @@ class ObservationLog(models.Model):
     """
     The longitude of the observation.
     """
+    geohash = models.CharField(max_length=12, blank=True, db_index=True, editable=False)
+    """
+    Geohash of latitude/longitude, for indexed map queries (astronomy/geo.py).
+    """
     
     # Conditions
     seeing = models.IntegerField(choices=SEEING_CONDITIONS)
@@ -123,6 +150,14 @@ class ObservationLog(models.Model):
     """
     The phase of the moon during the observation.
     """
+    moon_illumination = models.FloatField(null=True, blank=True, editable=False)
+    """
+    Illuminated fraction of the Moon (0-1) at ``observation_date``, computed locally.
+    """
+    moon_phase_angle = models.FloatField(null=True, blank=True, editable=False)
+    """
+    Sun-Moon-Earth phase angle in degrees (0 = full, 180 = new).
+    """
     temperature = models.IntegerField(null=True, blank=True, help_text='Celsius')
     """
     The temperature during the observation.
@@ -176,12 +211,34 @@ class ObservationLog(models.Model):
         """
         The observations are ordered by the observation date.
         """
+        indexes = [
+            models.Index(fields=['moon_illumination']),
+            models.Index(fields=['is_public', 'moon_illumination']),
+        ]
     
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(f"{self.title}-{self.observation_date.strftime('%Y%m%d')}")
+        self.compute_moon_phase()
+        self.compute_geohash()
         super().save(*args, **kwargs)
     
+    def compute_geohash(self):
+        if self.latitude is None or self.longitude is None:
+            self.geohash = ''
+        else:
+            self.geohash = encode_geohash(float(self.latitude), float(self.longitude))
+    
+    def compute_moon_phase(self):
+        """Refresh the numeric Moon columns from ``observation_date``; fill a blank ``moon_phase``"""
+        if not self.observation_date:
+            return
+        illumination, phase_angle, longitude_difference = moon_phase_at([self.observation_date])
+        self.moon_illumination = round(float(illumination[0]), 4)
+        self.moon_phase_angle = round(float(phase_angle[0]), 2)
+        if not self.moon_phase:
+            self.moon_phase = phase_name(float(longitude_difference[0]))
+    
     def __str__(self):
         return f"{self.title} - {self.observation_date.strftime('%Y-%m-%d')}"
 
@@ -307,15 +364,65 @@ class ResearchDataEntry(models.Model):
         verbose_name_plural = "Research Data Entries"
         
     def save(self, *args, **kwargs):
+        """
+        Save, then queue the snapshot patch, outlier check and ZHR refresh.
+
+        Queryset ``.update()`` bypasses this method: after a bulk edit of
+        meteor entries queue ``astronomy.update_zhr`` without a night to
+        rebuild every night of the project. Deletes (including queryset
+        deletes) are handled by the post_delete receiver below.
+        """
         if self.project and self.observation_datetime:
-            delta = self.observation_datetime.date() - self.project.start_date
-            self.days_from_start = delta.days + (self.observation_datetime.hour/24.0)
+            self.days_from_start = self.compute_days_from_start(
+                self.observation_datetime, self.project.start_date
+            )
+        adding = self._state.adding
+        # Nilai lama dibaca sebelum save: malam lama juga harus dihitung ulang
+        previous = None if adding else ResearchDataEntry.objects.filter(pk=self.pk).values(
+            'project_id', 'observation_datetime', 'is_validated'
+        ).first()
+        newly_validated = previous is not None and self.is_validated and not previous['is_validated']
         super().save(*args, **kwargs)
+        # Patch snapshot kolom project setelah commit (lihat astronomy/columns.py)
+        row = entry_row(self)
+        transaction.on_commit(lambda: record_entry(self.project_id, row))
+        if adding or newly_validated:
+            # Outlier check untuk entry baru / yang baru divalidasi, dikerjakan worker
+            project_id = self.project_id
+            transaction.on_commit(lambda: enqueue('astronomy.detect_outliers', project_id=project_id))
+        if self.project.research_type == 'meteor':
+            queue_night_update(self.project, self.observation_datetime)
+        if previous and (previous['project_id'], previous['observation_datetime']) != (
+            self.project_id, self.observation_datetime
+        ):
+            # Entry pindah malam/project: malam lama kehilangan entry ini
+            old_project = self.project if previous['project_id'] == self.project_id else (
+                ResearchProject.objects.filter(pk=previous['project_id']).first()
+            )
+            if old_project and old_project.research_type == 'meteor':
+                queue_night_update(old_project, previous['observation_datetime'])
+    
+    @staticmethod
+    def compute_days_from_start(observation_datetime, start_date):
+        """Days since the project start date, with the hour as a fraction"""
+        delta = observation_datetime.date() - start_date
+        return delta.days + (observation_datetime.hour/24.0)
     
     def __str__(self):
         return f"{self.project.title} - Day {self.days_from_start:.2f}"
     
 
+@receiver(post_delete, sender=ResearchDataEntry)
+def research_entry_deleted(sender, instance, **kwargs):
+    """Drop the entry from the column snapshot and refresh its ZHR night, for queryset deletes too"""
+    project_id, entry_id = instance.project_id, instance.pk
+    transaction.on_commit(lambda: forget_entry(project_id, entry_id))
+    # Saat cascade dari project, project sudah/akan terhapus: job update_zhr berhenti sendiri
+    project = ResearchProject.objects.filter(pk=project_id).first()
+    if project and project.research_type == 'meteor':
+        queue_night_update(project, instance.observation_datetime)
+
+
 class ResearchAnalysis(models.Model):
     """Store analysis results for a research project"""
     
@@ -323,6 +430,7 @@ class ResearchAnalysis(models.Model):
         ('period', 'Orbital Period Calculation'),
         ('kepler', "Kepler's Law Verification"),
         ('light_curve', 'Light Curve Analysis'),
+        ('zhr', 'Zenithal Hourly Rate'),
         ('statistics', 'Statistical Analysis'),
         ('custom', 'Custom Analysis'),
     ]
@@ -363,6 +471,37 @@ class ResearchAnalysis(models.Model):
     def __str__(self):
         return f"{self.title} - {self.project.title}"
 
+class ResearchFieldStatistics(models.Model):
+    """Running residual statistics per project & data key, used for outlier detection"""
+    
+    project = models.ForeignKey(ResearchProject, on_delete=models.CASCADE,
+                                related_name='field_statistics')
+    key = models.CharField(max_length=50, help_text="Key inside ResearchDataEntry.data")
+    
+    # Welford running mean / variance of inlier residuals
+    count = models.IntegerField(default=0)
+    mean = models.FloatField(default=0)
+    m2 = models.FloatField(default=0, help_text="Sum of squared deviations from the mean")
+    
+    # Sinusoid the residuals are taken against: {"period", "sin", "cos", "offset"}
+    # Empty = key is not checked for outliers
+    fit = models.JSONField(default=dict, blank=True)
+    
+    # Entries with a higher id have not been checked yet
+    last_entry_id = models.BigIntegerField(default=0)
+    
+    # Entries at or below last_entry_id that were not validated yet when checked
+    skipped_entry_ids = models.JSONField(default=list, blank=True)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name_plural = "Research Field Statistics"
+        unique_together = [('project', 'key')]
+    
+    def __str__(self):
+        return f"{self.project.title} - {self.key}"
+
 class AstroPhoto(models.Model):
     """
     Astrophotography images
@@ -486,6 +625,11 @@ class AstroPhoto(models.Model):
     """
     The thumbnail of the image.
     """
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False,
+                                         help_text="Resized WebP/JPEG variants of the image")
+    """
+    Thumbnail/medium/full variants with their dimensions, see core.images.
+    """
     
     #object info 
     celestial_objects = models.ForeignKey(CelestialObjects, on_delete=models.SET_NULL, null=True, blank =True)
@@ -525,6 +669,28 @@ class AstroPhoto(models.Model):
     The number of frames stacked.
     """
     
+    # Normalized numeric copies of the technical details, for filtering/sorting
+    exposure_seconds = models.FloatField(null=True, blank=True, editable=False)
+    """
+    Exposure time in seconds, parsed from ``exposure_time`` or EXIF.
+    """
+    aperture_f = models.FloatField(null=True, blank=True, editable=False)
+    """
+    f-number, parsed from ``aperture`` or EXIF.
+    """
+    focal_length_mm = models.FloatField(null=True, blank=True, editable=False)
+    """
+    Focal length in mm, parsed from ``focal_length`` or EXIF.
+    """
+    exif_data = models.JSONField(default=dict, blank=True, editable=False)
+    """
+    Normalized EXIF values read once from the uploaded file.
+    """
+    exif_ingested_at = models.DateTimeField(null=True, blank=True, editable=False)
+    """
+    When the EXIF was read; set even when the file has no EXIF at all.
+    """
+    
     # Equipment
     telescope = models.CharField(max_length=100, blank=True)
     """
@@ -589,14 +755,80 @@ class AstroPhoto(models.Model):
         """
         The images are ordered by the capture date.
         """
+        indexes = [
+            models.Index(fields=['exposure_seconds']),
+            models.Index(fields=['iso', 'exposure_seconds']),
+            models.Index(fields=['focal_length_mm']),
+        ]
     
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
+        self.normalize_technical_data()
+        # Nilai lama dari DB: foto yang pindah observasi / kehilangan exact_time
+        # juga harus keluar dari timeline gerhana lama
+        previous = None if self._state.adding else self.stored_timeline_key()
         super().save(*args, **kwargs)
         """
         The slug is generated from the title.
         """
+        if not derivatives_are_current(self.image, self.image_derivatives):
+            # Thumbnail & derivatives dikerjakan worker (manage.py run_worker)
+            enqueue('astronomy.process_photo', pk=self.pk)
+        observations = set()
+        if self.observation_id and self.exact_time:
+            observations.add(self.observation_id)
+        if previous and all(previous) and previous != (self.observation_id, self.exact_time):
+            observations.add(previous[0])
+        for observation_id in observations:
+            refresh_observation_timeline(observation_id)
+    
+    def delete(self, *args, **kwargs):
+        stored = self.stored_timeline_key()
+        result = super().delete(*args, **kwargs)
+        if stored and all(stored):
+            refresh_observation_timeline(stored[0])
+        return result
+    
+    def stored_timeline_key(self):
+        """(observation_id, exact_time) as saved in the database, None for unsaved photos"""
+        return AstroPhoto.objects.filter(pk=self.pk).values_list('observation_id', 'exact_time').first()
+    
+    def normalize_technical_data(self):
+        """Refresh the numeric columns from the free-text technical fields"""
+        self.exposure_seconds = parse_exposure(self.exposure_time)
+        self.aperture_f = parse_aperture(self.aperture)
+        self.focal_length_mm = parse_focal_length(self.focal_length)
+    
+    def ingest_exif(self):
+        """
+        Read EXIF from the image once and fill blank technical fields.
+
+        Written with a queryset update, not save(): save() would queue
+        process_photo again, and this runs inside that job.
+        """
+        if not self.image:
+            return False
+        exact_time = self.exact_time
+        apply_exif(self, read_exif(self.image))
+        self.normalize_technical_data()
+        self.exif_ingested_at = timezone.now()
+        fields = APPLIED_FIELDS + ('exposure_seconds', 'aperture_f', 'focal_length_mm', 'exif_ingested_at')
+        AstroPhoto.objects.filter(pk=self.pk).update(**{field: getattr(self, field) for field in fields})
+        if self.observation_id and self.exact_time != exact_time:
+            refresh_observation_timeline(self.observation_id)
+        return True
+    
+    def build_derivatives(self, force=False):
+        """Generate resized variants and point ``thumbnail`` at the smallest one"""
+        if not refresh_derivatives(self, 'image', 'image_derivatives', force=force):
+            return False
+        
+        variants = self.image_derivatives.get('variants', {})
+        thumb = variants.get('thumb') or next(iter(variants.values()), None)
+        self.thumbnail = thumb['jpeg'] if thumb else None
+        AstroPhoto.objects.filter(pk=self.pk).update(thumbnail=self.thumbnail)
+        return True
     
     def is_solar_eclipse(self):
         return self.eclipse_phase.startswith('solar_')
@@ -753,9 +985,16 @@ class EclipseObservation(models.Model):
         help_text="Success rate 0-100%"
     )
     
+    # Precomputed contacts, phase durations and photo phases (astronomy/eclipses.py)
+    timeline = models.JSONField(default=dict, blank=True, editable=False)
+    
     class Meta:
         ordering = ['-observation__observation_date']
     
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        refresh_timeline(self)
+    
     
     def __str__(self):
         return f"{self.get_eclipse_type_display()} - {self.observation.observation_date.date()}"
@@ -822,7 +1061,7 @@ class ResearchTemplate(models.Model):
                     'minimum_observations': 14,
                     'recommended_duration': 30,
                 },
-                'instructions': """
+                'instruction': """
 1. Observe Jupiter every night at approximately the same time
 2. Take photos/video showing Jupiter and all 4 moons
 3. Measure position of each moon in Jupiter Diameters (DJ)
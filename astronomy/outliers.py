@@ -0,0 +1,183 @@
+# astronomy/outliers.py
+"""
+Incremental outlier detection for ResearchDataEntry series.
+
+Every (project, data key) pair with a period fit (orbital positions,
+variable star magnitudes) keeps running statistics of its inlier
+residuals against that fit in ResearchFieldStatistics (Welford
+mean/variance). Keys without a fit, such as meteor counts, are not
+checked: their real peaks would look like outliers.
+
+New entries are checked in one pass over the rows added since the last
+run (``last_entry_id``), so the cost is O(new rows): a value further than
+OUTLIER_SIGMA standard deviations from the running mean is flagged with
+``is_outlier``; the rest are folded into the statistics. Entries that are
+not validated yet when the watermark passes them are remembered in
+``skipped_entry_ids`` and checked once they are validated. Re-fitting a
+period resets the statistics of that key from the columnar snapshot.
+"""
+import math
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .columns import get_snapshot, numeric
+
+# Sigma clipping threshold
+OUTLIER_SIGMA = 3.0
+
+# Below this many samples nothing is flagged (statistics still warming up)
+MIN_SAMPLES = 10
+
+# Median absolute deviation -> standard deviation for normal data
+MAD_SCALE = 1.4826
+
+
+def model_values(fit, days):
+    """Sinusoid fit evaluated at ``days``"""
+    phase = 2 * np.pi * np.asarray(days, dtype=float) / fit['period']
+    return fit['sin'] * np.sin(phase) + fit['cos'] * np.cos(phase) + fit['offset']
+
+
+def merge_statistics(count, mean, m2, values):
+    """Fold a batch of values into running (count, mean, m2) — Chan et al."""
+    if not len(values):
+        return count, mean, m2
+
+    batch_count = len(values)
+    batch_mean = float(values.mean())
+    batch_m2 = float(((values - batch_mean) ** 2).sum())
+
+    total = count + batch_count
+    delta = batch_mean - mean
+    return (
+        total,
+        mean + delta * batch_count / total,
+        m2 + batch_m2 + delta ** 2 * count * batch_count / total,
+    )
+
+
+def standard_deviation(count, m2):
+    return math.sqrt(m2 / (count - 1)) if count > 1 else 0.0
+
+
+def clip(residuals, count, mean, m2):
+    """
+    Boolean outlier mask for a batch of residuals.
+
+    Uses the running statistics once they are warm; a large first batch
+    (e.g. a bulk import) is judged against its own median/MAD instead.
+    """
+    if count >= MIN_SAMPLES:
+        center, scale = mean, standard_deviation(count, m2)
+    elif len(residuals) >= MIN_SAMPLES:
+        center = float(np.median(residuals))
+        scale = MAD_SCALE * float(np.median(np.abs(residuals - center)))
+    else:
+        return np.zeros(len(residuals), dtype=bool)
+
+    if scale == 0:
+        return np.zeros(len(residuals), dtype=bool)
+    return np.abs(residuals - center) > OUTLIER_SIGMA * scale
+
+
+def _value(data, key):
+    value = numeric((data or {}).get(key))
+    return np.nan if value is None else value
+
+
+def detect_new_outliers(project):
+    """
+    Check entries added since the last run and flag outliers.
+
+    Returns the ids of the entries that were flagged.
+    """
+    from .models import ResearchDataEntry, ResearchFieldStatistics
+
+    with transaction.atomic():
+        statistics = {
+            stats.key: stats
+            for stats in ResearchFieldStatistics.objects.select_for_update().filter(project=project)
+            if stats.fit
+        }
+        if not statistics:
+            return []
+        watermark = min(stats.last_entry_id for stats in statistics.values())
+        skipped = set().union(*(stats.skipped_entry_ids for stats in statistics.values()))
+
+        rows = list(
+            ResearchDataEntry.objects
+            .filter(Q(id__gt=watermark) | Q(id__in=skipped), project=project)
+            .order_by('id')
+            .values_list('id', 'days_from_start', 'data', 'is_outlier', 'is_validated')
+        )
+        if not rows:
+            return []
+
+        ids = np.array([row[0] for row in rows], dtype=np.int64)
+        days = np.array([row[1] for row in rows], dtype=float)
+        manual = np.array([row[3] for row in rows], dtype=bool)
+        validated = np.array([row[4] for row in rows], dtype=bool)
+
+        flagged = np.zeros(len(rows), dtype=bool)
+        for key, stats in statistics.items():
+            values = np.array([_value(row[2], key) for row in rows], dtype=float)
+            # Baris setelah watermark key ini, atau yang dulu dilewati karena belum divalidasi
+            unchecked = (ids > stats.last_entry_id) | np.isin(ids, stats.skipped_entry_ids)
+            pending = unchecked & validated & ~np.isnan(values) & ~manual
+            residuals = values[pending] - model_values(stats.fit, days[pending])
+
+            outliers = clip(residuals, stats.count, stats.mean, stats.m2)
+            flagged[np.flatnonzero(pending)[outliers]] = True
+
+            stats.count, stats.mean, stats.m2 = merge_statistics(
+                stats.count, stats.mean, stats.m2, residuals[~outliers]
+            )
+            # Entry yang dihapus tidak ikut terambil, jadi otomatis hilang dari daftar
+            stats.skipped_entry_ids = [int(pk) for pk in ids[unchecked & ~validated]]
+
+        last_id = int(ids.max())
+        for stats in statistics.values():
+            stats.last_entry_id = max(stats.last_entry_id, last_id)
+            stats.save()
+
+        flagged_ids = [int(pk) for pk in ids[flagged]]
+        if flagged_ids:
+            ResearchDataEntry.objects.filter(id__in=flagged_ids).update(
+                is_outlier=True, updated_at=timezone.now()
+            )
+
+    return flagged_ids
+
+
+def reset_statistics(project, key, fit):
+    """
+    Restart the statistics of ``key`` against a new sinusoid fit.
+
+    Called after a period fit; the residuals of every usable entry are
+    recomputed in one vectorized pass over the columnar snapshot.
+    """
+    from .models import ResearchFieldStatistics
+
+    snapshot = get_snapshot(project.pk)
+    days, columns = snapshot.series([key])
+    values = columns[key]
+    usable = ~np.isnan(values)
+    residuals = values[usable] - model_values(fit, days[usable])
+    # Belum divalidasi: tidak ikut statistik, dicek saat divalidasi nanti
+    skipped = snapshot.ids[~snapshot.is_validated]
+
+    count, mean, m2 = merge_statistics(0, 0.0, 0.0, residuals)
+    ResearchFieldStatistics.objects.update_or_create(
+        project=project, key=key,
+        defaults={
+            'count': count,
+            'mean': mean,
+            'm2': m2,
+            'fit': fit,
+            'last_entry_id': int(snapshot.ids.max()) if len(snapshot) else 0,
+            'skipped_entry_ids': [int(pk) for pk in skipped],
+        }
+    )
@@ -0,0 +1,71 @@
+# astronomy/tasks.py
+from core.jobs import register_task
+
+from .models import AstroPhoto, ResearchProject
+
+
+@register_task('astronomy.process_photo')
+def process_photo(pk, force=False):
+    """Out-of-band processing for an uploaded AstroPhoto"""
+    photo = AstroPhoto.objects.filter(pk=pk).first()
+    if photo is None:
+        return
+    photo.build_derivatives(force=force)
+    photo.ingest_exif()
+
+
+@register_task('astronomy.analyze_project')
+def analyze_project(pk):
+    """Recompute the automatic analyses of a ResearchProject"""
+    from .analysis import run_orbital_analysis
+    from .lightcurve import run_light_curve_analysis
+    from .meteors import rebuild_zhr
+
+    project = ResearchProject.objects.filter(pk=pk).first()
+    if project is None:
+        return
+    if project.research_type == 'orbital':
+        run_orbital_analysis(project)
+    elif project.research_type == 'variable_star':
+        run_light_curve_analysis(project)
+    elif project.research_type == 'meteor':
+        rebuild_zhr(project)
+
+
+@register_task('astronomy.detect_outliers')
+def detect_outliers(project_id):
+    """Flag outliers among the entries added since the last check"""
+    from .outliers import detect_new_outliers
+
+    project = ResearchProject.objects.filter(pk=project_id).first()
+    if project is None:
+        return
+    detect_new_outliers(project)
+
+
+@register_task('astronomy.update_zhr')
+def update_zhr(project_id, night=None):
+    """Refresh the cached ZHR of one night, or of every night when night is None"""
+    from datetime import date
+
+    from .meteors import rebuild_zhr, update_night
+
+    project = ResearchProject.objects.filter(pk=project_id).first()
+    if project is None:
+        return
+    if night:
+        update_night(project, date.fromisoformat(night))
+    else:
+        rebuild_zhr(project)
+
+
+@register_task('astronomy.precompute_ephemeris')
+def precompute_ephemeris(latitude=None, longitude=None, days=None):
+    """Rebuild the hourly sky table of a site (default: every configured site) from tonight"""
+    from .ephemeris import EPHEMERIS_DAYS, build_store, configured_sites
+
+    sites = configured_sites()
+    if latitude is not None and longitude is not None:
+        sites = [{'latitude': latitude, 'longitude': longitude}]
+    for site in sites:
+        build_store(site, days=days or EPHEMERIS_DAYS)
@@ -0,0 +1,180 @@
+# astronomy/telescope.py
+"""
+Telescope / noVNC connectivity probe.
+
+All host/port pairs are checked concurrently, and the result is cached.
+A daemon thread keeps the cache warm, so page views and API calls only
+read the cache and never wait on socket timeouts.
+
+Under ASGI, ``status_hub`` runs one shared probe loop per process and
+pushes status transitions to every connected server-sent-event stream.
+"""
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import socket
+import threading
+import time
+
+from django.core.cache import cache
+from django.utils import timezone
+
+TELESCOPE_HOSTS = [
+    'host.docker.internal',
+    '172.17.0.1',
+    'localhost',
+]
+
+TUNNEL_PORT = 15900   # reverse SSH tunnel dari Astroberry
+VNC_PORT = 6080       # noVNC websockify
+
+PROBE_TIMEOUT = 1.0
+
+# Cached status is considered fresh for this long
+STATUS_TTL = 10
+
+# Background refresher re-probes this often (keep below STATUS_TTL)
+REFRESH_INTERVAL = 5
+
+CACHE_KEY = 'astronomy:telescope_status'
+
+_executor = ThreadPoolExecutor(max_workers=len(TELESCOPE_HOSTS) * 2, thread_name_prefix='telescope-probe')
+_refresher_lock = threading.Lock()
+_refresher_thread = None
+
+
+def probe_port(host, port, timeout=PROBE_TIMEOUT):
+    """True when a TCP connect to host:port succeeds"""
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def build_status(tunnel_active, vnc_active):
+    if tunnel_active and vnc_active:
+        message = "Telescope connection active"
+    elif vnc_active and not tunnel_active:
+        message = "waiting for Astrobery connection"
+    else:
+        message = "SERVICE UNAVAILABLE"
+
+    return {
+        'tunnel_active': tunnel_active,
+        'vnc_active': vnc_active,
+        'message': message,
+        'checked_at': timezone.now().isoformat(),
+    }
+
+
+def probe_telescope_status():
+    """
+    Probe every host/port pair at once; worst case is one PROBE_TIMEOUT
+    instead of one timeout per pair.
+    """
+    futures = {
+        (host, port): _executor.submit(probe_port, host, port)
+        for port in (TUNNEL_PORT, VNC_PORT)
+        for host in TELESCOPE_HOSTS
+    }
+
+    def any_open(port):
+        return any(future.result() for (_, p), future in futures.items() if p == port)
+
+    status = build_status(any_open(TUNNEL_PORT), any_open(VNC_PORT))
+    cache.set(CACHE_KEY, status, STATUS_TTL)
+    return status
+
+
+def _refresh_forever():
+    while True:
+        try:
+            probe_telescope_status()
+        except Exception:
+            # Jangan sampai thread refresher mati karena satu error
+            pass
+        time.sleep(REFRESH_INTERVAL)
+
+
+def start_refresher():
+    """Start the per-process background refresher once"""
+    global _refresher_thread
+
+    with _refresher_lock:
+        if _refresher_thread is None or not _refresher_thread.is_alive():
+            _refresher_thread = threading.Thread(
+                target=_refresh_forever, name='telescope-status-refresher', daemon=True
+            )
+            _refresher_thread.start()
+
+
+def get_telescope_status():
+    """
+    Cached telescope status.
+
+    Only the very first call in a process (before the refresher has run)
+    waits for a probe; every later call is a cache read.
+    """
+    start_refresher()
+
+    status = cache.get(CACHE_KEY)
+    if status is None:
+        status = probe_telescope_status()
+    return status
+
+
+class TelescopeStatusHub:
+    """
+    Fan-out of telescope status transitions to SSE subscribers.
+
+    A single asyncio task probes every REFRESH_INTERVAL seconds while at
+    least one subscriber is connected, so N open tabs cost one probe loop.
+    Each subscriber gets a 1-slot queue holding only the latest status.
+    """
+
+    def __init__(self):
+        self._subscribers = set()
+        self._task = None
+        self._latest = None
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=1)
+        self._subscribers.add(queue)
+        if self._latest is not None:
+            queue.put_nowait(self._latest)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._probe_loop())
+        return queue
+
+    def unsubscribe(self, queue):
+        self._subscribers.discard(queue)
+        if not self._subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+            self._latest = None
+
+    def _publish(self, status):
+        self._latest = status
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(status)
+
+    async def _probe_loop(self):
+        previous = None
+        while True:
+            try:
+                status = await asyncio.to_thread(probe_telescope_status)
+            except Exception:
+                status = None
+
+            if status is not None:
+                state = (status['tunnel_active'], status['vnc_active'])
+                if state != previous:
+                    previous = state
+                    self._publish(status)
+
+            await asyncio.sleep(REFRESH_INTERVAL)
+
+
+status_hub = TelescopeStatusHub()
@@ -1,4 +1,239 @@
 #astronomy/tests.py
-from django.test import TestCase
+from datetime import date, datetime, timezone as dt_timezone
+import random
+import shutil
+import tempfile
 
-# Create your tests here.
+import numpy as np
+
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from core.jobs import claim_next_job, run_job
+from core.models import BackgroundJob
+
+from .ephemeris import moon_phase_at, phase_name
+from .geo import GEOHASH_PRECISION, MAX_COVER_CELLS, cover, encode, in_box
+from .lightcurve import lttb
+from .models import AstroPhoto, EclipseObservation, ObservationLog, ResearchDataEntry, ResearchProject
+
+
+class ProcessPhotoTestCase(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Seperti run_worker: daftarkan tasks.py setiap app
+        autodiscover_modules('tasks')
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def run_worker(self, limit=5):
+        runs = 0
+        while runs < limit:
+            job = claim_next_job()
+            if job is None:
+                break
+            run_job(job)
+            runs += 1
+        return runs
+
+    def test_unreadable_image_is_processed_once(self):
+        photo = AstroPhoto(title='Not an image', object_name='Moon', capture_date=timezone.now())
+        photo.image.save('broken.jpg', ContentFile(b'not an image'), save=False)
+        photo.save()
+
+        self.assertEqual(self.run_worker(), 1)
+        self.assertFalse(BackgroundJob.objects.filter(status='pending').exists())
+
+        photo.refresh_from_db()
+        self.assertEqual(photo.image_derivatives['source'], photo.image.name)
+        self.assertIn('error', photo.image_derivatives)
+        self.assertIsNotNone(photo.exif_ingested_at)
+
+    def test_storage_error_does_not_mark_exif_ingested(self):
+        photo = AstroPhoto(title='Missing file', object_name='Moon', capture_date=timezone.now())
+        photo.image.save('missing.jpg', ContentFile(b'not an image'), save=False)
+        photo.save()
+        photo.image.storage.delete(photo.image.name)
+
+        with self.assertRaises(OSError):
+            photo.ingest_exif()
+        photo.refresh_from_db()
+        self.assertIsNone(photo.exif_ingested_at)
+
+
+class MeteorNightQueueTestCase(TestCase):
+    """Malam lama dan baru entry meteor sama-sama masuk antrean update_zhr"""
+
+    def setUp(self):
+        self.project = ResearchProject.objects.create(
+            title='Perseids', research_type='meteor', description='',
+            start_date=date(2025, 8, 1), target_duration_days=30,
+        )
+
+    def queued_nights(self):
+        return sorted(
+            job.payload['night']
+            for job in BackgroundJob.objects.filter(task='astronomy.update_zhr', status='pending')
+        )
+
+    def add(self, moment):
+        with self.captureOnCommitCallbacks(execute=True):
+            return ResearchDataEntry.objects.create(
+                project=self.project, observation_datetime=moment, data={'count': 3},
+            )
+
+    def test_moved_entry_queues_old_and_new_night(self):
+        entry = self.add(datetime(2025, 8, 10, 22, tzinfo=dt_timezone.utc))
+        BackgroundJob.objects.all().delete()
+
+        entry.observation_datetime = datetime(2025, 8, 12, 22, tzinfo=dt_timezone.utc)
+        with self.captureOnCommitCallbacks(execute=True):
+            entry.save()
+        self.assertEqual(self.queued_nights(), ['2025-08-10', '2025-08-12'])
+
+    def test_queryset_delete_queues_night(self):
+        entry = self.add(datetime(2025, 8, 10, 22, tzinfo=dt_timezone.utc))
+        BackgroundJob.objects.all().delete()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ResearchDataEntry.objects.filter(pk=entry.pk).delete()
+        self.assertEqual(self.queued_nights(), ['2025-08-10'])
+
+
+class EclipseTimelinePhotoTestCase(TestCase):
+    """Timeline gerhana lama ikut diperbarui saat foto pindah, kehilangan exact_time atau dihapus"""
+
+    def setUp(self):
+        moment = datetime(2025, 9, 7, 18, tzinfo=dt_timezone.utc)
+        self.eclipses = []
+        for title in ('Lunar A', 'Lunar B'):
+            observation = ObservationLog.objects.create(
+                title=title, observation_date=moment, object_name='Moon', location='Bandung',
+                seeing=3, transparency=3, notes='',
+            )
+            self.eclipses.append(EclipseObservation.objects.create(
+                observation=observation, eclipse_type='lunar_total',
+                u1_time=moment, u4_time=datetime(2025, 9, 7, 21, tzinfo=dt_timezone.utc),
+            ))
+        self.photo = AstroPhoto.objects.create(
+            title='Totality', object_name='Moon', capture_date=moment,
+            observation=self.eclipses[0].observation,
+            exact_time=datetime(2025, 9, 7, 19, tzinfo=dt_timezone.utc),
+        )
+
+    def photo_ids(self, eclipse):
+        eclipse.refresh_from_db()
+        return [photo['id'] for photo in eclipse.timeline['photos']]
+
+    def test_photo_moved_to_other_observation(self):
+        self.assertEqual(self.photo_ids(self.eclipses[0]), [self.photo.pk])
+        self.photo.observation = self.eclipses[1].observation
+        self.photo.save()
+        self.assertEqual(self.photo_ids(self.eclipses[0]), [])
+        self.assertEqual(self.photo_ids(self.eclipses[1]), [self.photo.pk])
+
+    def test_exact_time_cleared(self):
+        self.photo.exact_time = None
+        self.photo.save()
+        self.assertEqual(self.photo_ids(self.eclipses[0]), [])
+
+    def test_delete_uses_stored_values(self):
+        # Instance lama tanpa observation; baris di DB masih terhubung
+        stale = AstroPhoto.objects.get(pk=self.photo.pk)
+        stale.observation = None
+        stale.delete()
+        self.assertEqual(self.photo_ids(self.eclipses[0]), [])
+
+
+class GeohashTestCase(SimpleTestCase):
+    """encode() terhadap nilai referensi, cover() tidak boleh melewatkan titik di dalam box"""
+
+    def test_encode_reference_values(self):
+        self.assertEqual(encode(42.605, -5.603, precision=5), 'ezs42')
+        self.assertEqual(encode(57.64911, 10.40744, precision=11), 'u4pruydqqvj')
+        self.assertEqual(len(encode(-6.2383, 106.9756)), GEOHASH_PRECISION)
+
+    def assertCovers(self, south, west, north, east):
+        prefixes = cover(south, west, north, east)
+        self.assertLessEqual(len(prefixes), MAX_COVER_CELLS)
+        rng = random.Random(20)
+        width = (east - west) % 360 or 360
+        for _ in range(2000):
+            latitude = rng.uniform(south, north)
+            longitude = (west + rng.uniform(0, width) + 180) % 360 - 180
+            self.assertTrue(in_box(latitude, longitude, south, west, north, east))
+            geohash = encode(latitude, longitude)
+            self.assertTrue(
+                any(geohash.startswith(prefix) for prefix in prefixes),
+                f'{latitude}, {longitude} ({geohash}) not covered by {prefixes}',
+            )
+
+    def test_cover_small_box(self):
+        self.assertCovers(-6.3, 106.8, -6.1, 107.0)
+
+    def test_cover_large_box(self):
+        self.assertCovers(-45.0, -20.0, 60.0, 75.0)
+
+    def test_cover_across_antimeridian(self):
+        self.assertCovers(10.0, 170.0, 20.0, -170.0)
+
+    def test_cover_whole_world(self):
+        self.assertEqual(cover(-90.0, -180.0, 90.0, 180.0), [''])
+
+
+class MoonPhaseTestCase(SimpleTestCase):
+    """Iluminasi Bulan pada bulan baru / purnama yang diketahui (waktu UTC)"""
+
+    NEW_MOONS = [datetime(2024, 4, 8, 18, 21, tzinfo=dt_timezone.utc), datetime(2025, 1, 29, 12, 36, tzinfo=dt_timezone.utc)]
+    FULL_MOONS = [datetime(2024, 4, 23, 23, 49, tzinfo=dt_timezone.utc), datetime(2025, 9, 7, 18, 9, tzinfo=dt_timezone.utc)]
+
+    def test_new_moon(self):
+        illumination, _, longitude_difference = moon_phase_at(self.NEW_MOONS)
+        for index in range(len(self.NEW_MOONS)):
+            self.assertLess(illumination[index], 0.005)
+            self.assertEqual(phase_name(longitude_difference[index]), 'New Moon')
+
+    def test_full_moon(self):
+        illumination, phase_angle, longitude_difference = moon_phase_at(self.FULL_MOONS)
+        for index in range(len(self.FULL_MOONS)):
+            self.assertGreater(illumination[index], 0.995)
+            self.assertLess(phase_angle[index], 10)
+            self.assertEqual(phase_name(longitude_difference[index]), 'Full Moon')
+
+    def test_last_quarter(self):
+        illumination, _, longitude_difference = moon_phase_at([datetime(2025, 9, 14, 10, 33, tzinfo=dt_timezone.utc)])
+        self.assertAlmostEqual(illumination[0], 0.5, delta=0.02)
+        self.assertEqual(phase_name(longitude_difference[0]), 'Last Quarter')
+
+
+class LttbTestCase(SimpleTestCase):
+    """LTTB menyimpan titik ujung, tepat ``threshold`` titik, berurutan"""
+
+    def setUp(self):
+        self.x = np.arange(1000, dtype=float)
+        self.y = np.sin(self.x / 30)
+
+    def test_budget_and_endpoints(self):
+        for threshold in (3, 10, 100, 999):
+            kept = lttb(self.x, self.y, threshold)
+            self.assertEqual(len(kept), threshold)
+            self.assertEqual((kept[0], kept[-1]), (0, len(self.x) - 1))
+            self.assertTrue(np.all(np.diff(kept) > 0))
+
+    def test_small_series_is_returned_whole(self):
+        for threshold in (1, 2, 1000, 5000):
+            np.testing.assert_array_equal(lttb(self.x, self.y, threshold), np.arange(1000))
+
+    def test_keeps_spike(self):
+        self.y[537] = 50.0
+        self.assertIn(537, lttb(self.x, self.y, 50))
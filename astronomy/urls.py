@@ -4,7 +4,10 @@ from .views import (
     gallery,
     observation_detail,
     observation_list,
-    telescope_remote_access
+    observation_photos_zip,
+    research_photos_zip,
+    telescope_remote_access,
+    telescope_status_events
 )
 
 app_name = 'astronomy'
@@ -13,5 +16,8 @@ urlpatterns = [
     path('', gallery, name='gallery'),
     path('observations/', observation_list, name='observations'),
     path('observations/<slug:slug>/', observation_detail, name='observation_detail'),
+    path('observations/<slug:slug>/photos.zip', observation_photos_zip, name='observation_photos_zip'),
+    path('research/<slug:slug>/photos.zip', research_photos_zip, name='research_photos_zip'),
     path('telescope/remote/', telescope_remote_access, name='telescope_remote'),
+    path('telescope/events/', telescope_status_events, name='telescope_events'),
 ]
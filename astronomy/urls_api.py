@@ -1,8 +1,11 @@
 from django.urls import include, path, re_path
-from .views_api import TelescopeStatusAPI
+from .views_api import LightCurveAPI, ObservationMapAPI, SkyTonightAPI, TelescopeStatusAPI
 
 app_name = 'astronomyapi'
 
 urlpatterns = [
     path('telescope/status/', TelescopeStatusAPI.as_view(), name='telescope_status'),
-]
\ No newline at end of file
+    path('research/<slug:slug>/light-curve/', LightCurveAPI.as_view(), name='light_curve'),
+    path('sky/tonight/', SkyTonightAPI.as_view(), name='sky_tonight'),
+    path('observations/map/', ObservationMapAPI.as_view(), name='observation_map'),
+]
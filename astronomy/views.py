@@ -1,19 +1,53 @@
 #astronomy/views.py
 from django.shortcuts import render, get_object_or_404
+from django.http import StreamingHttpResponse
+from django.contrib.auth.views import redirect_to_login
 from django.core.paginator import Paginator
 from .models import (
     AstroPhoto,
     ObservationLog,
-    CelestialObjects
+    CelestialObjects,
+    ResearchProject
 )
+from .ephemeris import DARK_SKY_ILLUMINATION
+from .exports import stream_photo_zip
+from .telescope import get_telescope_status, status_hub
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 
-import socket
-import subprocess
+import asyncio
+import json
+import math
+
 # Create your views here.
 
+# SSE comment interval so proxies do not drop idle streams
+SSE_HEARTBEAT_SECONDS = 15
+
+GALLERY_SORTS = {
+    'exposure': 'exposure_seconds',
+    '-exposure': '-exposure_seconds',
+    'iso': 'iso',
+    '-iso': '-iso',
+    'focal': 'focal_length_mm',
+    '-focal': '-focal_length_mm',
+}
+
+TRUTHY_PARAMS = ('1', 'true', 'yes')
+
+def parse_float_param(value):
+    """Parse an optional float query parameter, ignoring garbage, nan and inf"""
+    try:
+        number = float(value) if value else None
+    except ValueError:
+        return None
+    return number if number is not None and math.isfinite(number) else None
+
+def parse_bool_param(value):
+    """True only for explicit truthy query values (?dark=0 stays False)"""
+    return (value or '').strip().lower() in TRUTHY_PARAMS
+
 def gallery(request):
     """Astrophotography gallery page"""
     
@@ -24,6 +58,27 @@ def gallery(request):
     if object_type:
         photos = photos.filter(celestial_objects__object_type=object_type)
     
+    # Technical filters, served by the indexed numeric EXIF columns
+    # e.g. ?min_exposure=10&iso=1600
+    numeric_filters = {
+        'min_exposure': 'exposure_seconds__gte',
+        'max_exposure': 'exposure_seconds__lte',
+        'min_focal': 'focal_length_mm__gte',
+        'max_focal': 'focal_length_mm__lte',
+    }
+    for param, lookup in numeric_filters.items():
+        value = parse_float_param(request.GET.get(param))
+        if value is not None:
+            photos = photos.filter(**{lookup: value})
+    
+    iso = request.GET.get('iso')
+    if iso and iso.isdigit():
+        photos = photos.filter(iso=int(iso))
+    
+    sort = request.GET.get('sort')
+    if sort in GALLERY_SORTS:
+        photos = photos.order_by(GALLERY_SORTS[sort], '-capture_date')
+    
     # Pagination
     paginator = Paginator(photos, 12)
     page_number = request.GET.get('page')
@@ -32,10 +87,15 @@ def gallery(request):
     # Get object types for filter
     object_types = CelestialObjects.OBJECT_TYPES
     
+    # Keep active filters in pagination links
+    filter_params = request.GET.copy()
+    filter_params.pop('page', None)
+    
     context = {
         'page_obj':page_obj,
         'object_types' : object_types,
-        'current_type': object_type
+        'current_type': object_type,
+        'filter_query': filter_params.urlencode()
     }
     
     return render(request, 'astronomy/gallery.html', context)
@@ -44,14 +104,30 @@ def observation_list(request):
     """List of all observation logs"""
     observations = ObservationLog.objects.filter(is_public=True).order_by('-observation_date')
     
+    # Lunar illumination filters, served by the indexed moon columns
+    # e.g. ?dark=1 or ?max_illumination=0.5
+    max_illumination = parse_float_param(request.GET.get('max_illumination'))
+    if parse_bool_param(request.GET.get('dark')):
+        max_illumination = DARK_SKY_ILLUMINATION
+    if max_illumination is not None:
+        observations = observations.filter(moon_illumination__lte=max_illumination)
+    
+    min_illumination = parse_float_param(request.GET.get('min_illumination'))
+    if min_illumination is not None:
+        observations = observations.filter(moon_illumination__gte=min_illumination)
+    
     #Pagination
     paginator = Paginator(observations, 10)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     
+    # Keep active filters in pagination links
+    filter_params = request.GET.copy()
+    filter_params.pop('page', None)
     
     context = {
-        'page_obj':page_obj
+        'page_obj':page_obj,
+        'filter_query': filter_params.urlencode()
     }
     
     return render(request, 'astronomy/observations.html', context)
@@ -76,58 +152,31 @@ def observation_detail(request, slug):
     
     return render(request, 'astronomy/observation_detail.html', context)
 
-def check_telescope_status():
+def photo_zip_response(photos, filename):
+    """Stream photos as a ZIP download without building it in memory"""
+    response = StreamingHttpResponse(stream_photo_zip(photos), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+def observation_photos_zip(request, slug):
+    """Download every public photo of an observation session as one ZIP"""
     
-    status = {
-        'tunnel_active': False,
-        'vnc_active': False,
-        'message': ''
-    }
+    observation = get_object_or_404(ObservationLog, slug=slug, is_public=True)
+    photos = observation.photos.filter(is_public=True).exclude(image='').order_by(
+        'exact_time', 'capture_date', 'sequence_number'
+    )
     
-    try:
-        
-        host_to_try = [
-            'host.docker.internal',
-            '172.17.0.1',
-            'localhost'
-        ]
-        
-        for host in host_to_try:
-        #cek port 15900 listening 
-            try:
-                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                    s.settimeout(1)
-                    result = s.connect_ex((host, 15900))
-                    status['tunnel_active'] = (result==0)
-                    if result==0:
-                        break
-            except:
-                continue
-            
-        for host in host_to_try:
-            #cek port 6080 listening
-            try:
-                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                    s.settimeout(1)
-                    result = s.connect_ex((host, 6080))
-                    status['vnc_active'] = (result==0)
-                    if result==0:
-                        break
-            except:
-                continue
-            
-            
-        if status['tunnel_active'] and status['vnc_active']:
-            status['message'] = "Telescope connection active" 
-        elif status['vnc_active'] and not status['tunnel_active']:
-            status['message'] = "waiting for Astrobery connection" 
-        else:
-            status['message'] = "SERVICE UNAVAILABLE"
-    
-    except Exception as e:
-        status['message'] = f"errorchecking status: {str}"
-    
-    return status
+    return photo_zip_response(photos, f"{observation.slug}-photos.zip")
+
+def research_photos_zip(request, slug):
+    """Download every public photo of a research project as one ZIP"""
+    
+    project = get_object_or_404(ResearchProject, slug=slug, is_public=True)
+    photos = project.photos.filter(is_public=True).exclude(image='').order_by(
+        'exact_time', 'capture_date', 'sequence_number'
+    )
+    
+    return photo_zip_response(photos, f"{project.slug}-photos.zip")
 
 @login_required
 def telescope_remote_access(request):
@@ -136,7 +185,36 @@ def telescope_remote_access(request):
     context = {
         'title': 'Remote Telescope Access',
         'vnc_url':'https://astro.ideasophia.com/vnc.html',
-        'status': check_telescope_status()
+        'status': get_telescope_status()
     }
     
-    return render(request, 'astronomy/telescope_remote.html', context)
\ No newline at end of file
+    return render(request, 'astronomy/telescope_remote.html', context)
+
+async def telescope_status_events(request):
+    """
+    Server-sent event stream of telescope/VNC status transitions.
+    
+    Must be served through ASGI (myportfolio.asgi); every connected viewer
+    shares the single probe loop in ``status_hub``.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return redirect_to_login(request.get_full_path())
+    
+    async def event_stream():
+        queue = status_hub.subscribe()
+        try:
+            while True:
+                try:
+                    status = await asyncio.wait_for(queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: status\ndata: {json.dumps(status)}\n\n"
+        finally:
+            status_hub.unsubscribe(queue)
+    
+    response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
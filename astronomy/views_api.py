@@ -1,13 +1,151 @@
+from datetime import date
+
+from django.core.cache import cache
+from django.shortcuts import get_object_or_404
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 
-from .views import check_telescope_status
+from .columns import database_stamp
+from .ephemeris import DEFAULT_SITE, MIN_OBJECT_ALTITUDE, find_site, served_nights, whats_up_tonight
+from .geo import logs_in_box, logs_near
+from .lightcurve import DEFAULT_PHASE_BINS, DEFAULT_POINT_BUDGET, light_curve
+from .models import ObservationLog, ResearchProject
+from .telescope import get_telescope_status
+from .views import parse_float_param
+
+# Light-curve payloads are keyed by the data stamp, so new entries invalidate them
+LIGHT_CURVE_CACHE_TTL = 60 * 60
+
+MAX_MAP_RESULTS = 500
+MAX_MAP_RADIUS_KM = 2000
 
 
 class TelescopeStatusAPI(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        status = check_telescope_status()
-        return Response(status)
\ No newline at end of file
+        status = get_telescope_status()
+        return Response(status)
+
+
+class LightCurveAPI(APIView):
+    """
+    Downsampled light curve of a variable star project.
+
+    Query params: points (LTTB budget per curve), bins (phase bins),
+    period (fold at a known period instead of searching), min_period,
+    max_period (search range in days).
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, slug):
+        projects = ResearchProject.objects.filter(research_type='variable_star')
+        if not request.user.is_authenticated:
+            projects = projects.filter(is_public=True)
+        project = get_object_or_404(projects, slug=slug)
+
+        try:
+            points = int(request.query_params.get('points', DEFAULT_POINT_BUDGET))
+            bins = max(1, min(int(request.query_params.get('bins', DEFAULT_PHASE_BINS)), 500))
+        except ValueError:
+            return Response({'detail': 'points and bins must be integers'}, status=400)
+
+        options = {
+            name: parse_float_param(request.query_params.get(name))
+            for name in ('period', 'min_period', 'max_period')
+        }
+        if any(value is not None and value <= 0 for value in options.values()):
+            return Response({'detail': 'periods must be positive'}, status=400)
+
+        count, latest = database_stamp(project.pk)
+        cache_key = (
+            f'astronomy:light_curve:{project.pk}:{count}:{latest}:{points}:{bins}:'
+            + ':'.join(str(options[name]) for name in sorted(options))
+        )
+        data = cache.get(cache_key)
+        if data is None:
+            data = light_curve(project, points=points, bins=bins, **options)
+            cache.set(cache_key, data, LIGHT_CURVE_CACHE_TTL)
+
+        return Response(data)
+
+
+class SkyTonightAPI(APIView):
+    """
+    Objects above the horizon while the sky is dark, from the precomputed
+    ephemeris tables.
+
+    Query params: date (YYYY-MM-DD, evening of the night; default tonight,
+    at most EPHEMERIS_DAYS ahead), lat, lon (default Bekasi; must be a
+    configured or precomputed site), min_altitude (degrees).
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        latitude = parse_float_param(request.query_params.get('lat'))
+        longitude = parse_float_param(request.query_params.get('lon'))
+        site = DEFAULT_SITE
+        if latitude is not None and longitude is not None:
+            if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+                return Response({'detail': 'lat/lon out of range'}, status=400)
+            # Hanya situs yang tabelnya dikelola worker, request tidak membangun tabel baru
+            site = find_site(latitude, longitude)
+            if site is None:
+                return Response({'detail': 'no precomputed ephemeris for this site'}, status=400)
+
+        night = None
+        if request.query_params.get('date'):
+            try:
+                night = date.fromisoformat(request.query_params['date'])
+            except ValueError:
+                return Response({'detail': 'date must be YYYY-MM-DD'}, status=400)
+            first, last = served_nights(site)
+            if not first <= night <= last:
+                return Response(
+                    {'detail': f'date must be between {first.isoformat()} and {last.isoformat()}'},
+                    status=400,
+                )
+
+        min_altitude = parse_float_param(request.query_params.get('min_altitude'))
+        if min_altitude is None:
+            min_altitude = MIN_OBJECT_ALTITUDE
+
+        return Response(whats_up_tonight(night, site, min_altitude))
+
+
+class ObservationMapAPI(APIView):
+    """
+    Public observation logs near a site or inside a box, via the geohash index.
+
+    Query params: lat, lon, radius_km (nearest first), or
+    bbox=south,west,north,east (newest first); limit.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        logs = ObservationLog.objects.filter(is_public=True).order_by('-observation_date')
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', MAX_MAP_RESULTS)), MAX_MAP_RESULTS))
+        except ValueError:
+            return Response({'detail': 'limit must be an integer'}, status=400)
+
+        if request.query_params.get('bbox'):
+            try:
+                south, west, north, east = (float(value) for value in request.query_params['bbox'].split(','))
+            except ValueError:
+                return Response({'detail': 'bbox must be south,west,north,east'}, status=400)
+            if not (-90 <= south <= north <= 90 and -180 <= west <= 180 and -180 <= east <= 180):
+                return Response({'detail': 'bbox out of range'}, status=400)
+            rows = logs_in_box(logs, south, west, north, east, limit=limit)
+        else:
+            latitude = parse_float_param(request.query_params.get('lat'))
+            longitude = parse_float_param(request.query_params.get('lon'))
+            radius = parse_float_param(request.query_params.get('radius_km'))
+            if latitude is None or longitude is None or radius is None:
+                return Response({'detail': 'give lat, lon and radius_km, or bbox'}, status=400)
+            if not -90 <= latitude <= 90 or not -180 <= longitude <= 180 or not 0 < radius <= MAX_MAP_RADIUS_KM:
+                return Response({'detail': 'lat/lon/radius_km out of range'}, status=400)
+            rows = logs_near(logs, latitude, longitude, radius, limit=limit)
+
+        return Response({'count': len(rows), 'results': rows})
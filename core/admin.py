@@ -11,7 +11,8 @@ from .models import (
     BlogImage,
     AllResearch,
     DocumentsProjects,
-    Comment
+    Comment,
+    BackgroundJob
 )
 # Register your models here.
 
@@ -200,4 +201,36 @@ class CommentAdmin(admin.ModelAdmin):
         self.message_user(request, f'{queryset.count()} comments unapproved.')
     unapprove_comments.short_description = 'Unapprove selected comments'
     
-    #ok
\ No newline at end of file
+    #ok
+
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    list_display = ['task', 'status', 'attempts', 'max_attempts', 'run_after', 'created_at', 'finished_at']
+    list_filter = ['status', 'task']
+    search_fields = ['task', 'last_error']
+    date_hierarchy = 'created_at'
+    readonly_fields = ['attempts', 'last_error', 'started_at', 'finished_at', 'created_at', 'updated_at']
+    actions = ['retry_jobs']
+    
+    fieldsets = (
+        ('Job', {
+            'fields': ('task', 'payload', 'status')
+        }),
+        ('Retry', {
+            'fields': ('attempts', 'max_attempts', 'run_after', 'last_error')
+        }),
+        ('Timing', {
+            'fields': ('started_at', 'finished_at', 'created_at', 'updated_at'),
+            'classes': ('collapse',)
+        }),
+    )
+    
+    def retry_jobs(self, request, queryset):
+        """Put failed jobs back in the queue"""
+        from django.utils import timezone
+        
+        updated = queryset.exclude(status='running').update(
+            status='pending', attempts=0, run_after=timezone.now()
+        )
+        self.message_user(request, f'{updated} jobs re-queued.')
+    retry_jobs.short_description = 'Retry selected jobs'
@@ -0,0 +1,254 @@
+# core/images.py
+"""
+Responsive image derivatives.
+
+Every uploaded image (AstroPhoto.image, BlogImage.image, Project.thumbnail)
+gets resized variants in WebP and JPEG so templates can emit ``srcset``
+instead of sending the multi-megabyte original to every grid tile.
+
+The derivative metadata is stored as JSON on the owning model::
+
+    {
+        "source": "astronomy/photos/2025/10/moon.jpg",
+        "width": 4000,
+        "height": 3000,
+        "variants": {
+            "thumb":  {"width": 400,  "height": 300,  "webp": "...", "jpeg": "..."},
+            "medium": {"width": 1024, "height": 768,  "webp": "...", "jpeg": "..."},
+            "full":   {"width": 2048, "height": 1536, "webp": "...", "jpeg": "..."}
+        }
+    }
+
+A source Pillow cannot decode is recorded as ``{"source": ..., "error": ...,
+"variants": {}}`` so it counts as processed and is not queued again.
+"""
+from io import BytesIO
+import logging
+import os
+
+from django.core.files.base import ContentFile
+from django.utils.html import format_html
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Longest edge in pixels per variant, smallest first
+DERIVATIVE_SIZES = {
+    'thumb': 400,
+    'medium': 1024,
+    'full': 2048,
+}
+
+DERIVATIVE_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+
+DERIVATIVE_ROOT = 'derivatives'
+
+# Pillow reports undecodable data (unknown format, truncated file) as OSError
+# too, so decoding happens on bytes already read from storage
+DECODE_ERRORS = (OSError, ValueError, SyntaxError, Image.DecompressionBombError)
+
+
+class InvalidImageError(Exception):
+    """The stored file is not an image Pillow can decode; retrying will not help"""
+
+
+def derivative_name(source_name, size_name, extension):
+    """Storage path for one variant of ``source_name``"""
+    stem, _ = os.path.splitext(source_name)
+    return f'{DERIVATIVE_ROOT}/{stem}_{size_name}.{extension}'
+
+
+def _encode(image, image_format, options):
+    if image_format == 'JPEG' and image.mode != 'RGB':
+        # JPEG tidak punya alpha, tempel di atas background putih
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        if image.mode in ('RGBA', 'LA') or 'transparency' in image.info:
+            rgba = image.convert('RGBA')
+            background.paste(rgba, mask=rgba.getchannel('A'))
+        else:
+            background.paste(image.convert('RGB'))
+        image = background
+    elif image_format == 'WEBP' and image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+
+    buffer = BytesIO()
+    image.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def generate_derivatives(field_file):
+    """
+    Build every size/format variant of an image field file.
+
+    Variants are never upscaled; sizes that would come out identical to a
+    smaller one are skipped. Returns the derivative metadata dict.
+
+    Raises InvalidImageError for a corrupt or oversized image; storage
+    errors (OSError) propagate so the job queue can retry them.
+    """
+    storage = field_file.storage
+    source_name = field_file.name
+
+    with storage.open(source_name, 'rb') as source:
+        data = source.read()
+
+    try:
+        original = Image.open(BytesIO(data))
+        original = ImageOps.exif_transpose(original)
+        original.load()
+    except DECODE_ERRORS as e:
+        raise InvalidImageError(f'{source_name}: {e}') from e
+
+    width, height = original.size
+    derivatives = {
+        'source': source_name,
+        'width': width,
+        'height': height,
+        'variants': {},
+    }
+
+    seen_widths = set()
+    for size_name, max_edge in DERIVATIVE_SIZES.items():
+        variant = original.copy()
+        variant.thumbnail((max_edge, max_edge), Image.LANCZOS)
+        if variant.width in seen_widths:
+            continue
+        seen_widths.add(variant.width)
+
+        entry = {'width': variant.width, 'height': variant.height}
+        for extension, (image_format, options) in DERIVATIVE_FORMATS.items():
+            name = derivative_name(source_name, size_name, extension)
+            if storage.exists(name):
+                storage.delete(name)
+            entry[extension] = storage.save(
+                name, ContentFile(_encode(variant, image_format, options))
+            )
+        derivatives['variants'][size_name] = entry
+
+    return derivatives
+
+
+def delete_derivatives(derivatives, storage):
+    """Remove every variant file listed in a derivative dict"""
+    for entry in (derivatives or {}).get('variants', {}).values():
+        for extension in DERIVATIVE_FORMATS:
+            name = entry.get(extension)
+            if name and storage.exists(name):
+                storage.delete(name)
+
+
+def derivatives_are_current(field_file, derivatives):
+    """True when ``derivatives`` were built from the file currently in the field"""
+    if not field_file:
+        return not derivatives
+    return bool(derivatives) and derivatives.get('source') == field_file.name
+
+
+def refresh_derivatives(instance, field_name, derivatives_field, force=False):
+    """
+    Regenerate the derivatives of ``instance.<field_name>`` when the source
+    image changed, and persist them with a queryset update so the model's
+    save() is not re-entered.
+
+    Returns True when the derivatives were rebuilt. An undecodable image is
+    logged and skipped; storage errors are raised to the caller.
+    """
+    field_file = getattr(instance, field_name)
+    derivatives = getattr(instance, derivatives_field)
+
+    if not force and derivatives_are_current(field_file, derivatives):
+        return False
+
+    if derivatives and derivatives.get('source') != getattr(field_file, 'name', None):
+        delete_derivatives(derivatives, field_file.storage)
+
+    new_derivatives = {}
+    built = True
+    if field_file:
+        try:
+            new_derivatives = generate_derivatives(field_file)
+        except InvalidImageError as e:
+            logger.warning('Could not build derivatives: %s', e)
+            # Tandai sumber ini sudah diproses supaya tidak di-queue ulang terus
+            new_derivatives = {'source': field_file.name, 'error': str(e), 'variants': {}}
+            built = False
+
+    setattr(instance, derivatives_field, new_derivatives)
+    type(instance).objects.filter(pk=instance.pk).update(
+        **{derivatives_field: new_derivatives}
+    )
+    return built
+
+
+def queue_derivatives(instance, field_name, derivatives_field):
+    """
+    Queue derivative generation on the background worker when the source
+    image changed, so uploads do not wait for Pillow.
+    """
+    from .jobs import enqueue
+
+    if derivatives_are_current(getattr(instance, field_name), getattr(instance, derivatives_field)):
+        return None
+    return enqueue('core.build_derivatives', model=instance._meta.label, pk=instance.pk)
+
+
+def variant_url(field_file, derivatives, size_name, extension='jpeg'):
+    """URL of one variant, falling back to the original file"""
+    if not derivatives_are_current(field_file, derivatives):
+        return field_file.url if field_file else ''
+
+    variants = derivatives.get('variants', {})
+    entry = variants.get(size_name)
+    if entry is None and variants:
+        # Ambil varian terbesar yang tersedia (gambar kecil tidak di-upscale)
+        entry = list(variants.values())[-1]
+    if entry is None:
+        return field_file.url
+    return field_file.storage.url(entry[extension])
+
+
+def build_srcset(field_file, derivatives, extension):
+    """``srcset`` string of every variant in the given format"""
+    if not derivatives_are_current(field_file, derivatives):
+        return ''
+
+    storage = field_file.storage
+    return ', '.join(
+        f"{storage.url(entry[extension])} {entry['width']}w"
+        for entry in derivatives.get('variants', {}).values()
+    )
+
+
+def responsive_image_html(field_file, derivatives, alt='', css_class='', sizes='100vw', size='medium', lazy=True):
+    """
+    <picture> markup with WebP and JPEG srcsets for an image field.
+
+    Falls back to a plain <img> of the original file while the derivatives
+    have not been generated yet.
+    """
+    if not field_file:
+        return ''
+
+    loading = 'lazy' if lazy else 'eager'
+
+    if not derivatives_are_current(field_file, derivatives) or not derivatives.get('variants'):
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" loading="{}">',
+            field_file.url, alt, css_class, loading
+        )
+
+    variants = derivatives['variants']
+    fallback = variants.get(size) or list(variants.values())[-1]
+
+    return format_html(
+        '<picture>'
+        '<source type="image/webp" srcset="{}" sizes="{}">'
+        '<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" alt="{}" class="{}" loading="{}">'
+        '</picture>',
+        build_srcset(field_file, derivatives, 'webp'), sizes,
+        field_file.storage.url(fallback['jpeg']), build_srcset(field_file, derivatives, 'jpeg'), sizes,
+        fallback['width'], fallback['height'], alt, css_class, loading
+    )
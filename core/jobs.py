@@ -0,0 +1,112 @@
+# core/jobs.py
+"""
+Small database-backed job queue.
+
+Tasks are plain functions registered with ``@register_task`` in an app's
+``tasks.py``. Requests call ``enqueue()`` and return immediately; the
+``manage.py run_worker`` process claims pending rows, runs them and retries
+failures with exponential backoff.
+
+    from core.jobs import enqueue
+    enqueue('core.build_derivatives', model='astronomy.AstroPhoto', pk=photo.pk)
+"""
+from datetime import timedelta
+import logging
+import traceback
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Retry delay = RETRY_BASE_DELAY * 2 ** (attempts - 1)
+RETRY_BASE_DELAY = timedelta(seconds=30)
+
+# Running jobs older than this are assumed to belong to a dead worker
+STALE_JOB_TIMEOUT = timedelta(minutes=30)
+
+_registry = {}
+
+
+def register_task(name):
+    """Decorator registering a function as a background task"""
+    def decorator(func):
+        _registry[name] = func
+        return func
+    return decorator
+
+
+def get_task(name):
+    return _registry[name]
+
+
+def enqueue(task, max_attempts=3, **payload):
+    """
+    Queue ``task`` with keyword ``payload``.
+
+    A task with an identical payload that is still pending is reused instead
+    of queued twice, so saving the same object repeatedly costs one job.
+    """
+    from .models import BackgroundJob
+
+    existing = BackgroundJob.objects.filter(
+        task=task, payload=payload, status='pending'
+    ).first()
+    if existing:
+        return existing
+
+    return BackgroundJob.objects.create(
+        task=task, payload=payload, max_attempts=max_attempts
+    )
+
+
+def claim_next_job():
+    """Lock and mark the next runnable job as running, or return None"""
+    from .models import BackgroundJob
+
+    now = timezone.now()
+    runnable = (
+        Q(status='pending', run_after__lte=now) |
+        Q(status='running', started_at__lt=now - STALE_JOB_TIMEOUT)
+    )
+
+    with transaction.atomic():
+        job = (
+            BackgroundJob.objects
+            .select_for_update(skip_locked=True)
+            .filter(runnable)
+            .order_by('run_after', 'id')
+            .first()
+        )
+        if job is None:
+            return None
+
+        job.status = 'running'
+        job.attempts += 1
+        job.started_at = now
+        job.save(update_fields=['status', 'attempts', 'started_at', 'updated_at'])
+
+    return job
+
+
+def run_job(job):
+    """Execute a claimed job and record its outcome"""
+    try:
+        get_task(job.task)(**job.payload)
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            job.status = 'pending'
+            job.run_after = timezone.now() + RETRY_BASE_DELAY * 2 ** (job.attempts - 1)
+        else:
+            job.status = 'failed'
+            job.finished_at = timezone.now()
+        logger.warning('Job %s failed (attempt %s/%s)', job, job.attempts, job.max_attempts)
+    else:
+        job.status = 'done'
+        job.last_error = ''
+        job.finished_at = timezone.now()
+
+    job.save(update_fields=['status', 'last_error', 'run_after', 'finished_at', 'updated_at'])
+    return job.status == 'done'
@@ -0,0 +1,44 @@
+# core/management/commands/bench_markdown.py
+import timeit
+
+from django.core.management.base import BaseCommand
+
+from core.utils import build_markdown, markdown_pool
+
+SAMPLE_CONTENT = """
+# Rotasi Bumi
+
+Bumi berotasi dengan periode **23 jam 56 menit**, lihat $T = 2\\pi / \\omega$.
+
+| Besaran | Nilai |
+|---------|-------|
+| Periode | 86164 s |
+
+```python
+omega = 2 * math.pi / 86164
+```
+"""
+
+
+class Command(BaseCommand):
+    help = 'Microbenchmark: fresh Markdown instance vs pooled renderer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--number', type=int, default=200)
+
+    def handle(self, *args, **options):
+        number = options['number']
+
+        fresh = timeit.timeit(
+            lambda: build_markdown().convert(SAMPLE_CONTENT), number=number
+        )
+        markdown_pool.convert(SAMPLE_CONTENT)  # warm up the pool
+        pooled = timeit.timeit(
+            lambda: markdown_pool.convert(SAMPLE_CONTENT), number=number
+        )
+
+        fresh_ms = fresh / number * 1000
+        pooled_ms = pooled / number * 1000
+        self.stdout.write(f'fresh Markdown():  {fresh_ms:.3f} ms/call')
+        self.stdout.write(f'pooled renderer:   {pooled_ms:.3f} ms/call')
+        self.stdout.write(self.style.SUCCESS(f'speedup: {fresh_ms / pooled_ms:.1f}x'))
@@ -0,0 +1,35 @@
+# core/management/commands/build_image_derivatives.py
+from django.core.management.base import BaseCommand
+
+from astronomy.models import AstroPhoto
+from core.models import BlogImage, Project
+
+
+class Command(BaseCommand):
+    help = 'Backfill resized WebP/JPEG derivatives for AstroPhoto, BlogImage and Project thumbnails'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true',
+                            help='Rebuild derivatives even when they are up to date')
+        parser.add_argument('--model', choices=['astrophoto', 'blogimage', 'project'],
+                            help='Only process one model')
+
+    def handle(self, *args, **options):
+        force = options['force']
+        querysets = {
+            'astrophoto': AstroPhoto.objects.exclude(image=''),
+            'blogimage': BlogImage.objects.exclude(image=''),
+            'project': Project.objects.exclude(thumbnail='').exclude(thumbnail__isnull=True),
+        }
+        if options['model']:
+            querysets = {options['model']: querysets[options['model']]}
+
+        for label, queryset in querysets.items():
+            built = 0
+            for obj in queryset.iterator(chunk_size=100):
+                try:
+                    if obj.build_derivatives(force=force):
+                        built += 1
+                except OSError as e:
+                    self.stderr.write(self.style.WARNING(f'{label} #{obj.pk}: {e}'))
+            self.stdout.write(self.style.SUCCESS(f'{label}: built derivatives for {built} object(s)'))
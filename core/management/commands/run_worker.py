@@ -0,0 +1,47 @@
+# core/management/commands/run_worker.py
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils.module_loading import autodiscover_modules
+
+from core.jobs import claim_next_job, run_job
+
+
+class Command(BaseCommand):
+    help = 'Process BackgroundJob rows (image derivatives, EXIF extraction, ...)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sleep', type=float, default=2.0,
+                            help='Seconds to wait when the queue is empty')
+        parser.add_argument('--burst', action='store_true',
+                            help='Exit once the queue is empty')
+
+    def handle(self, *args, **options):
+        # Register every app's tasks.py
+        autodiscover_modules('tasks')
+
+        self.running = True
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        self.stdout.write(self.style.SUCCESS('Worker started'))
+        while self.running:
+            close_old_connections()
+            job = claim_next_job()
+
+            if job is None:
+                if options['burst']:
+                    break
+                time.sleep(options['sleep'])
+                continue
+
+            ok = run_job(job)
+            style = self.style.SUCCESS if ok else self.style.WARNING
+            self.stdout.write(style(f'{job} attempt {job.attempts}'))
+
+        self.stdout.write('Worker stopped')
+
+    def stop(self, signum, frame):
+        self.running = False
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.6 on 2026-10-17 00:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_blogpost_rendered_content'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blogimage',
+            name='image_derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Resized WebP/JPEG variants of the image'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='thumbnail_derivatives',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Resized WebP/JPEG variants of the thumbnail'),
+        ),
+    ]
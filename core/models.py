@@ -2,7 +2,10 @@
 from django.db import models
 from django.utils.text import slugify
 from django.contrib.auth.models import User
+from django.utils import timezone
 from astronomy.models import ResearchProject as astronomy_research
+from .images import queue_derivatives, refresh_derivatives
+import hashlib
 
 # Create your models here.
 
@@ -119,6 +122,8 @@ class Project(models.Model):
     
     # IMAGES
     thumbnail = models.ImageField(upload_to='projects/thumbnails/',blank=True,null=True)
+    thumbnail_derivatives = models.JSONField(default=dict, blank=True, editable=False,
+                                             help_text="Resized WebP/JPEG variants of the thumbnail")
     
     type_project = models.CharField(max_length=20, choices=TYPE_PROJECT, default='projects')
     research_category = models.ForeignKey(AllResearch,on_delete=models.SET_NULL,null=True, blank=True)
@@ -136,6 +141,11 @@ class Project(models.Model):
         if not self.slug:
             self.slug = slugify(self.title)
         super().save(*args, **kwargs)
+        queue_derivatives(self, 'thumbnail', 'thumbnail_derivatives')
+    
+    def build_derivatives(self, force=False):
+        """Generate resized variants of the thumbnail"""
+        return refresh_derivatives(self, 'thumbnail', 'thumbnail_derivatives', force=force)
     
     
     def __str__(self):
@@ -175,6 +185,10 @@ class BlogPost(models.Model):
     
     reading_time_minutes = models.PositiveIntegerField(default=5)
     
+    # Cache HTML hasil render markdown, di-key dengan hash konten + gambar
+    rendered_content = models.TextField(blank=True, editable=False)
+    rendered_hash = models.CharField(max_length=64, blank=True, editable=False)
+    
     class Meta:
         ordering = ['-published_at', '-created_at']
     
@@ -189,11 +203,50 @@ class BlogPost(models.Model):
     
         # Set published_at when changing to published
         if self.status == 'published' and not self.published_at:
-            from django.utils import timezone
             self.published_at = timezone.now()
     
         super().save(*args, **kwargs)
     
+    def compute_render_hash(self):
+        """Hash of content, its BlogImage set and the renderer version"""
+        from .utils import MARKDOWN_RENDER_VERSION
+        
+        hasher = hashlib.sha256()
+        hasher.update(MARKDOWN_RENDER_VERSION.encode('utf-8'))
+        hasher.update(self.content.encode('utf-8'))
+        
+        images = self.images.order_by('order', 'id').values_list(
+            'id', 'order', 'image', 'caption', 'alt_text', 'image_derivatives'
+        )
+        for row in images:
+            hasher.update(repr(row).encode('utf-8'))
+        
+        return hasher.hexdigest()
+    
+    def get_rendered_content(self):
+        """
+        Return the HTML for this post, rendering markdown only when the
+        content or its images changed since the last stored render.
+        """
+        if self.content_type != 'markdown':
+            return self.content
+        
+        render_hash = self.compute_render_hash()
+        if render_hash != self.rendered_hash or not self.rendered_content:
+            from .utils import process_markdown, insert_blog_images
+            
+            content_with_images = insert_blog_images(self.content, self)
+            self.rendered_content = process_markdown(content_with_images)
+            self.rendered_hash = render_hash
+            
+            # update() supaya updated_at tidak ikut berubah
+            BlogPost.objects.filter(pk=self.pk).update(
+                rendered_content=self.rendered_content,
+                rendered_hash=self.rendered_hash
+            )
+        
+        return self.rendered_content
+    
     def __str__(self):
         return self.title
 
@@ -203,6 +256,8 @@ class BlogImage(models.Model):
     
     blog_post = models.ForeignKey(BlogPost, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(upload_to='blog_images/')
+    image_derivatives = models.JSONField(default=dict, blank=True, editable=False,
+                                         help_text="Resized WebP/JPEG variants of the image")
     caption = models.CharField(max_length=500, blank=True)
     alt_text = models.CharField(max_length=200, blank=True)
     order = models.IntegerField(default=0)
@@ -210,6 +265,14 @@ class BlogImage(models.Model):
     class Meta:
         ordering = ['order']
     
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        queue_derivatives(self, 'image', 'image_derivatives')
+    
+    def build_derivatives(self, force=False):
+        """Generate resized variants of the image"""
+        return refresh_derivatives(self, 'image', 'image_derivatives', force=force)
+    
     def __str__(self):
         return f"Image for {self.blog_post.title}"
     
@@ -258,4 +321,38 @@ class Comment(models.Model):
         return f"Comment by {self.name} on {self.blog_post.title}"
     def get_replies(self):
         return self.replies.filter(is_approved=True)
-    
\ No newline at end of file
+    
+
+class BackgroundJob(models.Model):
+    """Database-backed job queue, processed by `manage.py run_worker`"""
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    
+    task = models.CharField(max_length=100, help_text="Registered task name, see core.jobs")
+    payload = models.JSONField(default=dict, blank=True)
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    last_error = models.TextField(blank=True)
+    
+    run_after = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+        ]
+    
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.get_status_display()})"
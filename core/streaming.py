@@ -0,0 +1,32 @@
+# core/streaming.py
+"""
+Helpers for StreamingHttpResponse bodies built with the standard library.
+
+``ZipStream`` lets ``zipfile.ZipFile`` write into a generator: the archive
+bytes are buffered only until the next ``drain()``, so a streamed ZIP (or
+XLSX, which is a ZIP) never sits in memory as a whole.
+"""
+from collections import deque
+
+
+class ZipStream:
+    """Write-only, unseekable file object that buffers zip output for the generator"""
+
+    def __init__(self):
+        self._chunks = deque()
+        self._position = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        while self._chunks:
+            yield self._chunks.popleft()
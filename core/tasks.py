@@ -0,0 +1,12 @@
+# core/tasks.py
+from django.apps import apps
+
+from .jobs import register_task
+
+
+@register_task('core.build_derivatives')
+def build_derivatives(model, pk, force=False):
+    """Generate image derivatives for any model with a build_derivatives() method"""
+    obj = apps.get_model(model).objects.filter(pk=pk).first()
+    if obj is not None:
+        obj.build_derivatives(force=force)
@@ -0,0 +1,25 @@
+# core/templatetags/responsive_images.py
+from django import template
+
+from core.images import responsive_image_html, variant_url
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_image(field_file, derivatives, alt='', css_class='', sizes='100vw', size='medium', lazy=True):
+    """
+    Render a <picture> with WebP and JPEG srcsets for an image field.
+
+    Usage::
+
+        {% load responsive_images %}
+        {% responsive_image photo.image photo.image_derivatives alt=photo.title sizes="33vw" %}
+    """
+    return responsive_image_html(field_file, derivatives, alt, css_class, sizes, size, lazy)
+
+
+@register.simple_tag
+def image_variant_url(field_file, derivatives, size='full', extension='jpeg'):
+    """URL of a single derivative, e.g. for lightbox data"""
+    return variant_url(field_file, derivatives, size, extension)
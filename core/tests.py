@@ -1,4 +1,84 @@
 # core/tests.py
+from datetime import timedelta
+
 from django.test import TestCase
+from django.utils import timezone
+
+from .jobs import RETRY_BASE_DELAY, STALE_JOB_TIMEOUT, claim_next_job, enqueue, register_task, run_job
+from .models import BackgroundJob
+
+calls = []
+
+
+@register_task('tests.record')
+def record(value):
+    calls.append(value)
+
+
+@register_task('tests.fail')
+def fail():
+    raise RuntimeError('boom')
+
+
+class JobQueueTestCase(TestCase):
+    """enqueue dedup, claim, retry dengan backoff dan job worker yang mati"""
+
+    def setUp(self):
+        calls.clear()
+
+    def test_pending_duplicate_is_reused(self):
+        first = enqueue('tests.record', value=1)
+        self.assertEqual(enqueue('tests.record', value=1).pk, first.pk)
+        self.assertNotEqual(enqueue('tests.record', value=2).pk, first.pk)
+
+        # Sesudah selesai, payload yang sama boleh masuk antrean lagi
+        run_job(claim_next_job())
+        self.assertNotEqual(enqueue('tests.record', value=1).pk, first.pk)
+
+    def test_claim_order_and_run_after(self):
+        later = enqueue('tests.record', value='later')
+        BackgroundJob.objects.filter(pk=later.pk).update(run_after=timezone.now() + timedelta(hours=1))
+        first = enqueue('tests.record', value='first')
+        second = enqueue('tests.record', value='second')
+
+        self.assertEqual(claim_next_job().pk, first.pk)
+        self.assertEqual(claim_next_job().pk, second.pk)
+        self.assertIsNone(claim_next_job())
+
+    def test_claim_marks_running(self):
+        enqueue('tests.record', value=1)
+        job = claim_next_job()
+        self.assertTrue(run_job(job))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, calls), ('done', 1, [1]))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_retry_with_backoff_then_failed(self):
+        job = enqueue('tests.fail', max_attempts=3)
+        for attempt in (1, 2):
+            BackgroundJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+            before = timezone.now()
+            self.assertFalse(run_job(claim_next_job()))
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.attempts), ('pending', attempt))
+            self.assertIn('RuntimeError: boom', job.last_error)
+            self.assertGreaterEqual(job.run_after, before + RETRY_BASE_DELAY * 2 ** (attempt - 1))
+            # Belum waktunya dicoba lagi
+            self.assertIsNone(claim_next_job())
+
+        BackgroundJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        self.assertFalse(run_job(claim_next_job()))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('failed', 3))
+        self.assertIsNone(claim_next_job())
+
+    def test_stale_running_job_is_reclaimed(self):
+        job = enqueue('tests.record', value=1)
+        claim_next_job()
+        self.assertIsNone(claim_next_job())
 
-# Create your tests here.
+        BackgroundJob.objects.filter(pk=job.pk).update(
+            started_at=timezone.now() - STALE_JOB_TIMEOUT - timedelta(minutes=1)
+        )
+        reclaimed = claim_next_job()
+        self.assertEqual((reclaimed.pk, reclaimed.attempts), (job.pk, 2))
@@ -1,76 +1,161 @@
 # core/utils.py
 import markdown
 from markdown.extensions import codehilite, toc
+from contextlib import contextmanager
+import queue
 import re
 
+from .images import responsive_image_html
+
+# Naikkan setiap kali output renderer berubah supaya cache BlogPost ikut dibuang
+MARKDOWN_RENDER_VERSION = '3'
+
+MARKDOWN_EXTENSIONS = [
+    'codehilite',
+    'toc',
+    'tables',
+    'fenced_code',
+    'pymdownx.arithmatex',
+    'pymdownx.superfences',
+    'pymdownx.highlight',
+    'pymdownx.inlinehilite',
+]
+
+MARKDOWN_EXTENSION_CONFIGS = {
+    'pymdownx.arithmatex': {
+        'generic': True
+    },
+    'codehilite': {
+        'css_class': 'highlight',
+        'use_pygments': True,
+    }
+}
+
+
+def build_markdown():
+    """Build a Markdown instance configured with the site extensions"""
+    return markdown.Markdown(
+        extensions=MARKDOWN_EXTENSIONS,
+        extension_configs=MARKDOWN_EXTENSION_CONFIGS
+    )
+
+
+class MarkdownPool:
+    """
+    Thread-safe pool of pre-configured Markdown instances.
+    
+    Loading extensions is the expensive part of building a Markdown object,
+    so instances are reset() and reused instead of rebuilt on every call.
+    Each thread checks out its own instance, so no instance is ever shared
+    between two conversions running at the same time.
+    """
+    
+    def __init__(self, factory=build_markdown, max_size=8):
+        self.factory = factory
+        self.max_size = max_size
+        self._pool = queue.LifoQueue(maxsize=max_size)
+    
+    @contextmanager
+    def renderer(self):
+        """Check out a Markdown instance, returning it to the pool afterwards"""
+        try:
+            md = self._pool.get_nowait()
+        except queue.Empty:
+            md = self.factory()
+        
+        try:
+            yield md
+        finally:
+            md.reset()
+            try:
+                self._pool.put_nowait(md)
+            except queue.Full:
+                pass
+    
+    def convert(self, content):
+        with self.renderer() as md:
+            return md.convert(content)
+
+
+# Shared pool untuk blog post dan preview note
+markdown_pool = MarkdownPool()
+
 
 def process_markdown(content):
     """Process markdown content with math support"""
     
-    # Configure markdown with extensions
-    md = markdown.Markdown(
-        extensions=[
-            'codehilite',
-            'toc',
-            'tables',
-            'fenced_code',
-            'pymdownx.arithmatex',
-            'pymdownx.superfences',
-            'pymdownx.highlight',
-            'pymdownx.inlinehilite',
-        ],
-        extension_configs={
-            'pymdownx.arithmatex': {
-                'generic': True
-            },
-            'codehilite': {
-                'css_class': 'highlight',
-                'use_pygments': True,
-            }
-        }
-    )
-    
-    # Process the content
-    html_content = md.convert(content)
+    # Convert with a pooled, pre-configured renderer
+    html_content = markdown_pool.convert(content)
     
     # Apply custom post-processing
     html_content = process_custom_syntax(html_content)
     
     return html_content
 
+CUSTOM_SIZE_MAP = {
+    'small': '0.875rem',
+    'normal': '1rem',
+    'large': '1.25rem',
+    'xl': '1.5rem',
+    'xxl': '2rem'
+}
+
+# Semua custom syntax digabung dalam satu regex supaya cukup satu kali scan.
+# Blok <pre>/<code> ikut di-match lebih dulu agar isinya dilewati apa adanya.
+CUSTOM_SYNTAX_PATTERN = re.compile(
+    r'(?P<code>(?s:<pre\b.*?</pre>|<code\b.*?</code>))'
+    r'|==(?P<mark>.*?)=='                                           # ==highlighted text==
+    r'|\+\+(?P<underline>.*?)\+\+'                                  # ++underlined text++
+    r'|\{color:(?P<color>[^}]+)\}(?P<color_text>.*?)\{/color\}'     # {color:red}text{/color}
+    r'|\{size:(?P<size>[^}]+)\}(?P<size_text>.*?)\{/size\}'         # {size:large}text{/size}
+)
+
+
+def _replace_custom_syntax(match):
+    kind = match.lastgroup
+    
+    if kind == 'code':
+        return match.group(0)
+    if kind == 'mark':
+        return f'<mark>{process_custom_syntax(match.group("mark"))}</mark>'
+    if kind == 'underline':
+        return f'<u>{process_custom_syntax(match.group("underline"))}</u>'
+    if kind == 'color_text':
+        text = process_custom_syntax(match.group('color_text'))
+        return f'<span style="color: {match.group("color")}">{text}</span>'
+    
+    size_name = match.group('size')
+    size = CUSTOM_SIZE_MAP.get(size_name, size_name)
+    text = process_custom_syntax(match.group('size_text'))
+    return f'<span style="font-size: {size}">{text}</span>'
+
+
 def process_custom_syntax(content):
-    """Process custom syntax for advanced formatting"""
-    
-    # Custom highlight syntax: ==highlighted text==
-    content = re.sub(r'==(.*?)==', r'<mark>\1</mark>', content)
-    
-    # Custom underline syntax: ++underlined text++
-    content = re.sub(r'\+\+(.*?)\+\+', r'<u>\1</u>', content)
-    
-    # Custom color syntax: {color:red}text{/color}
-    content = re.sub(r'\{color:([^}]+)\}(.*?)\{/color\}', r'<span style="color: \1">\2</span>', content)
-    
-    # Custom size syntax: {size:large}text{/size}
-    size_map = {
-        'small': '0.875rem',
-        'normal': '1rem', 
-        'large': '1.25rem',
-        'xl': '1.5rem',
-        'xxl': '2rem'
-    }
-    
-    def replace_size(match):
-        size_name = match.group(1)
-        text = match.group(2)
-        size = size_map.get(size_name, size_name)
-        return f'<span style="font-size: {size}">{text}</span>'
-    
-    content = re.sub(r'\{size:([^}]+)\}(.*?)\{/size\}', replace_size, content)
-    
-    return content
+    """Process custom syntax for advanced formatting, skipping code blocks"""
+    return CUSTOM_SYNTAX_PATTERN.sub(_replace_custom_syntax, content)
+
+# Lebar kolom artikel blog, dipakai untuk atribut sizes pada srcset
+BLOG_IMAGE_SIZES = '(max-width: 768px) 100vw, 800px'
 
-def insert_blog_images(content, blog_post):
-    """Insert blog images with advanced positioning and sizing"""
+def get_blog_image_map(blog_post):
+    """
+    Fetch every image of a blog post in one query, keyed by its order.
+    
+    When several images share the same order the first one wins, matching
+    the old ``images.filter(order=...).first()`` lookup.
+    """
+    image_map = {}
+    for image in blog_post.images.order_by('order', 'id'):
+        image_map.setdefault(image.order, image)
+    return image_map
+
+def insert_blog_images(content, blog_post, image_map=None):
+    """
+    Insert blog images with advanced positioning and sizing
+    
+    All placeholders are resolved against a single ``{order: BlogImage}``
+    map, built lazily on the first placeholder unless one is passed in.
+    """
     
     # Enhanced pattern for image control:
     # ![alt](image-1)
@@ -79,14 +164,18 @@ def insert_blog_images(content, blog_post):
     # ![alt](image-1|large|right|float)
     
     pattern = r'!\[([^\]]*)\]\(image[:-](\d+)(?:\|([^)]+))?\)'
+    images = image_map
     
     def replace_image(match):
+        nonlocal images
         alt_text = match.group(1)
         image_order = int(match.group(2))
         options = match.group(3) or ""
         
         try:
-            image = blog_post.images.filter(order=image_order).first()
+            if images is None:
+                images = get_blog_image_map(blog_post)
+            image = images.get(image_order)
             if not image:
                 return match.group(0)
             
@@ -106,7 +195,11 @@ def insert_blog_images(content, blog_post):
             # IMPORTANT: No leading/trailing whitespace or newlines!
             # Return HTML as single line to avoid markdown code block detection
             html = f'<figure class="{" ".join(css_classes)}">'
-            html += f'<img src="{image.image.url}" alt="{image.alt_text or alt_text}" loading="lazy">'
+            html += responsive_image_html(
+                image.image, image.image_derivatives,
+                alt=image.alt_text or alt_text,
+                sizes=BLOG_IMAGE_SIZES
+            )
             if caption:
                 html += f'<figcaption>{caption}</figcaption>'
             html += '</figure>'
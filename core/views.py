@@ -21,7 +21,6 @@ from astronomy.models import (
 
 from .forms import CommentForm
 
-from .utils import process_markdown, insert_blog_images
 def home(request):
     # Get featured projects
     """
@@ -207,13 +206,8 @@ def blog_detail(request, slug):
     # Get the blog post with the given slug
     post = get_object_or_404(BlogPost, slug=slug, status='published')
     
-    # Process content based on type
-    if post.content_type == 'markdown':
-        # Insert images first, then process markdown
-        content_with_images = insert_blog_images(post.content, post)
-        processed_content = process_markdown(content_with_images)
-    else:
-        processed_content = post.content
+    # Rendered HTML is cached on the post and rebuilt only when it changes
+    processed_content = post.get_rendered_content()
     
     # Get 3 related posts, excluding the current post
     related_posts = BlogPost.objects.filter(
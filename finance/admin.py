@@ -1,6 +1,6 @@
 # finance/admin.py
 from django.contrib import admin
-from .models import Category, Transaction, Budget, ResearchExpense
+from .models import Category, Transaction, Budget, MonthlyCategoryRollup, ResearchExpense
 
 # ========================================
 # CATEGORY ADMIN
@@ -76,6 +76,10 @@ class BudgetAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_queryset(self, request):
+        # spent & percentage dihitung dalam query daftar, bukan 2 query per baris
+        return super().get_queryset(request).select_related('category', 'user').with_usage()
+    
     def amount_formatted(self, obj):
         """Format budget amount"""
         return f"Rp {obj.amount:,.0f}"
@@ -87,6 +91,7 @@ class BudgetAdmin(admin.ModelAdmin):
         spent = obj.get_spent()
         return f"Rp {spent:,.0f}"
     spent_display.short_description = 'Spent'
+    spent_display.admin_order_field = 'spent'
     
     def percentage_display(self, obj):
         """Tampilkan persentase penggunaan budget"""
@@ -102,9 +107,28 @@ class BudgetAdmin(admin.ModelAdmin):
         
         return f'<span style="color: {color}; font-weight: bold;">{percentage:.1f}%</span>'
     percentage_display.short_description = 'Usage %'
+    percentage_display.admin_order_field = 'percentage'
     percentage_display.allow_tags = True
 
 
+# ========================================
+# MONTHLY ROLLUP ADMIN
+# ========================================
+
+@admin.register(MonthlyCategoryRollup)
+class MonthlyCategoryRollupAdmin(admin.ModelAdmin):
+    """Read-only: dikelola Transaction.save()/delete() dan rebuild_finance_rollups"""
+    list_display = ['month', 'user', 'category', 'type', 'total', 'count', 'updated_at']
+    list_filter = ['type', 'month', 'user']
+    date_hierarchy = 'month'
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 # ========================================
 # RESEARCH EXPENSE ADMIN
 # ========================================
@@ -0,0 +1,98 @@
+# finance/aggregates.py
+"""
+Agregasi keuangan untuk dashboard.
+
+Total bulanan dan pengeluaran per kategori dibaca dari rekap bulanan
+(MonthlyCategoryRollup, O(kategori) baris). Grafik mingguan tidak ada di
+rekap, jadi dihitung dengan satu query GROUP BY minggu dengan Sum
+bersyarat, paling banyak lima baris berapa pun jumlah transaksinya.
+"""
+import calendar
+from datetime import date
+from decimal import Decimal
+
+from django.db.models import Case, DecimalField, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+from .models import Transaction
+from .rollups import month_rollups
+
+DEFAULT_CATEGORY_NAME = 'Tanpa Kategori'
+DEFAULT_CATEGORY_COLOR = '#37a749'
+
+ZERO = Value(Decimal('0'), output_field=DecimalField(max_digits=12, decimal_places=2))
+
+
+def month_range(month):
+    """(hari pertama, hari pertama bulan berikutnya) dari sebuah date/datetime"""
+    start = date(month.year, month.month, 1)
+    if month.month == 12:
+        return start, date(month.year + 1, 1, 1)
+    return start, date(month.year, month.month + 1, 1)
+
+
+def week_count(month):
+    """Jumlah minggu (blok 7 hari mulai tanggal 1) dalam bulan"""
+    return -(-calendar.monthrange(month.year, month.month)[1] // 7)
+
+
+def week_of_month():
+    """Minggu ke-1..5 dari tanggal transaksi: tanggal 1-7, 8-14, dst."""
+    return Case(
+        *[When(date__day__lte=7 * week, then=Value(week)) for week in range(1, 5)],
+        default=Value(5),
+        output_field=IntegerField(),
+    )
+
+
+def weekly_totals(user, month):
+    """Income/expense per minggu dari satu query agregat"""
+    start, end = month_range(month)
+    rows = (
+        Transaction.objects
+        .filter(user=user, date__gte=start, date__lt=end)
+        .annotate(week=week_of_month())
+        .values('week')
+        .annotate(
+            income=Coalesce(Sum('amount', filter=Q(type='income')), ZERO),
+            expense=Coalesce(Sum('amount', filter=Q(type='expense')), ZERO),
+        )
+        .order_by()
+    )
+
+    weeks = [{'week': f'Week {number}', 'income': 0.0, 'expense': 0.0} for number in range(1, week_count(month) + 1)]
+    for row in rows:
+        weeks[row['week'] - 1].update(income=float(row['income']), expense=float(row['expense']))
+    return weeks
+
+
+def month_summary(user, month):
+    """
+    Ringkasan satu bulan untuk dashboard: satu query rekap + satu query mingguan.
+
+    Returns dict:
+    {
+        'income_total': Decimal, 'expense_total': Decimal, 'balance': Decimal,
+        'weeks': [{'week': 'Week 1', 'income': 1000000.0, 'expense': 500000.0}, ...],
+        'categories': [{'name': 'Makanan', 'value': 500000.0, 'color': '#ef4444'}, ...],
+    }
+    """
+    totals = {'income': Decimal('0'), 'expense': Decimal('0')}
+    categories = []
+
+    for row in month_rollups(user, month):
+        totals[row['type']] += row['total']
+        if row['type'] == 'expense' and row['total']:
+            categories.append({
+                'name': row['category__name'] or DEFAULT_CATEGORY_NAME,
+                'value': float(row['total']),
+                'color': row['category__color'] or DEFAULT_CATEGORY_COLOR,
+            })
+
+    return {
+        'income_total': totals['income'],
+        'expense_total': totals['expense'],
+        'balance': totals['income'] - totals['expense'],
+        'weeks': weekly_totals(user, month),
+        'categories': sorted(categories, key=lambda category: -category['value']),
+    }
@@ -0,0 +1,218 @@
+# finance/exports.py
+"""
+Export CSV/XLSX streaming untuk Transaction dan ResearchExpense.
+
+Baris dibaca dengan ``values_list(...).iterator(chunk_size=CHUNK_SIZE)``
+(server-side cursor di PostgreSQL) dan dikirim per blok CHUNK_SIZE baris,
+jadi memori worker tetap datar berapa pun jumlah baris dan download
+langsung mulai. XLSX ditulis langsung sebagai zip SpreadsheetML (sel
+inline string) tanpa openpyxl, karena openpyxl menyimpan seluruh workbook
+di memori dan bukan dependency proyek ini.
+"""
+import csv
+from decimal import Decimal
+import io
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from core.streaming import ZipStream
+
+CHUNK_SIZE = 2000
+
+CSV_CONTENT_TYPE = 'text/csv; charset=utf-8'
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Teks yang diawali karakter ini dieksekusi sebagai formula oleh Excel
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+# Karakter kontrol yang tidak valid di XML
+XML_INVALID_CHARACTERS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+# (header, field untuk values_list)
+TRANSACTION_COLUMNS = [
+    ('Tanggal', 'date'),
+    ('Tipe', 'type'),
+    ('Kategori', 'category__name'),
+    ('Jumlah', 'amount'),
+    ('Deskripsi', 'description'),
+    ('Dibuat', 'created_at'),
+]
+RESEARCH_EXPENSE_COLUMNS = [
+    ('Tanggal', 'date'),
+    ('Bidang', 'field'),
+    ('Judul', 'title'),
+    ('Vendor', 'vendor'),
+    ('No. Invoice', 'invoice_number'),
+    ('Jumlah', 'amount'),
+    ('Deskripsi', 'description'),
+    ('Dibuat', 'created_at'),
+]
+
+
+def export_rows(queryset, columns, ordering, labels=None):
+    """
+    Generator baris (tuple) ``queryset`` untuk export.
+
+    ``labels`` memetakan field ke dict choices, misalnya {'type': {'income': 'Pemasukan'}},
+    agar file berisi label yang terbaca dan bukan kode.
+    """
+    fields = [field for _, field in columns]
+    labels = labels or {}
+    mappers = [(index, labels[field]) for index, field in enumerate(fields) if field in labels]
+
+    rows = queryset.order_by(*ordering).values_list(*fields).iterator(chunk_size=CHUNK_SIZE)
+    for row in rows:
+        if mappers:
+            row = list(row)
+            for index, choices in mappers:
+                row[index] = choices.get(row[index], row[index])
+        yield row
+
+
+def _text(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'tzinfo') and value.tzinfo is not None:
+        value = timezone.localtime(value).replace(tzinfo=None)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat(sep=' ') if hasattr(value, 'hour') else value.isoformat()
+    return str(value)
+
+
+# ========================================
+# CSV
+# ========================================
+
+def _csv_value(value):
+    text = _text(value)
+    if isinstance(value, str) and text.startswith(FORMULA_PREFIXES):
+        return "'" + text
+    return text
+
+
+def stream_csv(headers, rows):
+    """Yield CSV (UTF-8 dengan BOM agar Excel membaca karakter non-ASCII) per blok baris"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write('\ufeff')
+    writer.writerow(headers)
+
+    for count, row in enumerate(rows, start=1):
+        writer.writerow([_csv_value(value) for value in row])
+        if count % CHUNK_SIZE == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue().encode('utf-8')
+
+
+# ========================================
+# XLSX
+# ========================================
+
+XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+XLSX_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+XLSX_SHEET_END = '</sheetData></worksheet>'
+
+
+def _cell(value):
+    # Angka (Decimal/int/float) tetap angka di Excel, sisanya inline string
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return f'<c t="n"><v>{value}</v></c>'
+    text = escape(XML_INVALID_CHARACTERS.sub('', _text(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _sheet_row(row):
+    return '<row>' + ''.join(_cell(value) for value in row) + '</row>'
+
+
+def stream_xlsx(headers, rows, sheet_name='Sheet1'):
+    """Yield workbook XLSX satu sheet, ditulis per blok baris"""
+    stream = ZipStream()
+    modified = timezone.localtime().timetuple()[:6]
+
+    def part(name):
+        info = zipfile.ZipInfo(name, date_time=modified)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        return info
+
+    with zipfile.ZipFile(stream, mode='w', allowZip64=True) as archive:
+        archive.writestr(part('[Content_Types].xml'), XLSX_CONTENT_TYPES)
+        archive.writestr(part('_rels/.rels'), XLSX_ROOT_RELS)
+        archive.writestr(part('xl/workbook.xml'), XLSX_WORKBOOK.format(name=escape(sheet_name[:31])))
+        archive.writestr(part('xl/_rels/workbook.xml.rels'), XLSX_WORKBOOK_RELS)
+        yield from stream.drain()
+
+        with archive.open(part('xl/worksheets/sheet1.xml'), mode='w', force_zip64=True) as sheet:
+            block = [XLSX_SHEET_START, _sheet_row(headers)]
+            for count, row in enumerate(rows, start=1):
+                block.append(_sheet_row(row))
+                if count % CHUNK_SIZE == 0:
+                    sheet.write(''.join(block).encode('utf-8'))
+                    block = []
+                    yield from stream.drain()
+            block.append(XLSX_SHEET_END)
+            sheet.write(''.join(block).encode('utf-8'))
+        yield from stream.drain()
+
+    # Central directory
+    yield from stream.drain()
+
+
+# ========================================
+# RESPONSE
+# ========================================
+
+def export_response(export_format, filename, columns, rows, sheet_name='Sheet1'):
+    """StreamingHttpResponse CSV (default) atau XLSX untuk ``rows``"""
+    headers = [header for header, _ in columns]
+    if export_format == 'xlsx':
+        response = StreamingHttpResponse(stream_xlsx(headers, rows, sheet_name), content_type=XLSX_CONTENT_TYPE)
+        filename = f'{filename}.xlsx'
+    else:
+        response = StreamingHttpResponse(stream_csv(headers, rows), content_type=CSV_CONTENT_TYPE)
+        filename = f'{filename}.csv'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,26 @@
+# finance/management/commands/rebuild_finance_rollups.py
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from finance.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute the monthly per-category finance rollups from all transactions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Username (default: every user)')
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+            if user is None:
+                raise CommandError(f"No user named {options['user']}")
+
+        started = time.perf_counter()
+        count = rebuild_rollups(user)
+        elapsed = (time.perf_counter() - started) * 1000
+        self.stdout.write(self.style.SUCCESS(f'{count} rollup rows rebuilt ({elapsed:.1f} ms)'))
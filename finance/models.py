@@ -1,7 +1,14 @@
 # finance/models.py
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from django.db.models import FilteredRelation, Value
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+from django.db.models.functions import Cast, Coalesce, TruncMonth
 from django.utils import timezone
+from decimal import Decimal
+
+from .rollups import ROLLUP_FIELDS, merge_category, month_start, record_change
 
 class Category(models.Model):
     """Kategori untuk transaksi"""
@@ -43,9 +50,92 @@ class Transaction(models.Model):
     
     class Meta:
         ordering = ['-date', '-created_at']
+        indexes = [
+            # Keyset pagination daftar transaksi (finance/pagination.py)
+            models.Index(fields=['user', '-date', '-created_at', 'id'], name='finance_tx_user_keyset_idx'),
+        ]
     
     def __str__(self):
         return f"{self.get_type_display()} - Rp {self.amount:,.0f} ({self.date})"
+    
+    def save(self, *args, **kwargs):
+        # Rekap bulanan diperbarui dalam transaksi database yang sama
+        with transaction.atomic():
+            old = None
+            if self.pk:
+                old = Transaction.objects.select_for_update().filter(pk=self.pk).values(*ROLLUP_FIELDS).first()
+            super().save(*args, **kwargs)
+            record_change(old, self.rollup_values())
+    
+    def rollup_values(self):
+        # to_python: objects.create(date='2025-10-05') masih menyimpan string di instance
+        return {
+            field: self._meta.get_field(field).to_python(getattr(self, field))
+            for field in ROLLUP_FIELDS
+        }
+
+
+# Rekap saat delete lewat pre_delete, bukan Model.delete(): berlaku juga untuk
+# queryset.delete() (termasuk bulk delete di admin) dan cascade
+
+def _user_deletion(origin):
+    # Rekap user yang dihapus ikut terhapus (CASCADE), jangan ditulis ulang
+    model = origin.model if isinstance(origin, models.QuerySet) else type(origin)
+    return issubclass(model, User)
+
+
+@receiver(pre_delete, sender=Category)
+def merge_deleted_category(sender, instance, origin=None, **kwargs):
+    """Transaksinya menjadi tanpa kategori, rekapnya ikut dipindah"""
+    if not _user_deletion(origin):
+        merge_category(instance)
+
+
+@receiver(pre_delete, sender=Transaction)
+def remove_deleted_transaction(sender, instance, origin=None, **kwargs):
+    """Kurangi rekap bulanan dengan nilai transaksi yang tersimpan di database"""
+    if _user_deletion(origin):
+        return
+    old = Transaction.objects.select_for_update().filter(pk=instance.pk).values(*ROLLUP_FIELDS).first()
+    record_change(old, None)
+
+
+class BudgetQuerySet(models.QuerySet):
+    def with_usage(self):
+        """
+        Anotasi ``spent`` (dari rekap bulanan) dan ``percentage`` untuk setiap
+        budget dalam satu query (LEFT JOIN ke rekap), bukan dua query per budget.
+        """
+        money = models.DecimalField(max_digits=14, decimal_places=2)
+        rollup = FilteredRelation(
+            'category__monthlycategoryrollup',
+            condition=models.Q(
+                category__monthlycategoryrollup__user=models.F('user'),
+                category__monthlycategoryrollup__month=models.F('budget_month'),
+                category__monthlycategoryrollup__type='expense',
+            ),
+        )
+        return self.annotate(
+            budget_month=TruncMonth('month'),
+            expense_rollup=rollup,
+        ).annotate(
+            spent=Coalesce(models.Sum('expense_rollup__total'), Value(Decimal('0')), output_field=money),
+        ).annotate(
+            percentage=models.Case(
+                models.When(
+                    amount__gt=0,
+                    then=Cast('spent', models.FloatField()) * 100 / Cast('amount', models.FloatField()),
+                ),
+                default=Value(0.0),
+                output_field=models.FloatField(),
+            ),
+        )
+
+    def for_month(self, user, month):
+        """Semua budget user di satu bulan, dengan ``spent`` & ``percentage``"""
+        return self.filter(
+            user=user, month__year=month.year, month__month=month.month
+        ).select_related('category').with_usage().order_by('category__name')
 
 
 class Budget(models.Model):
@@ -56,6 +146,8 @@ class Budget(models.Model):
     month = models.DateField()
     created_at = models.DateTimeField(auto_now_add=True)
     
+    objects = BudgetQuerySet.as_manager()
+    
     class Meta:
         unique_together = ['user', 'category', 'month']
         ordering = ['-month']
@@ -64,21 +156,56 @@ class Budget(models.Model):
         return f"Budget {self.category.name} - {self.month.strftime('%B %Y')}"
     
     def get_spent(self):
-        """Hitung total pengeluaran untuk kategori ini di bulan ini"""
-        return Transaction.objects.filter(
-            user=self.user,
-            category=self.category,
+        """Hitung total pengeluaran untuk kategori ini di bulan ini (dari rekap bulanan)"""
+        if hasattr(self, 'spent'):
+            # Sudah dianotasi oleh Budget.objects.with_usage()
+            return self.spent
+        return MonthlyCategoryRollup.objects.filter(
+            user_id=self.user_id,
+            category_id=self.category_id,
             type='expense',
-            date__year=self.month.year,
-            date__month=self.month.month
-        ).aggregate(models.Sum('amount'))['amount__sum'] or 0
+            month=month_start(self.month)
+        ).values_list('total', flat=True).first() or 0
     
     def get_percentage(self):
-        """Hitung persentase penggunaan budget"""
+        """Hitung persentase penggunaan budget (float, sama seperti anotasi with_usage)"""
+        if hasattr(self, 'percentage'):
+            return self.percentage
         spent = self.get_spent()
         if self.amount > 0:
-            return (spent / self.amount) * 100
-        return 0
+            return float(spent) * 100 / float(self.amount)
+        return 0.0
+
+
+class MonthlyCategoryRollup(models.Model):
+    """Rekap transaksi per user, kategori, bulan dan tipe (dikelola oleh finance/rollups.py)"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, null=True, blank=True)
+    month = models.DateField(help_text='Tanggal 1 bulan tersebut')
+    type = models.CharField(max_length=10, choices=Transaction.TRANSACTION_TYPES)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-month']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'category', 'month', 'type'], name='finance_rollup_unique'
+            ),
+            # NULL tidak dianggap sama oleh UNIQUE, baris tanpa kategori dijaga terpisah
+            models.UniqueConstraint(
+                fields=['user', 'month', 'type'], condition=models.Q(category__isnull=True),
+                name='finance_rollup_unique_uncategorized'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'month']),
+        ]
+    
+    def __str__(self):
+        category = self.category.name if self.category else 'Tanpa Kategori'
+        return f"{category} {self.get_type_display()} - {self.month.strftime('%B %Y')}: Rp {self.total:,.0f}"
 
 
 class ResearchExpense(models.Model):
@@ -0,0 +1,85 @@
+# finance/pagination.py
+"""
+Keyset (cursor) pagination untuk daftar transaksi.
+
+Urutan tetap (-date, -created_at, id). Cursor berisi nilai ketiga kolom
+itu dari baris terakhir/pertama halaman, dan halaman berikutnya diambil
+dengan WHERE (date, created_at, id) "setelah" cursor + LIMIT. Dengan
+index (user, -date, -created_at, id) halaman ke-500 sama cepatnya dengan
+halaman pertama, tanpa OFFSET dan tanpa COUNT(*).
+"""
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import date, datetime
+
+from django.db.models import Q
+
+PAGE_SIZE = 50
+
+ORDERING = ('-date', '-created_at', 'id')
+REVERSE_ORDERING = ('date', 'created_at', '-id')
+
+
+def encode_cursor(transaction):
+    value = f'{transaction.date.isoformat()}|{transaction.created_at.isoformat()}|{transaction.pk}'
+    return urlsafe_b64encode(value.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """(date, created_at, id) dari token, None jika tidak valid"""
+    if not token:
+        return None
+    try:
+        value = urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode()
+        day, created_at, pk = value.split('|')
+        return date.fromisoformat(day), datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def after(cursor):
+    """Baris sesudah cursor dalam ORDERING"""
+    day, created_at, pk = cursor
+    # date__lte di depan OR: batas range yang bisa dipakai index (user, -date, ...)
+    return Q(date__lte=day) & (
+        Q(date__lt=day)
+        | Q(date=day, created_at__lt=created_at)
+        | Q(date=day, created_at=created_at, id__gt=pk)
+    )
+
+
+def before(cursor):
+    """Baris sebelum cursor dalam ORDERING"""
+    day, created_at, pk = cursor
+    return Q(date__gte=day) & (
+        Q(date__gt=day)
+        | Q(date=day, created_at__gt=created_at)
+        | Q(date=day, created_at=created_at, id__lt=pk)
+    )
+
+
+def keyset_page(queryset, after_token=None, before_token=None, size=PAGE_SIZE):
+    """
+    Satu halaman ``queryset`` dalam ORDERING.
+
+    Returns dict: ``items``, ``next_cursor`` dan ``previous_cursor``
+    (None jika tidak ada halaman ke arah itu).
+    """
+    after_cursor, before_cursor = decode_cursor(after_token), decode_cursor(before_token)
+
+    if before_cursor:
+        rows = list(queryset.filter(before(before_cursor)).order_by(*REVERSE_ORDERING)[:size + 1])
+        has_more = len(rows) > size
+        items = rows[:size][::-1]
+        has_next, has_previous = True, has_more
+    else:
+        if after_cursor:
+            queryset = queryset.filter(after(after_cursor))
+        rows = list(queryset.order_by(*ORDERING)[:size + 1])
+        items = rows[:size]
+        has_next, has_previous = len(rows) > size, after_cursor is not None
+
+    return {
+        'items': items,
+        'next_cursor': encode_cursor(items[-1]) if items and has_next else None,
+        'previous_cursor': encode_cursor(items[0]) if items and has_previous else None,
+    }
@@ -0,0 +1,117 @@
+# finance/rollups.py
+"""
+Rekap bulanan per (user, kategori, bulan, tipe) di MonthlyCategoryRollup.
+
+Setiap Transaction.save() dan sinyal pre_delete (juga untuk
+queryset.delete()) menerapkan selisihnya (total & jumlah transaksi) ke
+baris rekap di transaksi database yang sama, jadi dashboard
+dan budget membaca O(kategori) baris, bukan seluruh riwayat transaksi.
+``rebuild_rollups`` menghitung ulang dari nol (manage.py
+rebuild_finance_rollups), untuk backfill atau jika rekap diragukan.
+"""
+from datetime import date
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncMonth
+
+ROLLUP_FIELDS = ('user_id', 'category_id', 'date', 'type', 'amount')
+
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def rollup_key(row):
+    """(user_id, category_id, bulan, tipe) dari dict transaksi"""
+    return row['user_id'], row['category_id'], month_start(row['date']), row['type']
+
+
+def apply_delta(key, amount, count):
+    """Tambahkan ``amount``/``count`` ke baris rekap ``key`` (dibuat jika belum ada)"""
+    from .models import MonthlyCategoryRollup
+
+    user_id, category_id, month, kind = key
+    rows = MonthlyCategoryRollup.objects.filter(
+        user_id=user_id, category_id=category_id, month=month, type=kind
+    )
+    if rows.update(total=F('total') + amount, count=F('count') + count):
+        return
+
+    try:
+        with transaction.atomic():
+            MonthlyCategoryRollup.objects.create(
+                user_id=user_id, category_id=category_id, month=month, type=kind,
+                total=amount, count=count,
+            )
+    except IntegrityError:
+        # Dibuat bersamaan oleh request lain
+        rows.update(total=F('total') + amount, count=F('count') + count)
+
+
+def record_change(old, new):
+    """
+    Terapkan perubahan satu transaksi ke rekap.
+
+    ``old``/``new`` adalah dict ROLLUP_FIELDS sebelum/sesudah, None untuk
+    transaksi baru/yang dihapus.
+    """
+    old_key = rollup_key(old) if old else None
+    new_key = rollup_key(new) if new else None
+
+    if old_key is None and new_key is None:
+        return
+    if old_key == new_key:
+        difference = Decimal(str(new['amount'])) - Decimal(str(old['amount']))
+        if difference:
+            apply_delta(new_key, difference, 0)
+        return
+
+    if old_key:
+        apply_delta(old_key, -Decimal(str(old['amount'])), -1)
+    if new_key:
+        apply_delta(new_key, Decimal(str(new['amount'])), 1)
+
+
+def merge_category(category):
+    """Pindahkan rekap sebuah kategori ke 'tanpa kategori' sebelum kategori dihapus (pre_delete)"""
+    from .models import MonthlyCategoryRollup
+
+    for rollup in MonthlyCategoryRollup.objects.filter(category=category):
+        apply_delta((rollup.user_id, None, rollup.month, rollup.type), rollup.total, rollup.count)
+        rollup.delete()
+
+
+@transaction.atomic
+def rebuild_rollups(user=None):
+    """Hitung ulang semua rekap (atau milik satu user) dari Transaction dengan satu query GROUP BY"""
+    from .models import MonthlyCategoryRollup, Transaction
+
+    transactions = Transaction.objects.all()
+    rollups = MonthlyCategoryRollup.objects.all()
+    if user is not None:
+        transactions = transactions.filter(user=user)
+        rollups = rollups.filter(user=user)
+
+    rows = (
+        transactions
+        .annotate(month=TruncMonth('date'))
+        .values('user_id', 'category_id', 'month', 'type')
+        .annotate(total=Sum('amount'), count=Count('id'))
+        .order_by()
+    )
+    rollups.delete()
+    created = MonthlyCategoryRollup.objects.bulk_create(
+        [MonthlyCategoryRollup(**row) for row in rows], batch_size=1000
+    )
+    return len(created)
+
+
+def month_rollups(user, month):
+    """Baris rekap satu bulan, dengan nama & warna kategori"""
+    from .models import MonthlyCategoryRollup
+
+    return MonthlyCategoryRollup.objects.filter(
+        user=user, month=month_start(month)
+    ).values('category_id', 'category__name', 'category__color', 'type', 'total', 'count')
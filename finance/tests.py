@@ -1,4 +1,214 @@
-# core/tests.py
+# finance/tests.py
+from datetime import date
+from decimal import Decimal
+
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.utils import timezone
+
+from .models import Budget, Category, MonthlyCategoryRollup, Transaction
+from .pagination import ORDERING, REVERSE_ORDERING, after, before, decode_cursor, encode_cursor, keyset_page
+from .rollups import month_rollups, rebuild_rollups
+
+
+class RollupTestCase(TestCase):
+    """Rekap yang diperbarui inkremental harus sama dengan hasil rebuild_rollups()"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('rollup', password='x')
+        self.food = Category.objects.create(user=self.user, name='Makanan', type='expense')
+        self.transport = Category.objects.create(user=self.user, name='Transport', type='expense')
+        self.salary = Category.objects.create(user=self.user, name='Gaji', type='income')
+
+    def add(self, amount, category, kind='expense', day=date(2025, 10, 5)):
+        return Transaction.objects.create(
+            user=self.user, category=category, amount=Decimal(amount), type=kind, date=day
+        )
+
+    def rollups(self):
+        # Baris kosong (count 0) sisa update inkremental tidak dibuat oleh rebuild
+        months = MonthlyCategoryRollup.objects.filter(user=self.user).dates('month', 'month')
+        return sorted(
+            (month, row['category_id'] or 0, row['type'], row['total'], row['count'])
+            for month in months
+            for row in month_rollups(self.user, month)
+            if row['count']
+        )
+
+    def assertMatchesRebuild(self):
+        incremental = self.rollups()
+        rebuild_rollups(self.user)
+        self.assertEqual(incremental, self.rollups())
+
+    def test_create(self):
+        self.add('15000', self.food)
+        self.add('25000.50', self.food)
+        self.add('5000000', self.salary, kind='income')
+        self.add('7000', None)
+        self.assertMatchesRebuild()
+
+    def test_amount_change(self):
+        transaction = self.add('15000', self.food)
+        self.add('10000', self.food)
+        transaction.amount = Decimal('22500')
+        transaction.save()
+        self.assertMatchesRebuild()
+
+    def test_category_change(self):
+        transaction = self.add('15000', self.food)
+        transaction.category = self.transport
+        transaction.save()
+        transaction.category = None
+        transaction.save()
+        self.assertMatchesRebuild()
+
+    def test_type_change(self):
+        transaction = self.add('15000', self.food)
+        transaction.type = 'income'
+        transaction.save()
+        self.assertMatchesRebuild()
+
+    def test_month_change(self):
+        transaction = self.add('15000', self.food)
+        transaction.date = date(2025, 11, 2)
+        transaction.amount = Decimal('12000')
+        transaction.save()
+        self.assertMatchesRebuild()
+
+    def test_delete(self):
+        transaction = self.add('15000', self.food)
+        self.add('10000', self.food)
+        transaction.delete()
+        self.assertMatchesRebuild()
+
+    def test_category_delete(self):
+        self.add('15000', self.food)
+        self.add('7000', None)
+        self.add('9000', self.transport)
+        food_id = self.food.pk
+        self.food.delete()
+        self.assertMatchesRebuild()
+        self.assertFalse(MonthlyCategoryRollup.objects.filter(category_id=food_id).exists())
+
+    def test_create_with_string_values(self):
+        Transaction.objects.create(
+            user=self.user, category=self.food, amount='15000.50', type='expense', date='2025-10-05'
+        )
+        self.assertMatchesRebuild()
+
+    def test_queryset_delete(self):
+        self.add('15000', self.food)
+        self.add('10000', self.food)
+        self.add('9000', self.transport)
+        Transaction.objects.filter(category=self.food).delete()
+        self.assertMatchesRebuild()
+
+    def test_category_queryset_delete(self):
+        self.add('15000', self.food)
+        self.add('9000', self.transport)
+        Category.objects.filter(pk__in=[self.food.pk, self.transport.pk]).delete()
+        self.assertMatchesRebuild()
+
+    def test_user_delete(self):
+        self.add('15000', self.food)
+        self.add('7000', None)
+        self.user.delete()
+        self.assertFalse(MonthlyCategoryRollup.objects.exists())
+
+
+class BudgetPercentageTestCase(TestCase):
+    """get_percentage() sama (float) dengan atau tanpa anotasi with_usage()"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('budget', password='x')
+        self.food = Category.objects.create(user=self.user, name='Makanan', type='expense')
+        Transaction.objects.create(
+            user=self.user, category=self.food, amount=Decimal('150'), type='expense', date=date(2025, 10, 5)
+        )
+
+    def assertSamePercentage(self, budget, expected):
+        annotated = Budget.objects.for_month(self.user, date(2025, 10, 1)).get(pk=budget.pk)
+        for percentage in (budget.get_percentage(), annotated.get_percentage()):
+            self.assertIsInstance(percentage, float)
+            self.assertAlmostEqual(percentage, expected)
+
+    def test_percentage(self):
+        budget = Budget.objects.create(user=self.user, category=self.food, amount=Decimal('200'), month=date(2025, 10, 1))
+        self.assertSamePercentage(budget, 75.0)
+
+    def test_zero_amount(self):
+        budget = Budget.objects.create(user=self.user, category=self.food, amount=Decimal('0'), month=date(2025, 10, 1))
+        self.assertSamePercentage(budget, 0.0)
+
+
+class KeysetPaginationTestCase(TestCase):
+    """Cursor pagination pada (-date, -created_at, id), termasuk nilai date/created_at yang sama"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('keyset', password='x')
+        for index in range(23):
+            Transaction.objects.create(
+                user=self.user, amount=Decimal(1000 + index), type='expense',
+                date=date(2025, 10, 1 + index % 3),
+            )
+        # Beberapa baris dengan created_at persis sama, hanya id yang membedakan
+        tied = Transaction.objects.filter(user=self.user, date=date(2025, 10, 2)).values_list('id', flat=True)
+        Transaction.objects.filter(id__in=list(tied)[:5]).update(created_at=timezone.now())
+        self.queryset = Transaction.objects.filter(user=self.user)
+        self.expected = list(self.queryset.order_by(*ORDERING).values_list('id', flat=True))
+
+    def ids(self, page):
+        return [transaction.id for transaction in page['items']]
+
+    def test_forward_walk_has_no_gaps_or_duplicates(self):
+        seen, cursor, pages = [], None, 0
+        while True:
+            page = keyset_page(self.queryset, after_token=cursor, size=5)
+            seen.extend(self.ids(page))
+            pages += 1
+            if page['next_cursor'] is None:
+                break
+            cursor = page['next_cursor']
+        self.assertEqual(seen, self.expected)
+        self.assertEqual(pages, 5)
+
+    def test_before_returns_previous_page(self):
+        pages = [keyset_page(self.queryset, size=5)]
+        while pages[-1]['next_cursor']:
+            pages.append(keyset_page(self.queryset, after_token=pages[-1]['next_cursor'], size=5))
+
+        for previous, current in zip(pages, pages[1:]):
+            back = keyset_page(self.queryset, before_token=current['previous_cursor'], size=5)
+            self.assertEqual(self.ids(back), self.ids(previous))
+            self.assertEqual(back['next_cursor'], previous['next_cursor'])
+            self.assertEqual(back['previous_cursor'], previous['previous_cursor'])
+
+    def test_first_page_has_no_previous_cursor(self):
+        page = keyset_page(self.queryset, size=5)
+        self.assertIsNone(page['previous_cursor'])
+        self.assertEqual(self.ids(page), self.expected[:5])
+
+    def test_cursor_round_trip(self):
+        transaction = self.queryset.order_by(*ORDERING).first()
+        self.assertEqual(
+            decode_cursor(encode_cursor(transaction)),
+            (transaction.date, transaction.created_at, transaction.id),
+        )
+
+    def test_garbage_cursor_falls_back_to_first_page(self):
+        first = self.ids(keyset_page(self.queryset, size=5))
+        for token in ('garbage', '!!!', 'MjAyNXwxfDI', encode_cursor(self.queryset.first())[:-4] + '$$$$'):
+            self.assertIsNone(decode_cursor(token))
+            self.assertEqual(self.ids(keyset_page(self.queryset, after_token=token, size=5)), first)
+            self.assertEqual(self.ids(keyset_page(self.queryset, before_token=token, size=5)), first)
 
-# Create your tests here.
+    @skipUnless(connection.vendor == 'sqlite', 'format EXPLAIN QUERY PLAN SQLite')
+    def test_cursor_filter_uses_date_bound(self):
+        cursor = decode_cursor(encode_cursor(self.queryset.order_by(*ORDERING)[5]))
+        plan = self.queryset.filter(after(cursor)).order_by(*ORDERING)[:6].explain()
+        self.assertIn('finance_tx_user_keyset_idx (user_id=? AND date<?)', plan)
+        plan = self.queryset.filter(before(cursor)).order_by(*REVERSE_ORDERING)[:6].explain()
+        self.assertIn('finance_tx_user_keyset_idx (user_id=? AND date>?)', plan)
@@ -6,7 +6,9 @@ from .views import (
     transactions,
     research_menu,
     edit_transaction,
-    delete_transaction
+    delete_transaction,
+    export_transactions,
+    export_research_expenses,
 ) 
 
 app_name = 'finance'
@@ -27,8 +29,10 @@ urlpatterns = [
     path('transactions/add/', add_transaction, name='add_transaction'),
     path('transactions/edit/<int:transaction_id>/', edit_transaction, name='edit_transaction'),
     path('transactions/delete/<int:transaction_id>/', delete_transaction, name='delete_transaction'),
+    path('transactions/export/', export_transactions, name='export_transactions'),
     # ========================================
     # RESEARCH MENU URLs
     # ========================================
     path('research/', research_menu, name='research_menu'),
+    path('research/export/', export_research_expenses, name='export_research_expenses'),
 ]
\ No newline at end of file
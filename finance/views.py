@@ -2,11 +2,17 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Sum, Q
+from django.db.models import Count, Sum, Q
+from django.db.models.functions import Coalesce
 from django.utils import timezone
-from datetime import datetime, timedelta
+from django.utils.text import slugify
+from datetime import datetime
+from decimal import Decimal
+from .aggregates import month_range, month_summary
+from .exports import RESEARCH_EXPENSE_COLUMNS, TRANSACTION_COLUMNS, export_response, export_rows
 from .models import Transaction, Category, Budget, ResearchExpense
 from .forms import TransactionForm
+from .pagination import ORDERING, keyset_page
 import json
 
 
@@ -28,46 +34,29 @@ def finance_dashboard(request):
     except:
         filter_date = timezone.now()
     
-    # Hitung total pemasukan bulan ini
-    income_total = Transaction.objects.filter(
-        user=request.user,
-        type='income',
-        date__year=filter_date.year,
-        date__month=filter_date.month
-    ).aggregate(Sum('amount'))['amount__sum'] or 0
-    
-    # Hitung total pengeluaran bulan ini
-    expense_total = Transaction.objects.filter(
-        user=request.user,
-        type='expense',
-        date__year=filter_date.year,
-        date__month=filter_date.month
-    ).aggregate(Sum('amount'))['amount__sum'] or 0
-    
-    # Hitung saldo (income - expense)
-    balance = income_total - expense_total
+    # Total bulanan, data mingguan & kategori dari satu query agregat
+    summary = month_summary(request.user, filter_date)
     
     # Ambil transaksi terbaru (10 transaksi)
+    start, end = month_range(filter_date)
     recent_transactions = Transaction.objects.filter(
         user=request.user,
-        date__year=filter_date.year,
-        date__month=filter_date.month
-    ).order_by('-date', '-created_at')[:10]
+        date__gte=start,
+        date__lt=end
+    ).select_related('category').order_by('-date', '-created_at')[:10]
     
-    # Data untuk grafik mingguan
-    weeks_data = get_weekly_data(request.user, filter_date)
-    
-    # Data untuk grafik kategori pengeluaran
-    category_data = get_category_breakdown(request.user, filter_date)
+    # Budget bulan ini beserta spent & percentage dari rekap, satu query
+    budgets = Budget.objects.for_month(request.user, filter_date)
     
     context = {
-        'income_total': income_total,
-        'expense_total': expense_total,
-        'balance': balance,
+        'income_total': summary['income_total'],
+        'expense_total': summary['expense_total'],
+        'balance': summary['balance'],
         'recent_transactions': recent_transactions,
+        'budgets': budgets,
         'current_month': filter_date,
-        'weeks_data': json.dumps(weeks_data),
-        'category_data': json.dumps(category_data),
+        'weeks_data': json.dumps(summary['weeks']),
+        'category_data': json.dumps(summary['categories']),
     }
     
     return render(request, 'finance/finance_dashboard.html', context)
@@ -80,51 +69,35 @@ def finance_dashboard(request):
 @login_required
 def transactions(request):
     """
-    Halaman daftar semua transaksi dengan filter
+    Halaman daftar transaksi dengan filter, dipaginasi dengan cursor (keyset)
     """
-    # Ambil semua transaksi user
-    transactions_list = Transaction.objects.filter(user=request.user)
-    
-    # Filter berdasarkan tipe (income/expense)
-    type_filter = request.GET.get('type')
-    if type_filter:
-        transactions_list = transactions_list.filter(type=type_filter)
-    
-    # Filter berdasarkan bulan
-    month_filter = request.GET.get('month')
-    if month_filter:
-        try:
-            date = datetime.strptime(month_filter, '%Y-%m')
-            transactions_list = transactions_list.filter(
-                date__year=date.year,
-                date__month=date.month
-            )
-        except:
-            pass
+    transactions_list = filter_transactions(request.user, request.GET)
     
-    # Filter berdasarkan kategori
-    category_filter = request.GET.get('category')
-    if category_filter:
-        transactions_list = transactions_list.filter(category_id=category_filter)
-    
-    # Order by date descending
-    transactions_list = transactions_list.order_by('-date', '-created_at')
+    # Total pemasukan, pengeluaran & jumlah transaksi sesuai filter, satu query
+    totals = transactions_list.aggregate(
+        income_total=Coalesce(Sum('amount', filter=Q(type='income')), Decimal('0')),
+        expense_total=Coalesce(Sum('amount', filter=Q(type='expense')), Decimal('0')),
+        total_count=Count('id'),
+    )
     
-        # Hitung total pemasukan bulan ini
-    income_total = transactions_list.filter(
-        type='income'
-        ).aggregate(Sum('amount'))['amount__sum'] or 0
+    page = keyset_page(
+        transactions_list.select_related('category'),
+        after_token=request.GET.get('after'),
+        before_token=request.GET.get('before'),
+    )
     
-    # Hitung total pengeluaran bulan ini
-    expense_total = transactions_list.filter(
-        type='expense',
-        ).aggregate(Sum('amount'))['amount__sum'] or 0
+    # Filter aktif dipertahankan di link halaman
+    filter_params = request.GET.copy()
+    filter_params.pop('after', None)
+    filter_params.pop('before', None)
     
     context = {
-        'transactions': transactions_list,
+        'transactions': page['items'],
+        'next_cursor': page['next_cursor'],
+        'previous_cursor': page['previous_cursor'],
+        'filter_query': filter_params.urlencode(),
         'categories': Category.objects.filter(user=request.user),
-        'income_total': income_total,
-        'expense_total': expense_total
+        **totals,
     }
     
     return render(request, 'finance/transactions.html', context)
@@ -213,6 +186,21 @@ def delete_transaction(request, transaction_id):
     # Jika GET, redirect ke transactions
     return redirect('finance:transactions')
 
+@login_required
+def export_transactions(request):
+    """
+    Export transaksi (CSV atau XLSX lewat ?format=xlsx) dengan filter yang
+    sama seperti halaman daftar transaksi, di-stream per blok baris
+    """
+    rows = export_rows(
+        filter_transactions(request.user, request.GET),
+        TRANSACTION_COLUMNS,
+        ORDERING,
+        labels={'type': dict(Transaction.TRANSACTION_TYPES)},
+    )
+    filename = f"transaksi_{timezone.localdate():%Y%m%d}"
+    return export_response(request.GET.get('format'), filename, TRANSACTION_COLUMNS, rows, sheet_name='Transaksi')
+
 # ========================================
 # RESEARCH MENU VIEWS
 # ========================================
@@ -231,10 +219,7 @@ def research_menu(request):
     field = request.GET.get('field', 'ai')
     
     # Ambil semua research expenses untuk field ini
-    expenses = ResearchExpense.objects.filter(
-        user=request.user, 
-        field=field
-    ).order_by('-date')
+    expenses = filter_research_expenses(request.user, request.GET).order_by('-date')
     
     # Hitung total pengeluaran untuk field ini
     total_spent = expenses.aggregate(Sum('amount'))['amount__sum'] or 0
@@ -249,93 +234,59 @@ def research_menu(request):
     return render(request, 'finance/research.html', context)
 
 
+@login_required
+def export_research_expenses(request):
+    """
+    Export pengeluaran riset satu bidang (CSV atau XLSX lewat ?format=xlsx),
+    di-stream per blok baris
+    """
+    rows = export_rows(
+        filter_research_expenses(request.user, request.GET),
+        RESEARCH_EXPENSE_COLUMNS,
+        ('-date', '-created_at', 'id'),
+        labels={'field': dict(ResearchExpense.RESEARCH_FIELDS)},
+    )
+    filename = f"riset_{slugify(request.GET.get('field', 'ai'))}_{timezone.localdate():%Y%m%d}"
+    return export_response(request.GET.get('format'), filename, RESEARCH_EXPENSE_COLUMNS, rows, sheet_name='Riset')
+
+
 # ========================================
 # HELPER FUNCTIONS
 # ========================================
 
-def get_weekly_data(user, month):
+def filter_transactions(user, params):
     """
-    Ambil data transaksi per minggu dalam bulan tertentu
-    untuk grafik bar chart mingguan
-    
-    Returns: List of dict dengan format:
-    [
-        {'week': 'Week 1', 'income': 1000000, 'expense': 500000},
-        {'week': 'Week 2', 'income': 1500000, 'expense': 800000},
-        ...
-    ]
-    """
-    weeks = []
-    start_date = month.replace(day=1)
-    
-    # Loop untuk maksimal 5 minggu
-    for week_num in range(5):
-        week_start = start_date + timedelta(days=week_num * 7)
-        week_end = week_start + timedelta(days=6)
-        
-        # Jangan proses jika sudah lewat bulan ini
-        if week_start.month != month.month:
-            break
-        
-        # Hitung income untuk minggu ini
-        income = Transaction.objects.filter(
-            user=user,
-            type='income',
-            date__range=[week_start, week_end]
-        ).aggregate(Sum('amount'))['amount__sum'] or 0
-        
-        # Hitung expense untuk minggu ini
-        expense = Transaction.objects.filter(
-            user=user,
-            type='expense',
-            date__range=[week_start, week_end]
-        ).aggregate(Sum('amount'))['amount__sum'] or 0
-        
-        weeks.append({
-            'week': f'Week {week_num + 1}',
-            'income': float(income),
-            'expense': float(expense)
-        })
-    
-    return weeks
-
-
-def get_category_breakdown(user, month):
+    Transaksi user dengan filter daftar transaksi (type, month=YYYY-MM,
+    category) dari query string
     """
-    Breakdown pengeluaran per kategori untuk bulan tertentu
-    untuk grafik pie chart
+    transactions_list = Transaction.objects.filter(user=user)
     
-    Returns: List of dict dengan format:
-    [
-        {'name': 'Makanan', 'value': 500000, 'color': '#ef4444'},
-        {'name': 'Transportasi', 'value': 300000, 'color': '#f59e0b'},
-        ...
-    ]
-    """
-    categories = []
+    # Filter berdasarkan tipe (income/expense)
+    type_filter = params.get('type')
+    if type_filter:
+        transactions_list = transactions_list.filter(type=type_filter)
     
-    # Query untuk aggregate pengeluaran per kategori
-    expense_by_category = Transaction.objects.filter(
-        user=user,
-        type='expense',
-        date__year=month.year,
-        date__month=month.month
-    ).values(
-        'category__name', 
-        'category__color'
-    ).annotate(
-        total=Sum('amount')
-    )
+    # Filter berdasarkan bulan (range tanggal, bisa memakai index)
+    month_filter = params.get('month')
+    if month_filter:
+        try:
+            start, end = month_range(datetime.strptime(month_filter, '%Y-%m'))
+            transactions_list = transactions_list.filter(date__gte=start, date__lt=end)
+        except ValueError:
+            pass
     
-    # Format data untuk Chart.js
-    for item in expense_by_category:
-        categories.append({
-            'name': item['category__name'] or 'Tanpa Kategori',
-            'value': float(item['total']),
-            'color': item['category__color'] or '#37a749'
-        })
+    # Filter berdasarkan kategori
+    category_filter = params.get('category')
+    if category_filter and category_filter.isdigit():
+        transactions_list = transactions_list.filter(category_id=category_filter)
     
-    return categories
+    return transactions_list
+
+
+def filter_research_expenses(user, params):
+    """Pengeluaran riset user untuk bidang ?field= (default: ai)"""
+    return ResearchExpense.objects.filter(user=user, field=params.get('field', 'ai'))
+
 
 @login_required
 def transaksi_edit(request, id):
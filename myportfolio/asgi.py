@@ -3,6 +3,11 @@ ASGI config for myportfolio project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Long-lived streaming endpoints (the telescope status server-sent events at
+``/astronomy/telescope/events/``) are served from here by the ``asgi``
+service in docker-compose.yml, so an open browser tab never occupies a
+gunicorn sync worker. Regular pages keep going through wsgi.py.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -172,6 +172,14 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Columnar .npz snapshots of research data (astronomy/columns.py), not served publicly
+RESEARCH_COLUMNS_ROOT = os.path.join(BASE_DIR, 'var', 'research_columns')
+
+# Hourly sky tables per observing site (astronomy/ephemeris.py)
+EPHEMERIS_ROOT = os.path.join(BASE_DIR, 'var', 'ephemeris')
+# Extra sites precomputed next to the default (Bekasi): [{'latitude': ..., 'longitude': ...}]
+EPHEMERIS_SITES = []
+
 LOGIN_URL = 'core:login'
 LOGIN_REDIRECT_URL = 'core:dashboard_selection'
 LOGOUT_REDIRECT_URL = 'core:login'
@@ -30,7 +30,7 @@ urlpatterns = [
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/token/verify/', TokenVerifyView.as_view(), name='token_verify'),
     path('api/core/', include('core.urls_api')),
-    path('api/astronomy',include('astronomy.urls_api')),
+    path('api/astronomy/',include('astronomy.urls_api')),
     path('api/finance',include('workspace.urls_api')),
     path('api/workspace',include('workspace.urls_api')),
     